@@ -1,262 +1,228 @@
 #!/usr/bin/env python3
 """
-One-time migration script to backfill Notion database with GitHub Issues.
+Backfill the weekly Notion databases from the local article archive.
 
-This script reads all GitHub Issues and saves them to the existing Notion database.
-It parses issue body to extract article data and creates Notion pages for each.
+Articles are read from ``data/YYYY/MM/DD.json`` and compacted month archives
+(via ``src.archive.iter_days``), filtered to the issue threshold, and routed to
+the weekly database of their archive day's ISO week, the same database the
+live run wrote them to (``published_at`` can be days earlier). Each week is deduped
+against its existing pages in one scan, then created concurrently through the
+rate-limited Notion writer.
+
+Progress is checkpointed to ``data/backfill_checkpoint.json`` after every
+batch, so an interrupted backfill resumes where it stopped. Failed pages are
+not checkpointed and are retried by the next run.
 
 Usage:
     uv run python backfill_notion.py
+    uv run python backfill_notion.py --start 2026-02-01 --end 2026-02-28
+    uv run python backfill_notion.py --dry-run   # count pages per week only
+    uv run python backfill_notion.py --reset     # forget previous progress
 """
 
+from __future__ import annotations
+
+import argparse
 import json
 import logging
-import re
-import subprocess
+import os
+import tempfile
+from collections import defaultdict
 from datetime import datetime
-from typing import Any
+from pathlib import Path
 
 from dotenv import load_dotenv
 
-from src.notion_common import get_client
-from src.notion_handler import ensure_database
+from src import config
+from src.archive import iter_days
+from src.article_codec import article_from_dict
+from src.notion_common import get_client, log_api_calls
+from src.notion_handler import (
+    _article_key,
+    _build_page_properties,
+    ensure_database,
+    load_existing_keys,
+    remember_keys,
+)
+from src.notion_writer import create_pages_in
 from src.scraper import Article
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_PATH = Path("data") / "backfill_checkpoint.json"
+BATCH_SIZE = 100
 
-def _extract_source_id(discussion_url: str, source: str) -> str:
-    """Extract source_id from discussion URL.
-
-    For geeknews: Extract topic ID from URL path (last part)
-    For hackernews: Extract item ID from ?id= parameter
-    """
-    if source == "geeknews":
-        # URL format: https://geeknews.geeknews.com/x/12345
-        match = re.search(r"/(\d+)/?$", discussion_url)
-        if match:
-            return match.group(1)
-        return discussion_url
-    elif source == "hackernews":
-        # URL format: https://news.ycombinator.com/item?id=46911581
-        match = re.search(r"[?&]id=(\d+)", discussion_url)
-        if match:
-            return match.group(1)
-        return discussion_url
-    return discussion_url
-
-
-def _parse_issue_body(body: str) -> dict[str, Any]:
-    """Parse GitHub issue body to extract article data.
-
-    Expected format:
-    ## 기사 정보
-    - **원본 URL**: https://...
-    - **토론**: https://...
-    - **소스**: geeknews
-    - **관련성 점수**: 0.85
-
-    ## AI 요약
-    Line 1
-    Line 2
-    Line 3
-    """
-    data: dict[str, Any] = {
-        "url": "",
-        "discussion_url": "",
-        "source": "",
-        "relevance_score": 0.0,
-        "ai_summary": "",
-    }
-
-    # Extract URL
-    url_match = re.search(r"\*\*원본 URL\*\*:\s*(\S+)", body)
-    if url_match:
-        data["url"] = url_match.group(1)
-
-    # Extract discussion URL
-    discussion_match = re.search(r"\*\*토론\*\*:\s*(\S+)", body)
-    if discussion_match:
-        data["discussion_url"] = discussion_match.group(1)
-
-    # Extract source
-    source_match = re.search(r"\*\*소스\*\*:\s*(\w+)", body)
-    if source_match:
-        data["source"] = source_match.group(1)
-
-    # Extract relevance score
-    score_match = re.search(r"\*\*관련성 점수\*\*:\s*([\d.]+)", body)
-    if score_match:
-        data["relevance_score"] = float(score_match.group(1))
-
-    # Extract AI summary (everything after "## AI 요약")
-    summary_match = re.search(r"## AI 요약\n(.*?)(?:\n##|$)", body, re.DOTALL)
-    if summary_match:
-        summary_text = summary_match.group(1).strip()
-        # Clean up the summary (remove extra whitespace, keep line breaks)
-        data["ai_summary"] = "\n".join(
-            line.strip() for line in summary_text.split("\n") if line.strip()
-        )
-
-    return data
-
-
-def _extract_title_and_source(issue_title: str) -> tuple[str, str]:
-    """Extract source and title from issue title.
 
-    Format: [source] Article Title
-    Example: [geeknews] WebMCP 공개
-    """
-    match = re.match(r"\[(\w+)\]\s+(.*)", issue_title)
-    if match:
-        return match.group(2), match.group(1)
-    return issue_title, "unknown"
+def load_checkpoint() -> set[str]:
+    """Return the article keys already backfilled (created or found existing)."""
+    if not CHECKPOINT_PATH.exists():
+        return set()
+    try:
+        with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+            return set(json.load(f).get("done", []))
+    except (json.JSONDecodeError, OSError):
+        logger.exception("Failed to load %s, starting fresh", CHECKPOINT_PATH)
+        return set()
 
 
-def _fetch_github_issues() -> list[dict[str, Any]]:
-    """Fetch all GitHub issues using gh CLI."""
+def save_checkpoint(done: set[str]) -> None:
+    CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=CHECKPOINT_PATH.parent, suffix=".tmp")
     try:
-        result = subprocess.run(
-            ["gh", "issue", "list", "--json", "title,body,createdAt", "--limit", "100"],
-            capture_output=True,
-            text=True,
-            check=True,
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(done)}, f, ensure_ascii=False)
+        os.replace(tmp_name, CHECKPOINT_PATH)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def collect_articles(
+    start: str | None = None,
+    end: str | None = None,
+) -> dict[str, list[Article]]:
+    """Group archived articles at or above the issue threshold by the ISO week
+    of the day they were archived (first archive day for repeats)."""
+    weeks: dict[str, list[Article]] = defaultdict(list)
+    seen: set[str] = set()
+    for date_str, records in iter_days(start, end):
+        week_id = config.get_week_identifier(datetime.fromisoformat(date_str))
+        for record in records:
+            article = article_from_dict(record)
+            key = _article_key(article)
+            if article.relevance_score < config.ISSUE_THRESHOLD or key in seen:
+                continue
+            seen.add(key)
+            weeks[week_id].append(article)
+    return dict(sorted(weeks.items()))
+
+
+def backfill_week(
+    client: object,
+    week_id: str,
+    articles: list[Article],
+    done: set[str],
+) -> tuple[int, int, int]:
+    """Backfill one week; returns ``(created, skipped, failed)``."""
+    data_source_id = ensure_database(client, week_id)
+    existing = load_existing_keys(client, data_source_id)
+
+    skipped = [a for a in articles if _article_key(a) in existing]
+    done.update(_article_key(a) for a in skipped)
+    todo = [a for a in articles if _article_key(a) not in existing]
+
+    created = failed = 0
+    for i in range(0, len(todo), BATCH_SIZE):
+        batch = todo[i : i + BATCH_SIZE]
+        results = create_pages_in(
+            data_source_id,
+            [_build_page_properties(a, data_source_id) for a in batch],
+            resolve=lambda: ensure_database(client, week_id),
         )
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        logger.error("Failed to fetch GitHub issues: %s", e.stderr)
-        return []
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse GitHub issues JSON: %s", e)
-        return []
+        created_keys: set[str] = set()
+        for article, result in zip(batch, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    "Failed to create page [%s] %s: %s",
+                    article.source,
+                    article.title,
+                    result,
+                )
+                failed += 1
+                continue
+            created_keys.add(_article_key(article))
 
+        created += len(created_keys)
+        remember_keys(client, data_source_id, created_keys)
+        done.update(created_keys)
+        save_checkpoint(done)
 
-def _convert_iso_to_date(iso_string: str) -> str:
-    """Convert ISO 8601 timestamp to YYYY-MM-DD format."""
-    try:
-        dt = datetime.fromisoformat(iso_string.replace("Z", "+00:00"))
-        return dt.strftime("%Y-%m-%d")
-    except (ValueError, AttributeError):
-        logger.warning("Failed to parse date: %s", iso_string)
-        return datetime.now().strftime("%Y-%m-%d")
+    save_checkpoint(done)
+    return created, len(skipped), failed
 
 
-def backfill_notion() -> None:
+def backfill_notion(
+    start: str | None = None,
+    end: str | None = None,
+    dry_run: bool = False,
+) -> None:
     """Main backfill function."""
-    logger.info("Starting Notion backfill from GitHub Issues...")
+    logger.info("Starting Notion backfill from the article archive...")
 
-    # Fetch all GitHub issues
-    issues = _fetch_github_issues()
-    if not issues:
-        logger.warning("No GitHub issues found")
-        return
+    done = load_checkpoint()
+    weeks = {
+        week_id: pending
+        for week_id, articles in collect_articles(start, end).items()
+        if (pending := [a for a in articles if _article_key(a) not in done])
+    }
+    total = sum(len(articles) for articles in weeks.values())
+    logger.info(
+        "%d article(s) to backfill across %d week(s) (%d already done)",
+        total,
+        len(weeks),
+        len(done),
+    )
 
-    logger.info("Found %d GitHub issues", len(issues))
+    if dry_run:
+        for week_id, articles in weeks.items():
+            logger.info("[DRY RUN] %s: %d article(s)", week_id, len(articles))
+        return
+    if not weeks:
+        return
 
-    # Initialize Notion client — get/create weekly database
     client = get_client()
-    data_source_id = ensure_database(client)
-    logger.info("Using Notion database with data_source_id: %s", data_source_id)
-
-    created_count = 0
-    skipped_count = 0
-
-    for issue in issues:
-        try:
-            # Extract title and source from issue title
-            title, source = _extract_title_and_source(issue["title"])
-
-            # Parse issue body
-            parsed = _parse_issue_body(issue["body"])
-
-            # Validate required fields
-            if (
-                not parsed["url"]
-                or not parsed["discussion_url"]
-                or not parsed["source"]
-            ):
-                logger.warning("Skipping issue with missing fields: %s", issue["title"])
-                skipped_count += 1
-                continue
-
-            # Extract source_id from discussion URL
-            source_id = _extract_source_id(parsed["discussion_url"], parsed["source"])
-
-            # Convert createdAt to date format
-            published_at = _convert_iso_to_date(issue["createdAt"])
-
-            # Create Article object
-            article = Article(
-                source=parsed["source"],
-                source_id=source_id,
-                title=title,
-                url=parsed["url"],
-                discussion_url=parsed["discussion_url"],
-                summary="",
-                score=0,
-                published_at=published_at,
-                ai_summary=parsed["ai_summary"],
-                relevance_score=parsed["relevance_score"],
-                tags=["Other"],
-            )
-
-            # Create Notion page
-            page_payload = {
-                "parent": {"type": "data_source_id", "data_source_id": data_source_id},
-                "properties": {
-                    "제목": {
-                        "title": [
-                            {
-                                "text": {
-                                    "content": f"{article.source}:{article.source_id} {article.title}"
-                                }
-                            }
-                        ]
-                    },
-                    "소스": {"select": {"name": article.source}},
-                    "관련성": {"number": article.relevance_score},
-                    "AI 요약": {
-                        "rich_text": [
-                            {"text": {"content": (article.ai_summary or "")[:2000]}}
-                        ]
-                    },
-                    "원문 URL": {"url": article.url},
-                    "토론 URL": {"url": article.discussion_url},
-                    "날짜": {"date": {"start": article.published_at}},
-                    "읽음": {"checkbox": False},
-                    "태그": {"multi_select": [{"name": tag} for tag in article.tags]},
-                },
-            }
-            client.pages.create(**page_payload)
-
+    created_total = skipped_total = failed_total = 0
+    try:
+        for week_id, articles in weeks.items():
+            created, skipped, failed = backfill_week(client, week_id, articles, done)
             logger.info(
-                "Created Notion page: [%s] %s (relevance: %.2f)",
-                article.source,
-                article.title,
-                article.relevance_score,
+                "%s: %d created, %d already in Notion, %d failed",
+                week_id,
+                created,
+                skipped,
+                failed,
             )
-            created_count += 1
-
-        except Exception as e:
-            logger.error("Failed to process issue %s: %s", issue["title"], e)
-            skipped_count += 1
-            continue
+            created_total += created
+            skipped_total += skipped
+            failed_total += failed
+    finally:
+        log_api_calls("Notion backfill")
 
     logger.info(
-        "Backfill complete: %d created, %d skipped, %d total",
-        created_count,
-        skipped_count,
-        len(issues),
+        "Backfill complete: %d created, %d skipped, %d failed, %d total",
+        created_total,
+        skipped_total,
+        failed_total,
+        total,
+    )
+
+
+def cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill Notion from the archive")
+    parser.add_argument("--start", help="First day to include (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last day to include (YYYY-MM-DD)")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many pages each week would get",
     )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Delete the backfill checkpoint before starting",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    backfill_notion()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    args = cli()
+    if args.reset:
+        CHECKPOINT_PATH.unlink(missing_ok=True)
+    backfill_notion(args.start, args.end, dry_run=args.dry_run)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: Article encode/decode throughput and per-object memory.
+
+Compares the previous path (plain ``@dataclass`` + ``dataclasses.asdict`` +
+``json`` with ``indent=2``) against the slotted Article with
+the ``src.article_codec`` JSON encoder.
+
+Usage:
+    uv run python benchmarks/bench_article_codec.py [--count 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.article_codec import (  # noqa: E402
+    article_from_dict,
+    decode_json,
+    encode_json,
+)
+from src.scraper import Article  # noqa: E402
+
+
+@dataclass
+class LegacyArticle:
+    """The pre-slots Article layout, kept here only as a baseline."""
+
+    source: str
+    source_id: str
+    title: str
+    url: str
+    discussion_url: str
+    summary: str
+    score: int
+    published_at: str
+    ai_summary: str = ""
+    relevance_score: float = 0.0
+    notable: bool = False
+    tags: list[str] = field(default_factory=list)
+
+
+def _fields(i: int) -> dict[str, Any]:
+    return {
+        "source": ("geeknews", "hackernews", "tldrai")[i % 3],
+        "source_id": str(40_000_000 + i),
+        "title": f"Article {i}: 새로운 LLM 추론 최적화 기법",
+        "url": f"https://example.com/posts/{i}",
+        "discussion_url": f"https://news.ycombinator.com/item?id={40_000_000 + i}",
+        "summary": "요약 " * 40,
+        "score": i % 500,
+        "published_at": "2026-02-12T04:34:06+00:00",
+        "ai_summary": "핵심 요약 첫 줄.\n둘째 줄.\n셋째 줄.",
+        "relevance_score": 0.85,
+        "notable": i % 5 == 0,
+        "tags": ["AI/ML", "Tool"],
+    }
+
+
+def _timeit(label: str, count: int, fn: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} {elapsed * 1000:9.1f} ms  {count / elapsed:12,.0f} obj/s")
+    return result
+
+
+def _memory_per_object(factory: Callable[[int], Any], count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # Field values are shared with ``shared`` below, so only instances count
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return size / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+    count: int = args.count
+
+    records = [_fields(i) for i in range(count)]
+    legacy = [LegacyArticle(**r) for r in records]
+    slotted = [Article(**r) for r in records]
+
+    print(f"Encode ({count:,} articles)")
+    legacy_text = _timeit(
+        "legacy asdict + json indent=2",
+        count,
+        lambda: json.dumps([asdict(a) for a in legacy], indent=2, ensure_ascii=False),
+    )
+    _timeit("codec json indent=2", count, lambda: encode_json(slotted, indent=2))
+    compact_text = _timeit("codec json compact", count, lambda: encode_json(slotted))
+
+    print(f"Decode ({count:,} articles)")
+    _timeit(
+        "legacy json + Article(**d)",
+        count,
+        lambda: [LegacyArticle(**d) for d in json.loads(legacy_text)],
+    )
+    _timeit("codec decode_json", count, lambda: decode_json(compact_text))
+    _timeit(
+        "codec article_from_dict (pre-parsed)",
+        count,
+        lambda: [article_from_dict(d) for d in records],
+    )
+
+    print("Size on the wire")
+    print(f"  json indent=2   {len(legacy_text.encode()):>12,} bytes")
+    print(f"  json compact    {len(compact_text.encode()):>12,} bytes")
+
+    del legacy, slotted
+    print("Memory per instance (excluding shared field values)")
+    shared = [_fields(i) for i in range(count)]
+    legacy_bytes = _memory_per_object(lambda i: LegacyArticle(**shared[i]), count)
+    slotted_bytes = _memory_per_object(lambda i: Article(**shared[i]), count)
+    print(f"  legacy @dataclass  {legacy_bytes:8.1f} B")
+    print(f"  slots=True         {slotted_bytes:8.1f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark: full pipeline runs replayed offline from a recorded cassette.
+
+Each run starts from the cassette's ``state/`` in a fresh sandbox and gets the
+recorded responses back with their recorded latencies (scaled by
+``--latency``), so timings are comparable between commits without network,
+API keys or rate limits. Record a cassette first:
+
+    uv run python -m src.main --dry-run --record cassettes/baseline
+
+Usage:
+    uv run python benchmarks/bench_main_replay.py cassettes/baseline [--runs 5]
+        [--latency 1.0] [--top 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import main as pipeline  # noqa: E402
+from src import metrics  # noqa: E402
+from src.cassette import replay_sandbox, use_cassette  # noqa: E402
+
+
+def replay_once(cassette_dir: Path, latency: float) -> tuple[float, int, dict]:
+    """One replayed run: wall time, cassette misses and the run's metrics."""
+    with open(cassette_dir / "interactions.json", encoding="utf-8") as f:
+        dry_run = json.load(f)["metadata"].get("dry_run", False)
+    with replay_sandbox(cassette_dir):
+        with use_cassette(cassette_dir, "replay", latency) as cassette:
+            start = time.perf_counter()
+            pipeline.main(dry_run=dry_run, run_id="bench")
+            elapsed = time.perf_counter() - start
+    return elapsed, len(cassette.misses), metrics.snapshot()
+
+
+def run(cassette_dir: Path, runs: int, latency: float, top: int) -> None:
+    walls: list[float] = []
+    totals: dict[str, list[float]] = {}
+    for i in range(runs):
+        elapsed, misses, snapshot = replay_once(cassette_dir, latency)
+        walls.append(elapsed)
+        for name, timer in snapshot["timers"].items():
+            totals.setdefault(name, []).append(timer["total_s"])
+        print(f"run {i + 1}: {elapsed:8.3f}s  {misses} misses")
+
+    print(
+        f"\nwall: median {statistics.median(walls):.3f}s, "
+        f"min {min(walls):.3f}s over {runs} runs (latency x{latency:g})"
+    )
+    medians = {name: statistics.median(values) for name, values in totals.items()}
+    ranked = sorted(medians.items(), key=lambda item: item[1], reverse=True)
+    print(f"\n{'timer':<36}{'median':>10}{'min':>10}")
+    for name, median in ranked[:top]:
+        print(f"{name:<36}{median:>9.3f}s{min(totals[name]):>9.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    run(args.cassette.resolve(), args.runs, args.latency, args.top)
+
+
+if __name__ == "__main__":
+    main()
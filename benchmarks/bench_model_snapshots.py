@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Benchmark: model snapshot writes and lookups, legacy path vs SnapshotRepository.
+
+The legacy path is the original code: a fresh ``sqlite3.connect`` plus
+``CREATE TABLE`` per call, one ``execute`` per row into a full-copy table and a
+``DISTINCT`` scan to find the previous snapshot. Both paths write ``--models``
+models for each of ``--days`` consecutive days, with ``--churn`` of the models
+changing price each day, then look up the previous snapshot for every day.
+
+Usage:
+    uv run python benchmarks/bench_model_snapshots.py [--models 1000] [--days 365]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.model_tracker import (  # noqa: E402
+    _CREATE_TABLE_SQL,
+    _SELECT_SNAPSHOT_SQL,
+    SnapshotRepository,
+    _snapshot_row,
+)
+
+_LEGACY_INSERT_SQL = (
+    "INSERT OR REPLACE INTO model_snapshots VALUES "
+    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# The pre-catalog lookup: DISTINCT over every model row.
+_LEGACY_PREVIOUS_DATE_SQL = (
+    "SELECT DISTINCT fetched_at FROM model_snapshots "
+    "WHERE fetched_at < ? ORDER BY fetched_at DESC LIMIT 1"
+)
+
+
+def make_models(count: int, seed: int = 7) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "model_id": f"model-{i}",
+            "name": f"Model {i}",
+            "creator": f"Lab {i % 40}",
+            "intelligence_index": rng.uniform(10, 80),
+            "coding_index": rng.uniform(10, 80),
+            "math_index": rng.uniform(10, 80),
+            "speed_index": rng.uniform(10, 80),
+            "price_input": rng.uniform(0.05, 15),
+            "price_output": rng.uniform(0.1, 60),
+            "speed_tokens_per_sec": rng.uniform(20, 400),
+            "ttft_seconds": rng.uniform(0.1, 3),
+        }
+        for i in range(count)
+    ]
+
+
+def make_history(
+    models: list[dict[str, Any]], days: int, churn: float, seed: int = 11
+) -> list[list[dict[str, Any]]]:
+    """One model list per day; ``churn`` of the models change price daily."""
+    rng = random.Random(seed)
+    history = []
+    current = [dict(m) for m in models]
+    for _ in range(days):
+        for model in rng.sample(current, int(len(current) * churn)):
+            model["price_input"] *= rng.uniform(0.8, 1.2)
+        history.append([dict(m) for m in current])
+    return history
+
+
+def legacy_save(path: Path, models: list[dict[str, Any]], day: str) -> None:
+    conn = sqlite3.connect(str(path))
+    conn.execute(_CREATE_TABLE_SQL)
+    conn.commit()
+    for model in models:
+        conn.execute(_LEGACY_INSERT_SQL, (*_snapshot_row(model), day))
+    conn.commit()
+    conn.close()
+
+
+def legacy_previous(path: Path, day: str) -> list[tuple[Any, ...]]:
+    conn = sqlite3.connect(str(path))
+    conn.execute(_CREATE_TABLE_SQL)
+    conn.commit()
+    row = conn.execute(_LEGACY_PREVIOUS_DATE_SQL, (day,)).fetchone()
+    rows = conn.execute(_SELECT_SNAPSHOT_SQL, (row[0],)).fetchall() if row else []
+    conn.close()
+    return rows
+
+
+def run(history: list[list[dict[str, Any]]], days: list[str], tmp: Path) -> None:
+    legacy_db = tmp / "legacy.db"
+    start = time.perf_counter()
+    for day, models in zip(days, history):
+        legacy_save(legacy_db, models, day)
+    legacy_write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for day in days:
+        legacy_previous(legacy_db, day)
+    legacy_read = time.perf_counter() - start
+
+    repo_db = tmp / "repo.db"
+    start = time.perf_counter()
+    with SnapshotRepository(repo_db) as repo:
+        for day, models in zip(days, history):
+            repo.save(models, day)
+        repo_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for day in days:
+            prev = repo.previous_date(day)
+            if prev:
+                repo.snapshot(prev)
+        repo_read = time.perf_counter() - start
+
+        legacy_rows = sqlite3.connect(legacy_db).execute(
+            "SELECT COUNT(*) FROM model_snapshots"
+        ).fetchone()[0]
+        repo_rows = repo.conn.execute(
+            "SELECT COUNT(*) FROM model_versions"
+        ).fetchone()[0]
+        repo.conn.execute("VACUUM")
+
+    legacy_mb = legacy_db.stat().st_size / 1e6
+    repo_mb = repo_db.stat().st_size / 1e6
+    print(f"{len(history[0])} models x {len(days)} days")
+    print(f"{'':<22}{'legacy':>12}{'repository':>12}{'ratio':>10}")
+    for label, old, new, fmt in (
+        ("write all days (s)", legacy_write, repo_write, ".2f"),
+        ("previous lookups (s)", legacy_read, repo_read, ".2f"),
+        ("stored rows", legacy_rows, repo_rows, ",d"),
+        ("db size (MB)", legacy_mb, repo_mb, ".1f"),
+    ):
+        print(f"{label:<22}{old:>12{fmt}}{new:>12{fmt}}{old / new:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--churn", type=float, default=0.01)
+    args = parser.parse_args()
+
+    history = make_history(make_models(args.models), args.days, args.churn)
+    first = date(2025, 1, 1)
+    days = [(first + timedelta(days=i)).isoformat() for i in range(args.days)]
+    with tempfile.TemporaryDirectory() as tmp:
+        run(history, days, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
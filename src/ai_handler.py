@@ -2,11 +2,10 @@
 
 import json
 import logging
-import time
 
 import google.generativeai as genai
 
-from src import config
+from src import config, metrics
 from src.scraper import Article
 
 logger = logging.getLogger(__name__)
@@ -29,6 +28,19 @@ def keyword_filter(articles: list[Article]) -> list[Article]:
     return filtered
 
 
+def _count_tokens(response: object) -> None:
+    """Add a response's token usage (if reported) to the run counters."""
+    usage = getattr(response, "usage_metadata", None)
+    for counter, attr in (
+        ("tokens.prompt", "prompt_token_count"),
+        ("tokens.output", "candidates_token_count"),
+    ):
+        count = getattr(usage, attr, None)
+        if isinstance(count, int):
+            metrics.incr(counter, count)
+
+
+@metrics.timed("gemini.batch")
 def _process_batch(
     model: "genai.GenerativeModel",
     batch: list[Article],
@@ -79,7 +91,9 @@ def _process_batch(
 
     for attempt in range(4):
         try:
+            metrics.incr("http.gemini")
             response = model.generate_content(prompt)
+            _count_tokens(response)
             response_text = response.text
 
             response_data = json.loads(response_text)
@@ -103,7 +117,8 @@ def _process_batch(
                 except (json.JSONDecodeError, IndexError):
                     pass
             if attempt < 3:
-                time.sleep(backoff_times[min(attempt, 2)])
+                metrics.incr("retries.gemini")
+                metrics.sleep("gemini_backoff", backoff_times[min(attempt, 2)])
 
         except Exception as e:
             error_str = str(e)
@@ -117,7 +132,8 @@ def _process_batch(
                     wait,
                     attempt + 1,
                 )
-                time.sleep(wait)
+                metrics.incr("retries.gemini")
+                metrics.sleep("gemini_backoff", wait)
             else:
                 logger.error(
                     "Batch %d: Gemini call failed (attempt %d): %s",
@@ -147,6 +163,7 @@ def _process_batch(
         )
 
 
+@metrics.timed("gemini.summarize")
 def batch_summarize(articles: list[Article]) -> list[Article]:
     """Call Gemini in BATCH_SIZE groups for relevance scores + Korean summaries.
 
@@ -196,7 +213,7 @@ def batch_summarize(articles: list[Article]) -> list[Article]:
             is_last_batch_in_group = (i + batch_size >= len(group_articles))
             is_last_group = (group_idx == len(all_groups) - 1)
             if not (is_last_batch_in_group and is_last_group):
-                time.sleep(2)
+                metrics.sleep("gemini_pacing", 2)
 
     return articles
 
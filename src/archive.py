@@ -0,0 +1,373 @@
+"""Monthly compaction of daily article JSON into compressed columnar archives.
+
+Closed months (``data/YYYY/MM/DD.json``) are rolled into a single
+``data/YYYY/MM.archive.json.gz`` file. Inside the archive every article field is
+stored as one column; ``source`` and ``tags`` are dictionary-encoded and the
+whole document is gzip-compressed, so repetitive text columns (URLs, summaries)
+compress far better than the row-oriented, pretty-printed daily files.
+
+Readers should go through :func:`load_day` / :func:`iter_days`, which serve
+compacted and raw days transparently.
+
+Usage:
+    uv run python -m src.archive            # compact all closed months
+    uv run python -m src.archive --dry-run  # report what would be compacted
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path("data")
+ARCHIVE_SUFFIX = ".archive.json.gz"
+ARCHIVE_FORMAT = "insightflow-columnar"
+ARCHIVE_VERSION = 1
+
+# Column order mirrors the daily JSON record layout (Article field order).
+_TEXT_COLUMNS = (
+    "source_id",
+    "title",
+    "url",
+    "discussion_url",
+    "summary",
+    "published_at",
+    "ai_summary",
+)
+_FIELD_ORDER = (
+    "source",
+    "source_id",
+    "title",
+    "url",
+    "discussion_url",
+    "summary",
+    "score",
+    "published_at",
+    "ai_summary",
+    "relevance_score",
+    "notable",
+    "tags",
+)
+
+
+def _archive_path(year: str, month: str) -> Path:
+    return DATA_DIR / year / f"{month}{ARCHIVE_SUFFIX}"
+
+
+def _raw_day_files(year: str, month: str) -> list[Path]:
+    month_dir = DATA_DIR / year / month
+    if not month_dir.is_dir():
+        return []
+    return sorted(p for p in month_dir.glob("*.json") if p.stem.isdigit())
+
+
+def _read_raw_day(path: Path) -> list[dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"Unexpected daily file layout in {path}")
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Columnar encoding
+# ---------------------------------------------------------------------------
+
+
+def encode_month(days: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+    """Encode ``{"DD": [record, ...]}`` into the columnar archive document."""
+    sources: list[str] = []
+    source_codes: dict[str, int] = {}
+    tags: list[str] = []
+    tag_codes: dict[str, int] = {}
+
+    columns: dict[str, list[Any]] = {name: [] for name in _FIELD_ORDER}
+    day_index: list[list[Any]] = []
+
+    for day in sorted(days):
+        records = days[day]
+        day_index.append([day, len(records)])
+        for record in records:
+            source = str(record.get("source", ""))
+            if source not in source_codes:
+                source_codes[source] = len(sources)
+                sources.append(source)
+            columns["source"].append(source_codes[source])
+
+            for name in _TEXT_COLUMNS:
+                columns[name].append(record.get(name, ""))
+            columns["score"].append(record.get("score", 0))
+            columns["relevance_score"].append(record.get("relevance_score", 0.0))
+            columns["notable"].append(1 if record.get("notable") else 0)
+
+            # Older records predate tagging; None keeps the key absent on decode.
+            raw_tags = record.get("tags")
+            if raw_tags is None:
+                columns["tags"].append(None)
+            else:
+                codes: list[int] = []
+                for tag in raw_tags:
+                    if tag not in tag_codes:
+                        tag_codes[tag] = len(tags)
+                        tags.append(tag)
+                    codes.append(tag_codes[tag])
+                columns["tags"].append(codes)
+
+    return {
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "days": day_index,
+        "dictionaries": {"source": sources, "tags": tags},
+        "columns": columns,
+    }
+
+
+def decode_month(document: dict[str, Any]) -> dict[str, list[dict[str, Any]]]:
+    """Decode a columnar archive document back into daily record lists."""
+    if document.get("format") != ARCHIVE_FORMAT:
+        raise ValueError("Not an InsightFlow columnar archive")
+    if document.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported archive version: {document.get('version')}")
+
+    sources: list[str] = document["dictionaries"]["source"]
+    tags: list[str] = document["dictionaries"]["tags"]
+    columns: dict[str, list[Any]] = document["columns"]
+
+    days: dict[str, list[dict[str, Any]]] = {}
+    row = 0
+    for day, count in document["days"]:
+        records: list[dict[str, Any]] = []
+        for i in range(row, row + count):
+            record: dict[str, Any] = {}
+            for name in _FIELD_ORDER:
+                value = columns[name][i]
+                if name == "source":
+                    value = sources[value]
+                elif name == "notable":
+                    value = bool(value)
+                elif name == "tags":
+                    if value is None:
+                        continue
+                    value = [tags[code] for code in value]
+                record[name] = value
+            records.append(record)
+        days[day] = records
+        row += count
+    return days
+
+
+def _write_archive(path: Path, days: dict[str, list[dict[str, Any]]]) -> None:
+    """Atomically write a month archive (deterministic bytes for git)."""
+    payload = json.dumps(
+        encode_month(days), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+            filename="", mode="wb", fileobj=raw, compresslevel=9, mtime=0
+        ) as gz:
+            gz.write(payload)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def read_archive(path: Path) -> dict[str, list[dict[str, Any]]]:
+    """Read a month archive into ``{"DD": [record, ...]}``."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return decode_month(json.load(f))
+
+
+# ---------------------------------------------------------------------------
+# Transparent reader
+# ---------------------------------------------------------------------------
+
+
+def load_archived_day(date_str: str) -> list[dict[str, Any]]:
+    """Return the compacted records for a day, or [] if it is not archived."""
+    year, month, day = date_str.split("-")
+    path = _archive_path(year, month)
+    if not path.exists():
+        return []
+    return read_archive(path).get(day, [])
+
+
+def load_day(date_str: str) -> list[dict[str, Any]]:
+    """Return a day's records, reading the raw file or the month archive.
+
+    A raw ``DD.json`` always takes precedence over the archived copy, since it
+    is only (re)created after compaction by writers that started from the
+    archived records.
+    """
+    parts = date_str.split("-")
+    if len(parts) != 3:
+        raise ValueError(f"Invalid date format: {date_str}, expected YYYY-MM-DD")
+    year, month, day = parts
+
+    raw_path = DATA_DIR / year / month / f"{day}.json"
+    if raw_path.exists():
+        return _read_raw_day(raw_path)
+    return load_archived_day(date_str)
+
+
+def _month_keys() -> list[tuple[str, str]]:
+    keys: set[tuple[str, str]] = set()
+    if not DATA_DIR.is_dir():
+        return []
+    for year_dir in DATA_DIR.iterdir():
+        if not (year_dir.is_dir() and year_dir.name.isdigit()):
+            continue
+        for entry in year_dir.iterdir():
+            if entry.is_dir() and entry.name.isdigit():
+                keys.add((year_dir.name, entry.name))
+            elif entry.name.endswith(ARCHIVE_SUFFIX):
+                keys.add((year_dir.name, entry.name[: -len(ARCHIVE_SUFFIX)]))
+    return sorted(keys)
+
+
+def iter_days(
+    start: str | None = None,
+    end: str | None = None,
+) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+    """Yield ``(YYYY-MM-DD, records)`` in date order across raw and compacted days.
+
+    Args:
+        start: Inclusive lower bound (YYYY-MM-DD), or None for no bound.
+        end: Inclusive upper bound (YYYY-MM-DD), or None for no bound.
+    """
+    for year, month in _month_keys():
+        prefix = f"{year}-{month}"
+        if start and prefix < start[:7]:
+            continue
+        if end and prefix > end[:7]:
+            continue
+
+        archive = _archive_path(year, month)
+        days: dict[str, list[dict[str, Any]]] = (
+            read_archive(archive) if archive.exists() else {}
+        )
+        for raw_path in _raw_day_files(year, month):
+            try:
+                days[raw_path.stem] = _read_raw_day(raw_path)
+            except (json.JSONDecodeError, OSError, ValueError):
+                logger.warning("Skipping unreadable daily file %s", raw_path)
+
+        for day in sorted(days):
+            date_str = f"{prefix}-{day}"
+            if (start and date_str < start) or (end and date_str > end):
+                continue
+            yield date_str, days[day]
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+
+def compact_month(year: str, month: str, dry_run: bool = False) -> Path | None:
+    """Fold a month's raw day files into its archive and delete them.
+
+    Incremental: raw days are merged into an existing archive, replacing any
+    archived copy of the same day. Idempotent: with no raw files left the month
+    is skipped, and an interrupted run (archive written, raw files not yet
+    removed) converges to the same archive on the next run.
+
+    Returns:
+        The archive path if anything was compacted, otherwise None.
+    """
+    raw_files = _raw_day_files(year, month)
+    if not raw_files:
+        return None
+
+    path = _archive_path(year, month)
+    days = read_archive(path) if path.exists() else {}
+    archived_before = sum(len(records) for records in days.values())
+
+    for raw_path in raw_files:
+        days[raw_path.stem] = _read_raw_day(raw_path)
+
+    total = sum(len(records) for records in days.values())
+    if dry_run:
+        logger.info(
+            "[DRY RUN] Would compact %d day file(s) into %s (%d -> %d articles)",
+            len(raw_files),
+            path,
+            archived_before,
+            total,
+        )
+        return path
+
+    _write_archive(path, days)
+    for raw_path in raw_files:
+        raw_path.unlink()
+    month_dir = DATA_DIR / year / month
+    if not any(month_dir.iterdir()):
+        month_dir.rmdir()
+
+    logger.info(
+        "Compacted %d day file(s) into %s (%d articles, %d bytes)",
+        len(raw_files),
+        path,
+        total,
+        path.stat().st_size,
+    )
+    return path
+
+
+def compact_closed_months(
+    today: date | None = None,
+    dry_run: bool = False,
+) -> list[Path]:
+    """Compact every month strictly before ``today``'s month.
+
+    The current month is left alone because the daily run still appends to it.
+    """
+    today = today or datetime.now().date()
+    current = f"{today.year:04d}-{today.month:02d}"
+
+    compacted: list[Path] = []
+    for year, month in _month_keys():
+        if f"{year}-{month}" >= current:
+            continue
+        path = compact_month(year, month, dry_run=dry_run)
+        if path is not None:
+            compacted.append(path)
+
+    logger.info("Compaction finished: %d month(s) updated", len(compacted))
+    return compacted
+
+
+def cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compact closed months of daily article JSON into archives",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=False,
+        help="Report what would be compacted without touching any files",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(levelname)s - %(message)s",
+    )
+    args = cli()
+    compact_closed_months(dry_run=args.dry_run)
@@ -0,0 +1,63 @@
+"""Fast encoders/decoders for :class:`~src.scraper.Article`.
+
+``dataclasses.asdict`` recursively deep-copies every field, which dominates the
+cost of serializing large archive loads. The helpers here build records field by
+field instead, for the daily ``DD.json`` layout (``encode_json``/
+``decode_json``): one object per article with keys in field order.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from src.scraper import Article
+
+
+def article_to_dict(article: Article) -> dict[str, Any]:
+    """Shallow record for ``article`` (only the tags list is copied)."""
+    return {
+        "source": article.source,
+        "source_id": article.source_id,
+        "title": article.title,
+        "url": article.url,
+        "discussion_url": article.discussion_url,
+        "summary": article.summary,
+        "score": article.score,
+        "published_at": article.published_at,
+        "ai_summary": article.ai_summary,
+        "relevance_score": article.relevance_score,
+        "notable": article.notable,
+        "tags": list(article.tags),
+    }
+
+
+def article_from_dict(data: dict[str, Any]) -> Article:
+    """Build an Article from a daily-JSON record; missing optional keys use defaults."""
+    get = data.get
+    return Article(
+        data["source"],
+        data["source_id"],
+        data["title"],
+        data["url"],
+        data["discussion_url"],
+        data["summary"],
+        data["score"],
+        data["published_at"],
+        get("ai_summary", ""),
+        get("relevance_score", 0.0),
+        get("notable", False),
+        list(get("tags") or []),
+    )
+
+
+def encode_json(articles: list[Article], indent: int | None = None) -> str:
+    """Encode articles as a JSON array of daily-format records."""
+    return json.dumps(
+        [article_to_dict(a) for a in articles], indent=indent, ensure_ascii=False
+    )
+
+
+def decode_json(text: str | bytes) -> list[Article]:
+    return [article_from_dict(item) for item in json.loads(text)]
+
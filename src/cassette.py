@@ -0,0 +1,818 @@
+"""Record/replay of every external call, for offline and reproducible runs.
+
+``use_cassette(directory, "record")`` wraps a run and captures each response
+together with its latency; ``"replay"`` serves them back instead of touching
+the network, sleeping for the recorded latencies (scaled by
+``latency_scale``). The interception points cover every client the pipeline
+uses:
+
+- ``requests`` (TLDR, Telegram, GitHub) at ``HTTPAdapter.send``;
+- ``aiohttp`` (Hacker News, Artificial Analysis) at ``ClientSession._request``;
+- ``httpx`` (Notion, sync and async) at the HTTP transports;
+- ``urllib`` (``feedparser.parse`` for GeekNews) at ``OpenerDirector.open``;
+- Gemini at ``GenerativeModel.generate_content``, keyed by a prompt hash
+  (the SDK talks gRPC, below any HTTP client).
+
+Responses are matched on method and URL and served in recorded order; a
+key asked for more often than recorded gets its last response again, an
+unknown key fails like a connection error and is counted in ``misses``.
+
+A cassette is a directory: ``interactions.json``, plus in record mode a copy
+of the top-level ``data/`` files as they were before the run (``state/``).
+``replay_sandbox()`` restores that copy into a temporary working directory,
+so a replay starts from the recorded state and never touches the real
+``data/``. During a replay the ``datetime`` of ``src`` modules is shifted to
+the recorded start, so date cutoffs and keys match the recording. API keys
+are not stored: they are redacted from URLs and text bodies, and replaced
+by the same URL-safe ``REDACTED_<NAME>`` placeholders on replay.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import http
+import http.client
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import urllib.response
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import google.generativeai as genai
+import httpx
+import requests
+import requests.adapters
+from multidict import CIMultiDict, CIMultiDictProxy
+from requests.structures import CaseInsensitiveDict
+from yarl import URL
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Credentials: recorded as "REDACTED_<NAME>", which replays use as the value
+SECRET_SETTINGS = (
+    "GEMINI_API_KEY",
+    "TELEGRAM_BOT_TOKEN",
+    "NOTION_API_KEY",
+    "ARTIFICIAL_ANALYSIS_API_KEY",
+    "GITHUB_TOKEN",
+)
+# Identifiers that end up in URLs and bodies: recorded and restored as-is
+ID_SETTINGS = (
+    "TELEGRAM_CHAT_ID",
+    "NOTION_DATABASE_ID",
+    "NOTION_PARENT_PAGE_ID",
+    "NOTION_MODEL_TRACKER_DB_ID",
+    "GITHUB_REPOSITORY",
+)
+
+# Bodies are stored decoded, so these no longer describe them
+_DROPPED_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+
+class CassetteMiss(LookupError):
+    """A replayed run asked for a response that was never recorded."""
+
+
+def _placeholder(name: str) -> str:
+    return f"REDACTED_{name}"
+
+
+def _get_setting(name: str) -> str | None:
+    # GITHUB_* are read from the environment by storage.py, the rest by config
+    if hasattr(config, name):
+        return getattr(config, name)
+    return os.environ.get(name)
+
+
+def _set_setting(stack: ExitStack, name: str, value: str | None) -> None:
+    if hasattr(config, name):
+        stack.callback(setattr, config, name, getattr(config, name))
+        setattr(config, name, value)
+        return
+    previous = os.environ.get(name)
+    stack.callback(_set_env, name, previous)
+    _set_env(name, value)
+
+
+def _set_env(name: str, value: str | None) -> None:
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+
+def _reason(status: int) -> str:
+    try:
+        return http.HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+class Cassette:
+    """Recorded interactions of one run, and the state it started from."""
+
+    def __init__(
+        self, directory: str | Path, mode: str, latency_scale: float = 1.0
+    ) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode {mode!r}")
+        self.directory = Path(directory).resolve()
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.metadata: dict[str, Any] = {}
+        self.interactions: list[dict[str, Any]] = []
+        self.misses: list[str] = []
+        self.served = 0
+        self._queues: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._secrets: dict[str, str] = {}
+        if mode == "replay":
+            self._load()
+
+    @property
+    def interactions_path(self) -> Path:
+        return self.directory / "interactions.json"
+
+    @property
+    def state_dir(self) -> Path:
+        return self.directory / "state"
+
+    def _load(self) -> None:
+        with open(self.interactions_path, encoding="utf-8") as f:
+            document = json.load(f)
+        if document.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"{self.interactions_path}: unsupported cassette version "
+                f"{document.get('version')!r}"
+            )
+        self.metadata = document["metadata"]
+        self.interactions = document["interactions"]
+        for entry in self.interactions:
+            key = (entry["method"], entry["url"])
+            self._queues.setdefault(key, []).append(entry)
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.interactions_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": FORMAT_VERSION,
+                    "metadata": self.metadata,
+                    "interactions": self.interactions,
+                },
+                f,
+                ensure_ascii=False,
+                indent=1,
+            )
+        logger.info(
+            "Recorded %d interactions to %s",
+            len(self.interactions),
+            self.interactions_path,
+        )
+
+    def snapshot_state(self, data_dir: Path) -> None:
+        """Copy the top-level files of ``data_dir`` (the run's inputs)."""
+        if self.state_dir.exists():
+            shutil.rmtree(self.state_dir)
+        self.state_dir.mkdir(parents=True)
+        if not data_dir.is_dir():
+            return
+        for path in data_dir.iterdir():
+            if path.is_file() and not path.name.endswith(("-wal", "-shm")):
+                shutil.copy2(path, self.state_dir / path.name)
+
+    def redact(self, text: str) -> str:
+        for name, value in self._secrets.items():
+            text = text.replace(value, _placeholder(name))
+        return text
+
+    def record(
+        self,
+        transport: str,
+        method: str,
+        url: str,
+        latency: float,
+        status: int | None = None,
+        headers: list[tuple[str, str]] | None = None,
+        body: bytes | None = None,
+        **extra: Any,
+    ) -> dict[str, Any]:
+        entry: dict[str, Any] = {
+            "transport": transport,
+            "method": method,
+            "url": self.redact(url),
+            "latency_s": round(latency, 4),
+        }
+        if status is not None:
+            entry["status"] = status
+        if headers is not None:
+            entry["headers"] = [list(item) for item in headers]
+        if body is not None:
+            try:
+                entry["body"] = self.redact(body.decode("utf-8"))
+            except UnicodeDecodeError:
+                entry["body_b64"] = base64.b64encode(body).decode("ascii")
+        entry.update(extra)
+        with self._lock:
+            self.interactions.append(entry)
+        return entry
+
+    def take(self, method: str, url: str) -> dict[str, Any]:
+        """The next recorded response for ``method url``; raises CassetteMiss."""
+        key = (method, self.redact(url))
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                self.misses.append(f"{method} {key[1]}")
+                logger.error("Cassette miss: %s %s", method, key[1])
+                raise CassetteMiss(f"no recorded response for {method} {key[1]}")
+            entry = queue.pop(0) if len(queue) > 1 else queue[0]
+            self.served += 1
+        return entry
+
+    def delay(self, entry: dict[str, Any]) -> float:
+        return entry.get("latency_s", 0.0) * self.latency_scale
+
+    def apply_settings(self, stack: ExitStack) -> None:
+        """Record (or, on replay, restore) credentials and identifiers."""
+        if self.mode == "record":
+            self._secrets = {
+                name: value
+                for name in SECRET_SETTINGS
+                if (value := _get_setting(name))
+            }
+            self.metadata.update(
+                started_at=datetime.now(timezone.utc).isoformat(),
+                secrets=sorted(self._secrets),
+                settings={name: _get_setting(name) for name in ID_SETTINGS},
+            )
+            return
+        recorded = set(self.metadata.get("secrets", ()))
+        for name in SECRET_SETTINGS:
+            value = _placeholder(name) if name in recorded else None
+            _set_setting(stack, name, value)
+            if value:
+                self._secrets[name] = value
+        for name, value in self.metadata.get("settings", {}).items():
+            _set_setting(stack, name, value)
+
+
+def body_of(entry: dict[str, Any]) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def _kept_headers(headers: Any) -> list[tuple[str, str]]:
+    return [(k, v) for k, v in headers if k.lower() not in _DROPPED_HEADERS]
+
+
+def _patch(stack: ExitStack, owner: Any, name: str, replacement: Any) -> Any:
+    original = getattr(owner, name)
+    setattr(owner, name, replacement)
+    stack.callback(setattr, owner, name, original)
+    return original
+
+
+# ---------------------------------------------------------------------------
+# requests (TLDR, Telegram, GitHub)
+# ---------------------------------------------------------------------------
+
+
+def _requests_response(
+    request: requests.PreparedRequest, entry: dict[str, Any]
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = _reason(entry["status"])
+    response.headers = CaseInsensitiveDict(dict(entry.get("headers", [])))
+    response._content = body_of(entry)
+    response.url = request.url or ""
+    response.request = request
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.elapsed = timedelta(seconds=entry.get("latency_s", 0.0))
+    return response
+
+
+def _intercept_requests(stack: ExitStack, cassette: Cassette) -> None:
+    original: Callable[..., requests.Response]
+
+    def send(
+        adapter: requests.adapters.HTTPAdapter,
+        request: requests.PreparedRequest,
+        **kwargs: Any,
+    ) -> requests.Response:
+        method, url = request.method or "GET", request.url or ""
+        if cassette.mode == "replay":
+            try:
+                entry = cassette.take(method, url)
+            except CassetteMiss as e:
+                raise requests.ConnectionError(str(e), request=request) from e
+            time.sleep(cassette.delay(entry))
+            if "error" in entry:
+                raise requests.ConnectionError(entry["error"], request=request)
+            return _requests_response(request, entry)
+
+        start = time.perf_counter()
+        try:
+            response = original(adapter, request, **kwargs)
+            body = response.content
+        except requests.RequestException as e:
+            cassette.record(
+                "requests", method, url, time.perf_counter() - start, error=str(e)
+            )
+            raise
+        cassette.record(
+            "requests",
+            method,
+            url,
+            time.perf_counter() - start,
+            status=response.status_code,
+            headers=_kept_headers(response.headers.items()),
+            body=body,
+        )
+        return response
+
+    original = _patch(stack, requests.adapters.HTTPAdapter, "send", send)
+
+
+# ---------------------------------------------------------------------------
+# aiohttp (Hacker News, Artificial Analysis)
+# ---------------------------------------------------------------------------
+
+
+class _AiohttpContent:
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+        self._pos = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self._body) if n < 0 else self._pos + n
+        chunk = self._body[self._pos : end]
+        self._pos += len(chunk)
+        return chunk
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while chunk := await self.read(n):
+            yield chunk
+
+    async def iter_any(self) -> AsyncIterator[bytes]:
+        if chunk := await self.read():
+            yield chunk
+
+
+class _AiohttpResponse:
+    """The parts of ``aiohttp.ClientResponse`` the pipeline uses."""
+
+    def __init__(self, method: str, url: str, entry: dict[str, Any]) -> None:
+        self.method = method
+        self.url = URL(url)
+        self.status: int = entry["status"]
+        self.reason = _reason(self.status)
+        self.headers = CIMultiDictProxy(CIMultiDict(entry.get("headers", [])))
+        self._body = body_of(entry)
+        self.content = _AiohttpContent(self._body)
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def request_info(self) -> aiohttp.RequestInfo:
+        return aiohttp.RequestInfo(
+            self.url, self.method, CIMultiDictProxy(CIMultiDict()), self.url
+        )
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise aiohttp.ClientResponseError(
+                self.request_info,
+                (),
+                status=self.status,
+                message=self.reason,
+                headers=self.headers,
+            )
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str | None = None, errors: str = "strict") -> str:
+        return self._body.decode(encoding or "utf-8", errors)
+
+    async def json(
+        self,
+        *,
+        encoding: str | None = None,
+        loads: Callable[[str], Any] = json.loads,
+        content_type: str | None = "application/json",
+    ) -> Any:
+        text = await self.text(encoding)
+        return loads(text) if text.strip() else None
+
+    def release(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    async def wait_for_close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> _AiohttpResponse:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+
+def _intercept_aiohttp(stack: ExitStack, cassette: Cassette) -> None:
+    original: Callable[..., Any]
+
+    async def request(
+        session: aiohttp.ClientSession, method: str, str_or_url: Any, **kwargs: Any
+    ) -> _AiohttpResponse:
+        url = URL(str_or_url)
+        if kwargs.get("params"):
+            url = url.update_query(kwargs["params"])
+        method = method.upper()
+        if cassette.mode == "replay":
+            try:
+                entry = cassette.take(method, str(url))
+            except CassetteMiss as e:
+                raise aiohttp.ClientConnectionError(str(e)) from e
+            await asyncio.sleep(cassette.delay(entry))
+            if "error" in entry:
+                raise aiohttp.ClientConnectionError(entry["error"])
+            return _AiohttpResponse(method, str(url), entry)
+
+        start = time.perf_counter()
+        try:
+            response = await original(session, method, str_or_url, **kwargs)
+            try:
+                body = await response.read()
+            finally:
+                response.release()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            cassette.record(
+                "aiohttp",
+                method,
+                str(url),
+                time.perf_counter() - start,
+                error=str(e) or type(e).__name__,
+            )
+            raise
+        entry = cassette.record(
+            "aiohttp",
+            method,
+            str(url),
+            time.perf_counter() - start,
+            status=response.status,
+            headers=_kept_headers(response.headers.items()),
+            body=body,
+        )
+        return _AiohttpResponse(method, str(url), entry)
+
+    original = _patch(stack, aiohttp.ClientSession, "_request", request)
+
+
+# ---------------------------------------------------------------------------
+# httpx (Notion)
+# ---------------------------------------------------------------------------
+
+
+def _httpx_response(request: httpx.Request, entry: dict[str, Any]) -> httpx.Response:
+    return httpx.Response(
+        entry["status"],
+        headers=entry.get("headers", []),
+        content=body_of(entry),
+        request=request,
+    )
+
+
+def _intercept_httpx(stack: ExitStack, cassette: Cassette) -> None:
+    original_sync: Callable[..., httpx.Response]
+    original_async: Callable[..., Any]
+
+    def replay(request: httpx.Request) -> dict[str, Any]:
+        try:
+            entry = cassette.take(request.method, str(request.url))
+        except CassetteMiss as e:
+            raise httpx.ConnectError(str(e), request=request) from e
+        return entry
+
+    def record(
+        request: httpx.Request, start: float, response: httpx.Response
+    ) -> httpx.Response:
+        entry = cassette.record(
+            "httpx",
+            request.method,
+            str(request.url),
+            time.perf_counter() - start,
+            status=response.status_code,
+            headers=_kept_headers(response.headers.multi_items()),
+            body=response.content,
+        )
+        return _httpx_response(request, entry)
+
+    def record_error(request: httpx.Request, start: float, error: Exception) -> None:
+        cassette.record(
+            "httpx",
+            request.method,
+            str(request.url),
+            time.perf_counter() - start,
+            error=str(error) or type(error).__name__,
+        )
+
+    def handle_request(
+        transport: httpx.HTTPTransport, request: httpx.Request
+    ) -> httpx.Response:
+        if cassette.mode == "replay":
+            entry = replay(request)
+            time.sleep(cassette.delay(entry))
+            if "error" in entry:
+                raise httpx.ConnectError(entry["error"], request=request)
+            return _httpx_response(request, entry)
+        start = time.perf_counter()
+        try:
+            response = original_sync(transport, request)
+            try:
+                response.read()
+            finally:
+                response.close()
+        except httpx.TransportError as e:
+            record_error(request, start, e)
+            raise
+        return record(request, start, response)
+
+    async def handle_async_request(
+        transport: httpx.AsyncHTTPTransport, request: httpx.Request
+    ) -> httpx.Response:
+        if cassette.mode == "replay":
+            entry = replay(request)
+            await asyncio.sleep(cassette.delay(entry))
+            if "error" in entry:
+                raise httpx.ConnectError(entry["error"], request=request)
+            return _httpx_response(request, entry)
+        start = time.perf_counter()
+        try:
+            response = await original_async(transport, request)
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+        except httpx.TransportError as e:
+            record_error(request, start, e)
+            raise
+        return record(request, start, response)
+
+    original_sync = _patch(stack, httpx.HTTPTransport, "handle_request", handle_request)
+    original_async = _patch(
+        stack, httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request
+    )
+
+
+# ---------------------------------------------------------------------------
+# urllib (feedparser)
+# ---------------------------------------------------------------------------
+
+
+def _urllib_result(entry: dict[str, Any], url: str) -> urllib.response.addinfourl:
+    """The recorded response, or the HTTPError it was raised as."""
+    headers = http.client.HTTPMessage()
+    for name, value in entry.get("headers", []):
+        headers[name] = value
+    status = entry["status"]
+    response = urllib.response.addinfourl(
+        io.BytesIO(body_of(entry)), headers, entry.get("final_url", url), status
+    )
+    if entry.get("raised"):
+        raise urllib.error.HTTPError(url, status, _reason(status), headers, response)
+    return response
+
+
+def _intercept_urllib(stack: ExitStack, cassette: Cassette) -> None:
+    original: Callable[..., Any]
+
+    def open_url(
+        opener: urllib.request.OpenerDirector,
+        fullurl: str | urllib.request.Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        if isinstance(fullurl, urllib.request.Request):
+            method, url = fullurl.get_method(), fullurl.full_url
+        else:
+            method = "POST" if args or kwargs.get("data") else "GET"
+            url = fullurl
+        if cassette.mode == "replay":
+            try:
+                entry = cassette.take(method, url)
+            except CassetteMiss as e:
+                raise urllib.error.URLError(str(e)) from e
+            time.sleep(cassette.delay(entry))
+            if "error" in entry:
+                raise urllib.error.URLError(entry["error"])
+            return _urllib_result(entry, url)
+
+        start = time.perf_counter()
+        raised = False
+        try:
+            response = original(opener, fullurl, *args, **kwargs)
+        except urllib.error.HTTPError as e:
+            response, raised = e, True
+        except (urllib.error.URLError, OSError) as e:
+            cassette.record(
+                "urllib", method, url, time.perf_counter() - start, error=str(e)
+            )
+            raise
+        body = response.read()
+        response.close()
+        entry = cassette.record(
+            "urllib",
+            method,
+            url,
+            time.perf_counter() - start,
+            status=response.getcode(),
+            headers=list(response.headers.items()),
+            body=body,
+            final_url=cassette.redact(response.geturl()),
+            raised=raised,
+        )
+        return _urllib_result(entry, url)
+
+    original = _patch(stack, urllib.request.OpenerDirector, "open", open_url)
+
+
+# ---------------------------------------------------------------------------
+# Gemini
+# ---------------------------------------------------------------------------
+
+
+class _GeminiUsage:
+    def __init__(self, usage: dict[str, int]) -> None:
+        self.prompt_token_count = usage.get("prompt_token_count")
+        self.candidates_token_count = usage.get("candidates_token_count")
+
+
+class _GeminiResponse:
+    """``.text`` and ``.usage_metadata``, as read by ai_handler."""
+
+    def __init__(self, entry: dict[str, Any]) -> None:
+        self.text = body_of(entry).decode("utf-8")
+        self.usage_metadata = _GeminiUsage(entry.get("usage", {}))
+
+
+class ReplayedError(RuntimeError):
+    """A recorded SDK failure raised again (same message, so retry logic
+    that inspects it behaves the same)."""
+
+
+def _intercept_gemini(stack: ExitStack, cassette: Cassette) -> None:
+    original: Callable[..., Any]
+
+    def generate_content(
+        model: genai.GenerativeModel, contents: Any, *args: Any, **kwargs: Any
+    ) -> Any:
+        digest = hashlib.sha1(str(contents).encode("utf-8")).hexdigest()
+        url = f"gemini:{model.model_name}:{digest}"
+        if cassette.mode == "replay":
+            try:
+                entry = cassette.take("generate_content", url)
+            except CassetteMiss as e:
+                raise ReplayedError(str(e)) from e
+            time.sleep(cassette.delay(entry))
+            if "error" in entry:
+                raise ReplayedError(entry["error"])
+            return _GeminiResponse(entry)
+
+        start = time.perf_counter()
+        try:
+            response = original(model, contents, *args, **kwargs)
+            text = response.text
+        except Exception as e:
+            cassette.record(
+                "gemini",
+                "generate_content",
+                url,
+                time.perf_counter() - start,
+                error=str(e),
+            )
+            raise
+        usage = getattr(response, "usage_metadata", None)
+        cassette.record(
+            "gemini",
+            "generate_content",
+            url,
+            time.perf_counter() - start,
+            body=text.encode("utf-8"),
+            usage={
+                attr: getattr(usage, attr)
+                for attr in ("prompt_token_count", "candidates_token_count")
+                if isinstance(getattr(usage, attr, None), int)
+            },
+        )
+        return response
+
+    original = _patch(
+        stack, genai.GenerativeModel, "generate_content", generate_content
+    )
+
+
+# ---------------------------------------------------------------------------
+# Clock shift and entry points
+# ---------------------------------------------------------------------------
+
+
+def _shift_clock(stack: ExitStack, offset: timedelta) -> None:
+    """Make ``datetime.now()`` in ``src`` modules run ``offset`` ahead."""
+
+    real = datetime
+
+    class ShiftedDatetime(datetime):
+        @classmethod
+        def now(cls, tz: Any = None) -> datetime:  # type: ignore[override]
+            return real.now(tz) + offset
+
+    for name, module in list(sys.modules.items()):
+        if (
+            name.startswith("src.")
+            and name != __name__
+            and getattr(module, "datetime", None) is real
+        ):
+            _patch(stack, module, "datetime", ShiftedDatetime)
+
+
+@contextmanager
+def use_cassette(
+    directory: str | Path,
+    mode: str,
+    latency_scale: float = 1.0,
+    data_dir: str | Path = "data",
+) -> Iterator[Cassette]:
+    """Record or replay all external calls made inside the block.
+
+    In record mode ``data_dir`` is snapshotted first and the interactions
+    are saved on exit, also when the block raises.
+    """
+    cassette = Cassette(directory, mode, latency_scale)
+    with ExitStack() as stack:
+        cassette.apply_settings(stack)
+        if mode == "record":
+            cassette.snapshot_state(Path(data_dir))
+            stack.callback(cassette.save)
+        else:
+            recorded = datetime.fromisoformat(cassette.metadata["started_at"])
+            _shift_clock(stack, recorded - datetime.now(timezone.utc))
+        _intercept_requests(stack, cassette)
+        _intercept_aiohttp(stack, cassette)
+        _intercept_httpx(stack, cassette)
+        _intercept_urllib(stack, cassette)
+        _intercept_gemini(stack, cassette)
+        yield cassette
+    if mode == "replay":
+        logger.info(
+            "Replayed %d responses from %s (%d misses)",
+            cassette.served,
+            cassette.directory,
+            len(cassette.misses),
+        )
+
+
+@contextmanager
+def replay_sandbox(directory: str | Path) -> Iterator[Path]:
+    """Run inside a temporary directory holding the cassette's ``state/``
+    as ``data/``; the previous working directory is restored on exit."""
+    state = Path(directory).resolve() / "state"
+    previous = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="insightflow-replay-") as tmp:
+        sandbox = Path(tmp)
+        if state.is_dir():
+            shutil.copytree(state, sandbox / "data")
+        else:
+            (sandbox / "data").mkdir()
+        os.chdir(sandbox)
+        try:
+            yield sandbox
+        finally:
+            os.chdir(previous)
@@ -0,0 +1,108 @@
+"""Per-run stage checkpoints so a failed pipeline run can resume cheaply.
+
+Each run id (the run date by default) gets one JSON file under
+``data/checkpoints/``. Every completed stage is written atomically
+(temp file + ``os.replace``), so a crash never leaves a half-written
+checkpoint behind. ``main --resume`` reloads the file and skips every stage
+that is already recorded.
+
+Stages, in order: ``scraped``, ``deduped``, ``summarized``, ``saved`` and one
+``delivered:<target>`` entry per side effect (GitHub, Notion, model tracker,
+Telegram), so each delivery is skipped independently on resume.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+from src.article_codec import article_from_dict, article_to_dict
+from src.scraper import Article
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = Path("data") / "checkpoints"
+
+
+def articles_to_payload(articles: list[Article]) -> list[dict[str, Any]]:
+    return [article_to_dict(article) for article in articles]
+
+
+def articles_from_payload(payload: list[dict[str, Any]]) -> list[Article]:
+    return [article_from_dict(item) for item in payload]
+
+
+class RunCheckpoint:
+    """Stage results for one pipeline run, persisted after every stage."""
+
+    def __init__(self, run_id: str, stages: dict[str, Any] | None = None) -> None:
+        self.run_id = run_id
+        self.stages: dict[str, Any] = stages or {}
+        # Delivery stages run concurrently (src.pipeline) and record here.
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return CHECKPOINT_DIR / f"{self.run_id}.json"
+
+    @classmethod
+    def load(cls, run_id: str) -> RunCheckpoint:
+        """Load the checkpoint for ``run_id``; returns an empty one if missing."""
+        checkpoint = cls(run_id)
+        if not checkpoint.path.exists():
+            logger.info("No checkpoint for run %s, starting from scratch", run_id)
+            return checkpoint
+
+        try:
+            with open(checkpoint.path, encoding="utf-8") as f:
+                data = json.load(f)
+            checkpoint.stages = data.get("stages", {})
+        except (json.JSONDecodeError, OSError):
+            logger.exception(
+                "Failed to load checkpoint %s, starting fresh", checkpoint.path
+            )
+            return cls(run_id)
+
+        logger.info(
+            "Resuming run %s (completed: %s)",
+            run_id,
+            ", ".join(checkpoint.stages) or "nothing",
+        )
+        return checkpoint
+
+    def has(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def get(self, stage: str, default: Any = None) -> Any:
+        return self.stages.get(stage, default)
+
+    def record(self, stage: str, payload: Any = None) -> None:
+        """Mark ``stage`` complete with an optional JSON-serializable payload."""
+        with self._lock:
+            self.stages[stage] = payload
+            self._write()
+
+    def clear(self) -> None:
+        """Delete the checkpoint file (called after a fully successful run)."""
+        self.stages = {}
+        self.path.unlink(missing_ok=True)
+
+    def _write(self) -> None:
+        CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=CHECKPOINT_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"run_id": self.run_id, "stages": self.stages},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
@@ -52,6 +52,46 @@ GEMINI_MODEL = "gemini-2.5-flash"
 BATCH_SIZE = 8
 HN_TOP_N = 30
 
+# GitHub Issues (secondary rate limits: keep content creation low-concurrency)
+GITHUB_MAX_CONCURRENCY = 2
+GITHUB_MIN_REQUEST_INTERVAL = 1.0  # seconds between issue-creating requests
+
+# Notion API (documented average limit: 3 requests/second per integration)
+NOTION_REQUESTS_PER_SECOND = 3.0
+NOTION_WRITE_CONCURRENCY = 3
+
+# Delivery outbox: give up on an item after this many failed attempts
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETENTION_DAYS = 30  # delivered items kept for idempotency checks
+
+# Per-stage timeouts (seconds) for the concurrent delivery stages in main.py
+PIPELINE_STAGE_TIMEOUTS = {
+    "github": 600,
+    "notion": 900,
+    "model_tracker": 300,
+    "model_notion": 300,
+    "telegram": 300,
+}
+
+# Run history (src/run_history.py): a timer (total seconds) or watched counter
+# is flagged when it reaches RUN_HISTORY_REGRESSION_FACTOR x its baseline, the
+# median over the previous RUN_HISTORY_BASELINE_RUNS successful non-dry runs,
+# and exceeds it by the minimum delta. Checked for the current run (spikes)
+# and for the median of the last RUN_HISTORY_RECENT_RUNS runs (slow drifts).
+RUN_HISTORY_BASELINE_RUNS = 14
+RUN_HISTORY_RECENT_RUNS = 7
+RUN_HISTORY_MIN_BASELINE_RUNS = 5
+RUN_HISTORY_REGRESSION_FACTOR = 2.0
+RUN_HISTORY_MIN_DELTA_SECONDS = 5.0
+RUN_HISTORY_MIN_DELTA_COUNT = 3
+RUN_HISTORY_COUNTER_PREFIXES = ("retries.",)
+
+# Profiling (python -m src.main --profile, see src/profiling.py)
+PROFILE_DIR = "profiles"  # outside data/, so profiles are never committed by CI
+PROFILE_TOP_N = 25  # allocation sites per section of the allocation report
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_TRACEMALLOC_FRAMES = 16
+
 # Relevance thresholds
 RELEVANCE_THRESHOLD = 0.6
 ISSUE_THRESHOLD = 0.8
@@ -100,14 +140,92 @@ ARTIFICIAL_ANALYSIS_API_URL = "https://artificialanalysis.ai/api/v2/data/llms/mo
 MODEL_TRACKER_DB_PATH = "data/models.db"
 MODEL_RANK_CHANGE_THRESHOLD = 10  # Top N rank changes
 MODEL_PRICE_CHANGE_THRESHOLD = 0.10  # 10% price change threshold
+MODEL_FRONTIER_INCLUDE_SPEED = False  # Add tokens/sec as a third frontier axis
+
+# Anomaly detection: each (model, metric) keeps an EWMA baseline of its
+# snapshot-to-snapshot relative change; a change is flagged when it is
+# MODEL_ANOMALY_Z_THRESHOLD baseline standard deviations from the mean.
+MODEL_ANOMALY_METRICS = (
+    "price",
+    "intelligence_index",
+    "coding_index",
+    "math_index",
+    "speed_tokens_per_sec",
+    "ttft_seconds",
+)
+MODEL_ANOMALY_ALPHA = 0.1  # EWMA weight of the newest change
+MODEL_ANOMALY_Z_THRESHOLD = 4.0
+MODEL_ANOMALY_MIN_HISTORY = 14  # Changes observed before a model can be flagged
+MODEL_ANOMALY_MIN_STD = 0.01  # Std floor, so models that never move still need 4%
+
+# Snapshot retention (model_tracker.SnapshotRepository.apply_retention): every
+# snapshot of the last MODEL_RETENTION_DAILY_DAYS is kept, then the last one of
+# each week up to MODEL_RETENTION_WEEKLY_DAYS, then the last one of each month.
+MODEL_RETENTION_DAILY_DAYS = 90
+MODEL_RETENTION_WEEKLY_DAYS = 365
+# Weekday (Mon=0 ... Sun=6) whose non-dry runs apply retention after delivering
+MODEL_RETENTION_WEEKDAY = 6
+
+# Declarative change rules, evaluated together in one SQL pass per snapshot pair
+# (see model_tracker.SnapshotRepository.evaluate_rules). Each rule emits rows
+# into its ``key`` of the model updates dict:
+#   metric       a model_tracker.METRICS name
+#   kind         "change" (default): |new - old| >= absolute, or
+#                |new - old| / old >= relative
+#                "rank": position on ``metric`` moved within the top ``top_n``
+#   top_n        scope: only models ranked <= top_n on ``rank_by`` today
+#   rank_by      ranking metric for the scope (default: ``metric``)
+#   window_days  compare with the latest snapshot at least this many days
+#                older (default: the previous snapshot)
+MODEL_CHANGE_RULES = (
+    {
+        "key": "rank_changes",
+        "kind": "rank",
+        "metric": "intelligence_index",
+        "top_n": MODEL_RANK_CHANGE_THRESHOLD,
+    },
+    {
+        "key": "price_changes",
+        "metric": "price",
+        "relative": MODEL_PRICE_CHANGE_THRESHOLD,
+    },
+    {
+        "key": "metric_changes",
+        "metric": "coding_index",
+        "absolute": 3.0,
+        "top_n": 20,
+        "rank_by": "intelligence_index",
+    },
+    {
+        "key": "metric_changes",
+        "metric": "math_index",
+        "absolute": 3.0,
+        "top_n": 20,
+        "rank_by": "intelligence_index",
+    },
+    {
+        "key": "metric_changes",
+        "metric": "speed_tokens_per_sec",
+        "relative": 0.25,
+        "top_n": 20,
+        "rank_by": "intelligence_index",
+    },
+    {
+        "key": "metric_changes",
+        "metric": "ttft_seconds",
+        "relative": 0.25,
+        "top_n": 20,
+        "rank_by": "intelligence_index",
+    },
+)
 
 
-def get_week_identifier() -> str:
+def get_week_identifier(when: datetime | None = None) -> str:
     """
-    Get the current week identifier in ISO format.
+    Get the ISO week identifier for ``when`` (default: now).
 
     Returns:
         str: ISO week identifier in format "YYYY-WNN" (e.g., "2026-W07")
     """
-    year, week, _ = datetime.now().isocalendar()
+    year, week, _ = (when or datetime.now()).isocalendar()
     return f"{year:04d}-W{week:02d}"
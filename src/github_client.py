@@ -0,0 +1,211 @@
+"""Pooled GitHub REST client for issue creation.
+
+One ``requests.Session`` (keep-alive connection pool) is shared by all calls,
+and a bounded semaphore plus a minimum spacing between content-creating
+requests keeps concurrent callers inside GitHub's secondary rate limits.
+403/429 responses are retried after ``Retry-After`` (or the primary limit's
+``X-RateLimit-Reset``), as GitHub's REST guidelines ask.
+
+Creating an issue is not idempotent: GitHub can create it and still answer
+5xx or time out. ``create_issue`` therefore never re-posts blindly after such
+an ambiguous failure; it first looks for an issue with the same title among
+the most recently created ones.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src import config, metrics
+
+logger = logging.getLogger(__name__)
+
+API_BASE = "https://api.github.com"
+MAX_RETRIES = 3
+# GitHub suggests waiting at least a minute when a secondary limit gives no hint
+DEFAULT_SECONDARY_WAIT = 60.0
+MAX_RATE_LIMIT_WAIT = 300.0
+# Recently created issues searched for a title after an ambiguous POST failure
+RECENT_ISSUES_CHECKED = 50
+
+
+class GitHubClient:
+    """Thread-safe GitHub issues client with pooling and rate limiting."""
+
+    def __init__(
+        self,
+        token: str,
+        repo: str,
+        max_concurrency: int | None = None,
+        min_interval: float | None = None,
+    ) -> None:
+        self.repo = repo
+        self.max_concurrency = max_concurrency or config.GITHUB_MAX_CONCURRENCY
+        self.min_interval = (
+            config.GITHUB_MIN_REQUEST_INTERVAL if min_interval is None else min_interval
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+        )
+
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._pace_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def __enter__(self) -> GitHubClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _wait_for_turn(self) -> None:
+        """Space content-creating requests at least ``min_interval`` apart."""
+        with self._pace_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.min_interval
+        if wait > 0:
+            metrics.sleep("github_pacing", wait)
+
+    @staticmethod
+    def _rate_limit_wait(resp: requests.Response) -> float | None:
+        """Seconds to wait for a rate-limited response, or None if not rate limited."""
+        if resp.status_code not in (403, 429):
+            return None
+
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                return DEFAULT_SECONDARY_WAIT
+
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            reset = resp.headers.get("X-RateLimit-Reset")
+            if reset and reset.isdigit():
+                return max(0.0, int(reset) - time.time()) + 1.0
+            return DEFAULT_SECONDARY_WAIT
+
+        if "secondary rate limit" in resp.text.lower():
+            return DEFAULT_SECONDARY_WAIT
+        return None
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        retry_server_errors: bool = True,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request, retrying rate limits and (unless disabled) 5xx."""
+        url = f"{API_BASE}{path}"
+        backoff = 2.0
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            with self._slots:
+                self._wait_for_turn()
+                metrics.incr("http.github")
+                resp = self.session.request(method, url, timeout=30, **kwargs)
+
+            wait = self._rate_limit_wait(resp)
+            if wait is None and (resp.status_code < 500 or not retry_server_errors):
+                resp.raise_for_status()
+                return resp
+
+            if attempt == MAX_RETRIES:
+                break
+            if wait is None:
+                wait = backoff
+                backoff *= 3
+            if wait > MAX_RATE_LIMIT_WAIT:
+                logger.error("GitHub asked to wait %.0fs, giving up", wait)
+                break
+
+            logger.warning(
+                "GitHub API HTTP %d (attempt %d/%d), retrying in %.0fs",
+                resp.status_code,
+                attempt,
+                MAX_RETRIES,
+                wait,
+            )
+            metrics.incr("retries.github")
+            metrics.sleep("github_backoff", wait)
+
+        resp.raise_for_status()
+        return resp
+
+    def find_issue(self, title: str) -> int | None:
+        """Number of a recently created issue titled ``title``, if any."""
+        resp = self._request(
+            "GET",
+            f"/repos/{self.repo}/issues",
+            params={
+                "state": "all",
+                "sort": "created",
+                "direction": "desc",
+                "per_page": RECENT_ISSUES_CHECKED,
+            },
+        )
+        for issue in resp.json():
+            if issue.get("title") == title and "pull_request" not in issue:
+                return int(issue["number"])
+        return None
+
+    def create_issue(self, title: str, body: str, labels: list[str]) -> int:
+        """Create an issue and return its number.
+
+        Rate-limit responses are retried as usual. After a 5xx, timeout or
+        dropped connection the issue may exist already, so it is looked up
+        by title before posting again.
+        """
+        attempt, backoff = 1, 2.0
+        while True:
+            try:
+                resp = self._request(
+                    "POST",
+                    f"/repos/{self.repo}/issues",
+                    retry_server_errors=False,
+                    json={"title": title, "body": body, "labels": labels},
+                )
+                return int(resp.json()["number"])
+            except (
+                requests.HTTPError,
+                requests.ConnectionError,
+                requests.Timeout,
+            ) as e:
+                response = getattr(e, "response", None)
+                if response is not None and response.status_code < 500:
+                    raise
+                logger.warning(
+                    "GitHub issue POST failed ambiguously (attempt %d/%d): %s",
+                    attempt,
+                    MAX_RETRIES,
+                    e,
+                )
+                metrics.sleep("github_backoff", backoff)
+                backoff *= 3
+                existing = self.find_issue(title)
+                if existing is not None:
+                    logger.info("Issue #%d was created despite the error", existing)
+                    return existing
+                if attempt == MAX_RETRIES:
+                    raise
+                attempt += 1
+                metrics.incr("retries.github")
@@ -6,15 +6,33 @@ import argparse
 import asyncio
 import logging
 import sys
-from datetime import datetime
+from collections.abc import Mapping
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
 
-from src import config
+from src import config, metrics
 from src.ai_handler import filter_and_summarize
-from src.model_tracker import fetch_model_data, get_model_updates, save_model_snapshots
+from src.cassette import replay_sandbox, use_cassette
+from src.checkpoint import RunCheckpoint, articles_from_payload, articles_to_payload
+from src.model_fetcher import fetch_model_data
+from src.model_tracker import (
+    apply_retention,
+    get_model_updates,
+    save_model_snapshots,
+)
 from src.notion_handler import send_to_notion
 from src.notion_model_handler import send_model_updates_to_notion
-from src.notifier import send_digest, send_failure_notification
-from src.scraper import scrape_all
+from src.notifier import (
+    send_digest,
+    send_failure_notification,
+    send_health_notification,
+)
+from src.pipeline import Stage, run_stages
+from src.profiling import profiled
+from src.run_history import record_run
+from src.scraper import Article, scrape_all
 from src.storage import (
     create_github_issues,
     filter_new_articles,
@@ -34,65 +52,86 @@ def setup_logging() -> None:
     )
 
 
-def main(dry_run: bool = False) -> None:
-    try:
-        # 1. Data collection
-        logger.info("Starting data collection...")
-        all_articles = asyncio.run(scrape_all())
-        logger.info("Collected %d articles", len(all_articles))
+async def collect_sources(
+    scrape: bool, fetch_models: bool
+) -> tuple[list[Article], list[dict[str, Any]] | BaseException]:
+    """Scrape articles and fetch the model catalog concurrently.
 
-        # 2. Deduplication
-        seen_ids = load_seen_ids()
-        new_articles = filter_new_articles(all_articles, seen_ids)
-        logger.info("New articles: %d", len(new_articles))
+    A failed model fetch is returned rather than raised, so it only affects
+    the (non-fatal) model tracker step.
+    """
 
-        if not new_articles:
-            logger.info("No new articles found. Exiting.")
-            return
+    async def skipped() -> list[Any]:
+        return []
 
-        # 3. Keyword filter + AI summary
-        processed = filter_and_summarize(new_articles)
-        logger.info("After filtering: %d articles", len(processed))
+    articles, models = await asyncio.gather(
+        scrape_all() if scrape else skipped(),
+        fetch_model_data() if fetch_models else skipped(),
+        return_exceptions=True,
+    )
+    if isinstance(articles, BaseException):
+        raise articles
+    return articles, models
 
-        # 4. Save data
-        today = datetime.now().strftime("%Y-%m-%d")
-        save_daily_articles(processed, today)
-        save_seen_ids(seen_ids)
 
-        # 5. GitHub Issues
-        if not dry_run:
+def delivery_stages(
+    processed: list[Article],
+    models: list[dict[str, Any]] | BaseException,
+    today: str,
+    checkpoint: RunCheckpoint,
+    dry_run: bool,
+) -> list[Stage]:
+    """The post-summary stages as a DAG for :func:`src.pipeline.run_stages`.
+
+    GitHub, Notion and the model tracker are independent; the model Notion
+    sync and the Telegram digest wait for the model tracker, whose failure
+    stays non-fatal (they then run without model updates).
+    """
+    timeouts = config.PIPELINE_STAGE_TIMEOUTS
+
+    def github(_: Mapping[str, Any]) -> None:
+        if checkpoint.has("delivered:github"):
+            logger.info("[RESUME] GitHub Issues already created")
+        elif not dry_run:
             create_github_issues(processed)
+            checkpoint.record("delivered:github")
             logger.info("GitHub Issues created")
         else:
             logger.info("[DRY RUN] GitHub Issues creation skipped")
 
-        # 6. Notion
-        if not dry_run:
+    def notion(_: Mapping[str, Any]) -> None:
+        if checkpoint.has("delivered:notion"):
+            logger.info("[RESUME] Notion database already updated")
+        elif not dry_run:
             send_to_notion(processed)
+            checkpoint.record("delivered:notion")
             logger.info("Notion database updated")
         else:
             logger.info("[DRY RUN] Notion update skipped")
 
-        # 7. Model Tracker
-        model_updates: dict[str, list[dict[str, object]]] | None = None
-        try:
-            logger.info("Starting model tracker...")
-            models = fetch_model_data()
-            save_model_snapshots(models, today)
-            updates = get_model_updates(today)
-            model_updates = updates
-            logger.info(
-                "Model tracker done: %d new, %d rank changes, %d price changes",
-                len(updates.get("new_models", [])),
-                len(updates.get("rank_changes", [])),
-                len(updates.get("price_changes", [])),
-            )
-        except Exception:
-            logger.exception("Model tracker failed (non-fatal)")
+    def model_tracker(_: Mapping[str, Any]) -> dict[str, list[dict[str, Any]]]:
+        if checkpoint.has("model_tracker"):
+            logger.info("[RESUME] Reusing model tracker results")
+            return checkpoint.get("model_tracker")
+        logger.info("Starting model tracker...")
+        if isinstance(models, BaseException):
+            raise models
+        save_model_snapshots(models, today)
+        updates = get_model_updates(today)
+        checkpoint.record("model_tracker", updates)
+        logger.info(
+            "Model tracker done: %s",
+            ", ".join(f"{len(rows)} {key}" for key, rows in updates.items()),
+        )
+        return updates
 
-        # 7.5 Model Tracker → Notion
-        if not dry_run and model_updates:
+    def model_notion(results: Mapping[str, Any]) -> None:
+        model_updates = results["model_tracker"]
+        if checkpoint.has("delivered:model_notion"):
+            logger.info("[RESUME] Model tracker Notion sync already done")
+        elif not dry_run and model_updates:
             count = send_model_updates_to_notion(model_updates)
+            checkpoint.record("delivered:model_notion")
             if count > 0:
                 logger.info("Synced %d model updates to Notion", count)
             else:
@@ -100,23 +139,173 @@ def main(dry_run: bool = False) -> None:
         else:
             logger.info("[DRY RUN] Model tracker Notion sync skipped")
 
-        # 8. Telegram digest
-        if not dry_run:
-            send_digest(processed, model_updates=model_updates)
+    def telegram(results: Mapping[str, Any]) -> None:
+        if checkpoint.has("delivered:telegram"):
+            logger.info("[RESUME] Telegram digest already sent")
+        elif not dry_run:
+            send_digest(processed, model_updates=results["model_tracker"])
+            checkpoint.record("delivered:telegram")
             logger.info("Telegram digest sent")
         else:
             logger.info("[DRY RUN] Telegram send skipped")
 
+    return [
+        Stage("github", github, timeout=timeouts["github"]),
+        Stage("notion", notion, timeout=timeouts["notion"]),
+        Stage(
+            "model_tracker",
+            model_tracker,
+            timeout=timeouts["model_tracker"],
+            fatal=False,
+        ),
+        Stage(
+            "model_notion",
+            model_notion,
+            needs=("model_tracker",),
+            timeout=timeouts["model_notion"],
+        ),
+        Stage(
+            "telegram",
+            telegram,
+            needs=("model_tracker",),
+            timeout=timeouts["telegram"],
+        ),
+    ]
+
+
+def run_model_retention(today: str, dry_run: bool) -> None:
+    """Weekly snapshot retention, run once a real run has delivered."""
+    if dry_run:
+        logger.info("[DRY RUN] Model snapshot retention skipped")
+    elif datetime.fromisoformat(today).weekday() == config.MODEL_RETENTION_WEEKDAY:
+        apply_retention()
+
+
+def report_run(
+    run_id: str, started_at: datetime, status: str, **fields: Any
+) -> list[str]:
+    """Write the run report, add it to the run history, return its regressions."""
+    try:
+        path = metrics.write_run_report(run_id, started_at, status, **fields)
+    except OSError:
+        logger.exception("Failed to write the run report")
+        return []
+    return [regression.describe() for regression in record_run(path)]
+
+
+def main(
+    dry_run: bool = False,
+    resume: bool = False,
+    run_id: str | None = None,
+) -> None:
+    started_at = datetime.now(timezone.utc)
+    today = datetime.now().strftime("%Y-%m-%d")
+    run_id = run_id or today
+    metrics.reset()
+    status, error, failure = "failed", None, None
+    if resume:
+        checkpoint = RunCheckpoint.load(run_id)
+    else:
+        checkpoint = RunCheckpoint(run_id)
+        checkpoint.clear()
+
+    try:
+        # 1. Data collection (the model catalog is fetched alongside)
+        scraped = checkpoint.has("scraped")
+        if not scraped:
+            logger.info("Starting data collection...")
+        with metrics.span("main.collect"):
+            all_articles, models = asyncio.run(
+                collect_sources(
+                    scrape=not scraped,
+                    fetch_models=not checkpoint.has("model_tracker"),
+                )
+            )
+        if scraped:
+            all_articles = articles_from_payload(checkpoint.get("scraped"))
+            logger.info("[RESUME] Reusing %d scraped articles", len(all_articles))
+        else:
+            checkpoint.record("scraped", articles_to_payload(all_articles))
+        logger.info("Collected %d articles", len(all_articles))
+        metrics.incr("items.scraped", len(all_articles))
+
+        # 2. Deduplication
+        seen_ids = load_seen_ids()
+        if checkpoint.has("deduped"):
+            new_articles = articles_from_payload(checkpoint.get("deduped"))
+            # Re-apply the filter_new_articles() side effect from the first attempt
+            seen_ids.update(f"{a.source}:{a.source_id}" for a in new_articles)
+            logger.info("[RESUME] Reusing %d deduplicated articles", len(new_articles))
+        else:
+            new_articles = filter_new_articles(all_articles, seen_ids)
+            checkpoint.record("deduped", articles_to_payload(new_articles))
+        logger.info("New articles: %d", len(new_articles))
+        metrics.incr("items.new", len(new_articles))
+
+        if not new_articles:
+            logger.info("No new articles found. Exiting.")
+            checkpoint.clear()
+            status = "no_new_articles"
+            return
+
+        # 3. Keyword filter + AI summary
+        if checkpoint.has("summarized"):
+            processed = articles_from_payload(checkpoint.get("summarized"))
+            logger.info("[RESUME] Reusing %d summarized articles", len(processed))
+        else:
+            processed = filter_and_summarize(new_articles)
+            checkpoint.record("summarized", articles_to_payload(processed))
+        logger.info("After filtering: %d articles", len(processed))
+        metrics.incr("items.summarized", len(processed))
+        metrics.incr("items.notable", sum(1 for a in processed if a.notable))
+
+        # 4. Save data
+        if checkpoint.has("saved"):
+            today = checkpoint.get("saved")
+            logger.info("[RESUME] Articles already saved for %s", today)
+        else:
+            save_daily_articles(processed, today)
+            save_seen_ids(seen_ids)
+            checkpoint.record("saved", today)
+
+        # 5-8. Deliveries and the model tracker, run concurrently
+        with metrics.span("main.deliver"):
+            run = run_stages(
+                delivery_stages(processed, models, today, checkpoint, dry_run)
+            )
+        run.raise_for_errors()
+
+        # 9. Model DB maintenance, outside the timed delivery stages
+        run_model_retention(today, dry_run)
+
+        checkpoint.clear()
+        status = "success"
         logger.info("Pipeline completed successfully")
 
     except Exception as e:
         logger.exception("Pipeline failed: %s", e)
-        if not dry_run:
+        error = f"{type(e).__name__}: {e}"
+        failure = str(e)
+        raise
+    finally:
+        regressions = report_run(
+            run_id,
+            started_at,
+            status,
+            dry_run=dry_run,
+            resumed=resume,
+            error=error,
+        )
+        if not dry_run and failure is not None:
             try:
-                send_failure_notification(str(e))
+                send_failure_notification(failure, regressions)
             except Exception:
                 logger.exception("Failed to send failure notification")
-        raise
+        elif not dry_run and regressions:
+            try:
+                send_health_notification(regressions)
+            except Exception:
+                logger.exception("Failed to send health notification")
 
 
 def cli() -> argparse.Namespace:
@@ -129,6 +318,56 @@ def cli() -> argparse.Namespace:
         default=False,
         help="Run pipeline without sending notifications or creating issues",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Resume the run from its last completed stage checkpoint",
+    )
+    parser.add_argument(
+        "--run-id",
+        default=None,
+        help="Checkpoint id for the run (default: today's date, YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=config.PROFILE_DIR,
+        default=None,
+        metavar="DIR",
+        help=(
+            "Profile the run (cProfile, stack samples, tracemalloc) and write "
+            f"pstats/collapsed-stack/allocation files to DIR "
+            f"(default: {config.PROFILE_DIR}/)"
+        ),
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=config.PROFILE_TOP_N,
+        metavar="N",
+        help="Allocation sites per section of the allocation report",
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        type=Path,
+        metavar="DIR",
+        help="Record every external response (and the data/ state) into DIR",
+    )
+    cassette.add_argument(
+        "--replay",
+        type=Path,
+        metavar="DIR",
+        help="Replay a recorded run offline, in a temporary copy of its data/",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=1.0,
+        metavar="SCALE",
+        help="Multiplier for the recorded latencies on --replay (0: no waits)",
+    )
     return parser.parse_args()
 
 
@@ -136,4 +375,16 @@ if __name__ == "__main__":
     setup_logging()
     args = cli()
     dry_run = args.dry_run or config.DRY_RUN
-    main(dry_run=dry_run)
+    with ExitStack() as stack:
+        if args.profile:
+            stack.enter_context(profiled(args.profile, top_n=args.profile_top))
+        if args.record:
+            recording = stack.enter_context(use_cassette(args.record, "record"))
+            recording.metadata["dry_run"] = dry_run
+        elif args.replay:
+            cassette_dir = args.replay.resolve()
+            stack.enter_context(replay_sandbox(cassette_dir))
+            stack.enter_context(
+                use_cassette(cassette_dir, "replay", args.replay_latency)
+            )
+        main(dry_run=dry_run, resume=args.resume, run_id=args.run_id)
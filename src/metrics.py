@@ -0,0 +1,178 @@
+"""Lightweight run instrumentation: timed spans, counters and a JSON run report.
+
+Everything is recorded in one process-wide, thread-safe registry:
+
+- ``span(name)`` (context manager) and ``timed(name)`` (decorator, sync or
+  async) add their wall time to the timer ``name``: call count, total and
+  max seconds;
+- ``incr(name, amount)`` adds to the counter ``name``;
+- ``sleep(name, seconds)`` / ``async_sleep`` sleep and time it under
+  ``sleep.<name>``, so backoff and pacing waits show up as such.
+
+Names are dotted by area: ``scrape.hackernews``, ``gemini.batch``,
+``http.github``, ``retries.telegram``, ``items.new``, ``tokens.prompt``.
+``write_run_report()`` dumps the registry to ``data/runs/<run_id>-<time>.json``.
+
+Open spans double as hot-path markers for ``src.profiling``: while it runs
+(``track_open_spans(True)``), each thread's open spans are kept with the frame
+that opened them (``open_spans()``), so sampled stacks can show
+``[scrape.tldrai]`` under the code that entered it. Otherwise spans only time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+RUNS_DIR = Path("data") / "runs"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_lock = threading.Lock()
+_timers: dict[str, list[float]] = {}  # name -> [count, total, max]
+_counters: Counter[str] = Counter()
+# thread id -> (name, opening frame) of each open span; only touched by its
+# own thread, read by the profiler's sampler. Filled only while profiling.
+_open: dict[int, list[tuple[str, FrameType]]] = {}
+_track_open = False
+
+
+def observe(name: str, seconds: float) -> None:
+    """Add one measured duration to the timer ``name``."""
+    with _lock:
+        timer = _timers.setdefault(name, [0, 0.0, 0.0])
+        timer[0] += 1
+        timer[1] += seconds
+        timer[2] = max(timer[2], seconds)
+
+
+def incr(name: str, amount: float = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def track_open_spans(enabled: bool) -> None:
+    """Start or stop recording open spans for :func:`open_spans`."""
+    global _track_open
+    _track_open = enabled
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    marker = None
+    if _track_open:
+        # Frame 2 is the ``with`` statement's frame (1 is
+        # contextmanager.__enter__)
+        marker = (name, sys._getframe(2))
+        thread_id = threading.get_ident()
+        _open.setdefault(thread_id, []).append(marker)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+        if marker is not None:
+            markers = _open[thread_id]
+            # Not pop(): coroutines on one thread close their spans out of order
+            markers.remove(marker)
+            if not markers:
+                del _open[thread_id]
+
+
+def open_spans(thread_id: int) -> list[tuple[str, FrameType]]:
+    """The spans currently open on thread ``thread_id``, outermost first."""
+    return list(_open.get(thread_id, ()))
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of :func:`span`, for plain and coroutine functions."""
+
+    def decorate(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def sleep(name: str, seconds: float) -> None:
+    with span(f"sleep.{name}"):
+        time.sleep(seconds)
+
+
+async def async_sleep(name: str, seconds: float) -> None:
+    with span(f"sleep.{name}"):
+        await asyncio.sleep(seconds)
+
+
+def reset() -> None:
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def snapshot() -> dict[str, Any]:
+    """Current timers and counters, JSON-ready and sorted by name."""
+    with _lock:
+        timers = {
+            name: {
+                "count": int(count),
+                "total_s": round(total, 4),
+                "max_s": round(peak, 4),
+            }
+            for name, (count, total, peak) in sorted(_timers.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {"timers": timers, "counters": counters}
+
+
+def write_run_report(
+    run_id: str,
+    started_at: datetime,
+    status: str,
+    **fields: Any,
+) -> Path:
+    """Write the run's metrics plus ``fields`` to ``data/runs/``."""
+    finished_at = datetime.now(timezone.utc)
+    report = {
+        "run_id": run_id,
+        "status": status,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "finished_at": finished_at.isoformat(timespec="seconds"),
+        "duration_s": round((finished_at - started_at).total_seconds(), 3),
+        **fields,
+        **snapshot(),
+    }
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RUNS_DIR / f"{run_id}-{started_at:%H%M%S}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info("Run report written to %s", path)
+    return path
@@ -0,0 +1,203 @@
+"""Async, cached fetch of the Artificial Analysis model catalog.
+
+The catalog is requested with ``If-None-Match`` / ``If-Modified-Since`` from
+the previous response, so an unchanged catalog costs one empty 304. A changed
+one is parsed while it streams: each element of the model array is decoded
+with ``json.JSONDecoder.raw_decode`` as soon as its bytes arrive and reduced to
+the fields ``save_model_snapshots`` stores, so the full payload is never held
+or parsed as one document.
+
+``data/aa_models_cache.json`` keeps the validators and the extracted models.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from src import config, metrics
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_PATH = Path("data") / "aa_models_cache.json"
+CHUNK_SIZE = 64 * 1024
+
+# The model array: the whole document, or the first of these keys.
+_ARRAY_START = re.compile(r'^\s*\[|"(?:data|models|results)"\s*:\s*\[')
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+def _first(*values: Any) -> Any:
+    return next((v for v in values if v is not None), None)
+
+
+def extract_model(raw: dict[str, Any]) -> dict[str, Any]:
+    """Reduce one catalog entry to the fields the snapshot store uses.
+
+    Accepts flat entries and the nested v2 shape (``model_creator``,
+    ``evaluations``, ``pricing``, ``median_*``); flat keys win.
+    """
+    creator = raw.get("model_creator") or {}
+    evaluations = raw.get("evaluations") or {}
+    pricing = raw.get("pricing") or {}
+    return {
+        "model_id": _first(raw.get("model_id"), raw.get("id")),
+        "name": _first(raw.get("name"), raw.get("model_name")),
+        "creator": _first(raw.get("creator"), creator.get("name")),
+        "intelligence_index": _first(
+            raw.get("intelligence_index"),
+            evaluations.get("artificial_analysis_intelligence_index"),
+        ),
+        "coding_index": _first(
+            raw.get("coding_index"),
+            evaluations.get("artificial_analysis_coding_index"),
+        ),
+        "math_index": _first(
+            raw.get("math_index"),
+            evaluations.get("artificial_analysis_math_index"),
+        ),
+        "speed_index": raw.get("speed_index"),
+        "price_input": _first(
+            raw.get("price_input"), pricing.get("price_1m_input_tokens")
+        ),
+        "price_output": _first(
+            raw.get("price_output"), pricing.get("price_1m_output_tokens")
+        ),
+        "speed_tokens_per_sec": _first(
+            raw.get("speed_tokens_per_sec"),
+            raw.get("median_output_tokens_per_second"),
+        ),
+        "ttft_seconds": _first(
+            raw.get("ttft_seconds"), raw.get("median_time_to_first_token_seconds")
+        ),
+    }
+
+
+class ModelStreamParser:
+    """Incrementally extracts model entries from a streamed catalog document."""
+
+    def __init__(self) -> None:
+        self.models: list[dict[str, Any]] = []
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_array = False
+        self._done = False
+
+    def feed(self, chunk: bytes) -> None:
+        if self._done:
+            return
+        self._buffer += self._text.decode(chunk)
+        if not self._in_array:
+            match = _ARRAY_START.search(self._buffer)
+            if match is None:
+                return
+            self._buffer = self._buffer[match.end() :]
+            self._in_array = True
+
+        pos = 0
+        while True:
+            pos = _SEPARATOR.match(self._buffer, pos).end()
+            if pos >= len(self._buffer):
+                break
+            if self._buffer[pos] == "]":
+                self._done = True
+                break
+            try:
+                entry, pos = self._decoder.raw_decode(self._buffer, pos)
+            except json.JSONDecodeError:
+                break  # entry still incomplete, wait for more bytes
+            if isinstance(entry, dict):
+                self.models.append(extract_model(entry))
+        self._buffer = self._buffer[pos:]
+
+    def close(self) -> list[dict[str, Any]]:
+        """Finish the document; raises ValueError if no complete array was seen."""
+        self.feed(b"")
+        if not self._done:
+            raise ValueError("model catalog ended before its model array closed")
+        return self.models
+
+
+def _load_cache() -> dict[str, Any]:
+    if not MODEL_CACHE_PATH.exists():
+        return {}
+    try:
+        with open(MODEL_CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        logger.exception("Failed to load %s, fetching in full", MODEL_CACHE_PATH)
+        return {}
+
+
+def _save_cache(
+    etag: str | None, last_modified: str | None, models: list[dict[str, Any]]
+) -> None:
+    MODEL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(MODEL_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump(
+            {"etag": etag, "last_modified": last_modified, "models": models},
+            f,
+            ensure_ascii=False,
+            indent=1,
+        )
+
+
+@metrics.timed("model_fetcher.fetch")
+async def fetch_model_data(
+    session: aiohttp.ClientSession | None = None,
+) -> list[dict[str, Any]]:
+    """Fetch the model catalog, reusing the cached copy on 304 Not Modified."""
+    api_key = config.ARTIFICIAL_ANALYSIS_API_KEY
+    if not api_key:
+        logger.warning("ARTIFICIAL_ANALYSIS_API_KEY not set, skipping model fetch")
+        return []
+
+    cache = _load_cache()
+    headers = {"x-api-key": api_key}
+    if cache.get("models") is not None:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    owned = session is None
+    if session is None:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+    try:
+        metrics.incr("http.artificial_analysis")
+        async with session.get(
+            config.ARTIFICIAL_ANALYSIS_API_URL, headers=headers
+        ) as resp:
+            if resp.status == 304:
+                metrics.incr("cache.artificial_analysis_not_modified")
+                models = cache["models"]
+                logger.info("Model catalog unchanged, reusing %d models", len(models))
+                return models
+            resp.raise_for_status()
+            parser = ModelStreamParser()
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                parser.feed(chunk)
+            models = parser.close()
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        logger.exception("Failed to fetch models from Artificial Analysis API")
+        return []
+    except ValueError:
+        logger.exception("Invalid JSON response from Artificial Analysis API")
+        return []
+    finally:
+        if owned:
+            await session.close()
+
+    _save_cache(etag, last_modified, models)
+    logger.info("Fetched %d models from Artificial Analysis", len(models))
+    return models
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import argparse
+import atexit
+import json
 import logging
+import math
 import sqlite3
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, chain, groupby, repeat
+from operator import itemgetter, sub, truediv
 from pathlib import Path
 from typing import Any
 
-import requests
-
-from src import config
+from src import config, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -32,97 +42,1386 @@ CREATE TABLE IF NOT EXISTS model_snapshots (
 );
 """
 
-_INSERT_SQL = """\
-INSERT OR REPLACE INTO model_snapshots (
-    model_id, name, creator,
-    intelligence_index, coding_index, math_index, speed_index,
-    price_input, price_output, speed_tokens_per_sec, ttft_seconds,
-    fetched_at
-) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+_SNAPSHOT_COLUMNS = (
+    "model_id, name, creator, "
+    "intelligence_index, coding_index, math_index, speed_index, "
+    "price_input, price_output, speed_tokens_per_sec, ttft_seconds, "
+    "fetched_at"
+)
+
+_SELECT_SNAPSHOT_SQL = (
+    f"SELECT {_SNAPSHOT_COLUMNS} FROM model_snapshots WHERE fetched_at = ?"
+)
+
+# One row per fetch. Its primary key makes "latest snapshot before X" a single
+# index seek instead of a DISTINCT scan over every model row.
+_CREATE_CATALOG_SQL = """\
+CREATE TABLE IF NOT EXISTS snapshots (
+    fetched_at TEXT PRIMARY KEY,
+    model_count INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_model_snapshots_fetched_at
+    ON model_snapshots (fetched_at);
 """
 
+_UPSERT_CATALOG_SQL = """\
+INSERT INTO snapshots (fetched_at, model_count, created_at, updated_at)
+VALUES (?1, (SELECT COUNT(*) FROM incoming), ?2, ?2)
+ON CONFLICT (fetched_at) DO UPDATE SET
+    model_count = excluded.model_count,
+    updated_at = excluded.updated_at;
+"""
 
-def _init_db() -> sqlite3.Connection:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
-    _ = conn.execute(_CREATE_TABLE_SQL)
-    conn.commit()
-    return conn
+_LATEST_DATE_SQL = "SELECT MAX(fetched_at) FROM snapshots"
 
+_PREVIOUS_DATE_SQL = (
+    "SELECT fetched_at FROM snapshots "
+    "WHERE fetched_at < ? ORDER BY fetched_at DESC LIMIT 1"
+)
 
-def fetch_model_data() -> list[dict[str, Any]]:
-    api_key = config.ARTIFICIAL_ANALYSIS_API_KEY
-    if not api_key:
-        logger.warning("ARTIFICIAL_ANALYSIS_API_KEY not set, skipping model fetch")
-        return []
+# Snapshot diffs run entirely in SQLite, for any pair of dates (:old, :new).
+_NEW_MODELS_SQL = f"""\
+SELECT {_SNAPSHOT_COLUMNS} FROM model_snapshots AS n
+WHERE n.fetched_at = :new
+  AND NOT EXISTS (
+      SELECT 1 FROM model_snapshots AS o
+      WHERE o.fetched_at = :old AND o.model_id = n.model_id
+  )
+ORDER BY n.name;
+"""
 
-    url = "https://artificialanalysis.ai/api/v2/data/llms/models"
-    headers = {"x-api-key": api_key}
+# Every snapshot paired with the latest snapshot at least :lag_days earlier,
+# e.g. 7 for week-over-week or 30 for month-over-month, across all history.
+_PERIOD_DELTAS_SQL = """\
+WITH pairs AS MATERIALIZED (
+    SELECT s.fetched_at AS new_date,
+           (SELECT MAX(p.fetched_at) FROM snapshots AS p
+            WHERE p.fetched_at <= date(s.fetched_at, '-' || :lag_days || ' days'))
+               AS old_date
+    FROM snapshots AS s
+)
+SELECT pairs.old_date, pairs.new_date, n.model_id, n.name,
+       o.intelligence_index AS old_intelligence,
+       n.intelligence_index AS new_intelligence,
+       n.intelligence_index - o.intelligence_index AS intelligence_delta,
+       (o.price_input + o.price_output) / 2.0 AS old_price,
+       (n.price_input + n.price_output) / 2.0 AS new_price,
+       ((n.price_input + n.price_output) - (o.price_input + o.price_output))
+           / nullif(o.price_input + o.price_output, 0) AS price_change
+FROM pairs
+JOIN model_snapshots AS n ON n.fetched_at = pairs.new_date
+JOIN model_snapshots AS o ON o.fetched_at = pairs.old_date AND o.model_id = n.model_id
+WHERE pairs.old_date IS NOT NULL
+ORDER BY pairs.new_date, n.model_id;
+"""
 
-    try:
-        resp = requests.get(url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-    except requests.RequestException:
-        logger.exception("Failed to fetch models from Artificial Analysis API")
-        return []
-    except ValueError:
-        logger.exception("Invalid JSON response from Artificial Analysis API")
-        return []
+# ---------------------------------------------------------------------------
+# Time series
+# ---------------------------------------------------------------------------
+# Metrics are SQL expressions over the stored columns. A series is rebuilt from
+# model_versions (one constant run per version) and its analytics are computed
+# on whole lists, so cost tracks versions and C-level list operations rather
+# than a Python loop per (model, day) row.
 
-    if isinstance(data, list):
-        models: list[dict[str, Any]] = data
-    elif isinstance(data, dict):
-        models = data.get("data") or data.get("models") or data.get("results") or []
-    else:
-        logger.error("Unexpected API response type: %s", type(data).__name__)
-        return []
+METRICS: dict[str, str] = {
+    "intelligence_index": "intelligence_index",
+    "coding_index": "coding_index",
+    "math_index": "math_index",
+    "speed_index": "speed_index",
+    "price": "(price_input + price_output) / 2.0",
+    "price_input": "price_input",
+    "price_output": "price_output",
+    "speed_tokens_per_sec": "speed_tokens_per_sec",
+    "ttft_seconds": "ttft_seconds",
+    "price_per_intelligence": (
+        "((price_input + price_output) / 2.0) / nullif(intelligence_index, 0)"
+    ),
+}
 
-    logger.info("Fetched %d models from Artificial Analysis", len(models))
-    return models
+# Versions overlapping [:start, :end]; each is a constant run of the metric.
+_SERIES_VERSIONS_SQL = """\
+SELECT model_id, name, {metric} AS value, valid_from, valid_to
+FROM model_versions
+WHERE valid_from <= :end AND (valid_to IS NULL OR valid_to > :start)
+  AND (:model_ids IS NULL OR model_id IN (SELECT value FROM json_each(:model_ids)))
+ORDER BY model_id, valid_from;
+"""
 
+_SERIES_DATES_SQL = (
+    "SELECT fetched_at FROM snapshots WHERE fetched_at BETWEEN :start AND :end "
+    "ORDER BY fetched_at"
+)
 
-def save_model_snapshots(models: list[dict[str, Any]], date: str) -> int:
-    conn = _init_db()
+SERIES_COLUMNS = (
+    "model_id",
+    "name",
+    "fetched_at",
+    "value",
+    "rolling_mean",
+    "pct_change",
+    "drawdown",
+)
 
-    if not models:
-        logger.info("No models to save")
-        conn.close()
-        return 0
-    count = 0
 
-    try:
-        for model in models:
-            model_id = model.get("model_id") or model.get("id")
-            name = model.get("name") or model.get("model_name")
-            if not model_id or not name:
+def _ratio_minus_one(
+    numerator: float | None, denominator: float | None
+) -> float | None:
+    if numerator is None or not denominator:
+        return None
+    return numerator / denominator - 1
+
+
+def _series_analytics(
+    values: list[Any], window: int
+) -> tuple[list[Any], list[Any], list[Any]]:
+    """Rolling mean, percent change and drawdown for one model's series.
+
+    The common case (all values positive) runs on whole lists with C-level
+    ``accumulate``/``map``; series with gaps or zeros take the general path.
+    """
+    n = len(values)
+    if n and None not in values and min(values) > 0:
+        sums = list(accumulate(values, initial=0.0))
+        lower = [0.0] * min(window, n) + sums[1 : n - window + 1]
+        counts = chain(range(1, window), repeat(window))
+        rolling = list(map(truediv, map(sub, sums[1:], lower), counts))
+        pct = [None, *map(sub, map(truediv, values[1:], values), repeat(1.0))]
+        peaks = accumulate(values, max)
+        drawdown = list(map(sub, map(truediv, values, peaks), repeat(1.0)))
+        return rolling, pct, drawdown
+
+    rolling, pct, drawdown = [], [], []
+    peak: float | None = None
+    previous: float | None = None
+    for i, value in enumerate(values):
+        recent = [v for v in values[max(0, i - window + 1) : i + 1] if v is not None]
+        rolling.append(sum(recent) / len(recent) if recent else None)
+        pct.append(_ratio_minus_one(value, previous) if i else None)
+        if value is not None:
+            peak = value if peak is None else max(peak, value)
+        drawdown.append(_ratio_minus_one(value, peak))
+        previous = value
+    return rolling, pct, drawdown
+
+
+# ---------------------------------------------------------------------------
+# Change rules
+# ---------------------------------------------------------------------------
+# config.MODEL_CHANGE_RULES is passed as one JSON array and joined against the
+# snapshot pair, so every rule is evaluated in a single statement. Positions use
+# ROW_NUMBER (ties broken by model_id) to keep the "position in the top N"
+# semantics of detect_rank_changes; RANK() would let ties overflow the top N.
+
+# Metrics where a smaller value ranks higher.
+_LOWER_IS_BETTER = frozenset(
+    {"price", "price_input", "price_output", "price_per_intelligence", "ttft_seconds"}
+)
+
+_LOWER_IS_BETTER_SQL = ", ".join(f"'{m}'" for m in sorted(_LOWER_IS_BETTER))
+
+_METRIC_VALUE = "CASE w.metric {} END".format(
+    " ".join(f"WHEN '{name}' THEN {expr}" for name, expr in METRICS.items())
+)
+
+_RULES_SQL = f"""\
+WITH rules AS (
+    SELECT CAST(key AS INTEGER) AS rule_id,
+           value ->> '$.kind' AS kind,
+           value ->> '$.metric' AS metric,
+           value ->> '$.rank_by' AS rank_by,
+           value ->> '$.top_n' AS top_n,
+           value ->> '$.absolute' AS absolute,
+           value ->> '$.relative' AS relative,
+           value ->> '$.window_days' AS window_days
+    FROM json_each(:rules)
+),
+pairs AS (
+    SELECT DISTINCT window_days,
+           CASE WHEN window_days IS NULL THEN :old ELSE (
+               SELECT MAX(fetched_at) FROM snapshots
+               WHERE fetched_at <= date(:new, '-' || window_days || ' days')
+           ) END AS old_date
+    FROM rules
+),
+wanted AS (SELECT metric FROM rules UNION SELECT rank_by FROM rules),
+ranked AS MATERIALIZED (
+    SELECT *, ROW_NUMBER() OVER (
+               PARTITION BY fetched_at, metric
+               ORDER BY CASE WHEN metric IN ({_LOWER_IS_BETTER_SQL})
+                             THEN value ELSE -value END,
+                        model_id
+           ) AS position
+    FROM (
+        SELECT s.fetched_at, s.model_id, s.name, w.metric, {_METRIC_VALUE} AS value
+        FROM model_snapshots AS s, wanted AS w
+        WHERE s.fetched_at = :new OR s.fetched_at IN (SELECT old_date FROM pairs)
+    )
+    WHERE value IS NOT NULL
+)
+SELECT r.rule_id, n.model_id, n.name, p.old_date,
+       o.value AS old_value, n.value AS new_value,
+       n.value - o.value AS change,
+       (n.value - o.value) / nullif(o.value, 0) AS change_percent,
+       old_scope.position AS old_rank, new_scope.position AS new_rank
+FROM rules AS r
+JOIN pairs AS p ON p.window_days IS r.window_days
+JOIN ranked AS n ON n.fetched_at = :new AND n.metric = r.metric
+JOIN ranked AS o
+    ON o.fetched_at = p.old_date AND o.metric = r.metric AND o.model_id = n.model_id
+JOIN ranked AS new_scope
+    ON new_scope.fetched_at = :new AND new_scope.metric = r.rank_by
+   AND new_scope.model_id = n.model_id
+LEFT JOIN ranked AS old_scope
+    ON old_scope.fetched_at = p.old_date AND old_scope.metric = r.rank_by
+   AND old_scope.model_id = n.model_id
+WHERE (r.top_n IS NULL OR new_scope.position <= r.top_n)
+  AND CASE r.kind
+      WHEN 'rank' THEN old_scope.position <= r.top_n
+                   AND old_scope.position != new_scope.position
+      ELSE abs(n.value - o.value) >= r.absolute
+           OR (o.value > 0 AND abs(n.value - o.value) / o.value >= r.relative)
+  END
+ORDER BY r.rule_id,
+         CASE
+             WHEN r.kind = 'rank' THEN new_scope.position
+             WHEN r.relative IS NOT NULL THEN -abs(n.value - o.value) / o.value
+             ELSE -abs(n.value - o.value)
+         END,
+         n.name;
+"""
+
+
+def _normalize_rules(rules: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Validate change rules and fill in defaults."""
+    normalized = []
+    for rule in rules:
+        metric = rule.get("metric")
+        kind = rule.get("kind", "change")
+        top_n = rule.get("top_n")
+        if metric not in METRICS:
+            raise ValueError(f"Change rule {rule!r}: unknown metric {metric!r}")
+        if kind == "rank" and not top_n:
+            raise ValueError(f"Change rule {rule!r}: rank rules need top_n")
+        if kind == "change" and not (rule.get("absolute") or rule.get("relative")):
+            raise ValueError(f"Change rule {rule!r}: set absolute or relative > 0")
+        if kind not in ("change", "rank"):
+            raise ValueError(f"Change rule {rule!r}: unknown kind {kind!r}")
+        rank_by = rule.get("rank_by", metric) if top_n and kind == "change" else metric
+        if rank_by not in METRICS:
+            raise ValueError(f"Change rule {rule!r}: unknown rank_by {rank_by!r}")
+        window_days = rule.get("window_days")
+        if window_days is not None and window_days < 1:
+            raise ValueError(f"Change rule {rule!r}: window_days must be >= 1")
+        normalized.append(
+            {
+                "key": rule["key"],
+                "kind": kind,
+                "metric": metric,
+                "rank_by": rank_by,
+                "top_n": top_n,
+                "absolute": rule.get("absolute"),
+                "relative": rule.get("relative"),
+                "window_days": window_days,
+            }
+        )
+    return normalized
+
+
+def _rule_update(rule: dict[str, Any], row: dict[str, Any]) -> dict[str, Any]:
+    """Shape one matched row the way the digest and Notion handlers read it."""
+    metric = rule["metric"]
+    if rule["kind"] == "rank":
+        return {
+            "name": row["name"],
+            "old_rank": row["old_rank"],
+            "new_rank": row["new_rank"],
+            metric: row["new_value"],
+        }
+    return {
+        "model_id": row["model_id"],
+        "name": row["name"],
+        "metric": metric,
+        "old_date": row["old_date"],
+        "old_value": row["old_value"],
+        "new_value": row["new_value"],
+        "change": row["change"],
+        "change_percent": row["change_percent"],
+        # e.g. old_price/new_price, as price_changes consumers expect
+        f"old_{metric}": row["old_value"],
+        f"new_{metric}": row["new_value"],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Pareto frontier
+# ---------------------------------------------------------------------------
+# A model is on the frontier when no other model is at least as cheap (blended
+# price) and at least as capable (intelligence, optionally speed) while being
+# strictly better on one of them. Frontiers are stored per snapshot date and
+# per set of dimensions, in ascending price order.
+
+_CREATE_FRONTIER_SQL = """\
+CREATE TABLE IF NOT EXISTS model_frontier (
+    fetched_at TEXT NOT NULL,
+    dimensions TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    model_id TEXT NOT NULL,
+    PRIMARY KEY (fetched_at, dimensions, model_id)
+);
+"""
+
+_INSERT_FRONTIER_SQL = (
+    "INSERT INTO model_frontier (fetched_at, dimensions, position, model_id) "
+    "VALUES (?, ?, ?, ?)"
+)
+
+_SELECT_FRONTIER_SQL = (
+    "SELECT model_id FROM model_frontier "
+    "WHERE fetched_at = ? AND dimensions = ? ORDER BY position"
+)
+
+
+def _frontier_dimensions(include_speed: bool) -> str:
+    return "price,intelligence,speed" if include_speed else "price,intelligence"
+
+
+def _frontier_point(
+    model: dict[str, Any], include_speed: bool
+) -> tuple[float, float, float] | None:
+    price_input = model.get("price_input")
+    price_output = model.get("price_output")
+    intelligence = model.get("intelligence_index")
+    speed = model.get("speed_tokens_per_sec") if include_speed else 0.0
+    if None in (price_input, price_output, intelligence, speed):
+        return None
+    return ((price_input + price_output) / 2.0, intelligence, speed)
+
+
+def pareto_frontier(
+    models: list[dict[str, Any]], include_speed: bool = False
+) -> list[str]:
+    """Model ids on the price/intelligence(/speed) frontier, cheapest first.
+
+    Models are swept in ascending price while a staircase of the best
+    (intelligence, speed) pairs seen so far is kept sorted by intelligence
+    (speed then strictly decreases along it), so each dominance test is one
+    bisect: O(n log n). Models with identical values share one decision;
+    models missing a dimension are left out.
+    """
+    ids_by_point: dict[tuple[float, float, float], list[str]] = defaultdict(list)
+    for model in models:
+        point = _frontier_point(model, include_speed)
+        if point is not None and model.get("model_id"):
+            ids_by_point[point].append(model["model_id"])
+
+    # At equal price the better point comes first, so it dominates the rest.
+    order = sorted(ids_by_point, key=lambda p: (p[0], -p[1], -p[2]))
+    stair_intelligence: list[float] = []
+    stair_speed: list[float] = []
+    frontier: list[str] = []
+    for point in order:
+        _, intelligence, speed = point
+        i = bisect_left(stair_intelligence, intelligence)
+        if i < len(stair_intelligence) and stair_speed[i] >= speed:
+            continue  # a cheaper (or equal-price) model is at least as good
+        frontier.extend(ids_by_point[point])
+        # Replace the staircase points this one now covers.
+        j = bisect_right(stair_intelligence, intelligence)
+        k = j
+        while k > 0 and stair_speed[k - 1] <= speed:
+            k -= 1
+        stair_intelligence[k:j] = [intelligence]
+        stair_speed[k:j] = [speed]
+    return frontier
+
+
+# ---------------------------------------------------------------------------
+# Anomaly baselines
+# ---------------------------------------------------------------------------
+# One row per (model, metric) holds the last value seen and an exponentially
+# weighted mean/variance of its relative change per snapshot. Each run folds in
+# only the new snapshot, so the cost is independent of how much history exists.
+
+_CREATE_BASELINES_SQL = """\
+CREATE TABLE IF NOT EXISTS model_baselines (
+    model_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    last_value REAL NOT NULL,
+    mean REAL NOT NULL,
+    variance REAL NOT NULL,
+    observations INTEGER NOT NULL,
+    PRIMARY KEY (model_id, metric)
+);
+CREATE TABLE IF NOT EXISTS model_anomalies (
+    fetched_at TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    old_value REAL NOT NULL,
+    new_value REAL NOT NULL,
+    change_percent REAL NOT NULL,
+    zscore REAL NOT NULL,
+    PRIMARY KEY (fetched_at, model_id, metric)
+);
+"""
+
+_BASELINE_INPUT_SQL = f"""\
+WITH w (metric) AS (SELECT value FROM json_each(:metrics))
+SELECT s.model_id, w.metric, {_METRIC_VALUE} AS value,
+       b.fetched_at, b.last_value, b.mean, b.variance, b.observations
+FROM model_snapshots AS s
+CROSS JOIN w
+LEFT JOIN model_baselines AS b ON b.model_id = s.model_id AND b.metric = w.metric
+WHERE s.fetched_at = :date;
+"""
+
+_UPSERT_BASELINE_SQL = (
+    "INSERT OR REPLACE INTO model_baselines VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+_INSERT_ANOMALY_SQL = (
+    "INSERT OR REPLACE INTO model_anomalies VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Names come from the version valid on the anomaly's date, not the snapshot
+# view, so anomalies stay readable after retention drops their catalog date.
+_SELECT_ANOMALIES_SQL = """\
+SELECT a.model_id, v.name, a.metric, a.old_value, a.new_value,
+       a.change_percent, a.zscore
+FROM model_anomalies AS a
+JOIN model_versions AS v
+  ON v.model_id = a.model_id
+ AND v.valid_from <= a.fetched_at
+ AND (v.valid_to IS NULL OR a.fetched_at < v.valid_to)
+WHERE a.fetched_at = ?
+ORDER BY abs(a.zscore) DESC, v.name;
+"""
+
+
+Baseline = tuple[float, float, float, int]  # last value, mean, variance, count
+
+
+def _baseline_step(
+    baseline: Baseline, value: float
+) -> tuple[Baseline, tuple[float, float] | None]:
+    """Fold one new value into a baseline.
+
+    Returns the updated baseline and ``(change_percent, zscore)`` when the
+    change is anomalous against the baseline it was scored on.
+    """
+    last, mean, variance, seen = baseline
+    if not last:
+        # No relative change from zero: restart from the new value.
+        return (value, mean, variance, seen), None
+    change = (value - last) / abs(last)
+    zscore = (change - mean) / max(math.sqrt(variance), config.MODEL_ANOMALY_MIN_STD)
+    flagged = None
+    if (
+        change
+        and seen >= config.MODEL_ANOMALY_MIN_HISTORY
+        and abs(zscore) >= config.MODEL_ANOMALY_Z_THRESHOLD
+    ):
+        flagged = (change, zscore)
+    alpha = config.MODEL_ANOMALY_ALPHA
+    deviation = change - mean
+    mean += alpha * deviation
+    variance = (1 - alpha) * (variance + alpha * deviation**2)
+    return (value, mean, variance, seen + 1), flagged
+
+
+def _baseline_repeat(baseline: Baseline, times: int) -> Baseline:
+    """``times`` unchanged values folded in at once.
+
+    Closed form of ``times`` calls to _baseline_step with a zero change:
+    the mean decays by (1 - alpha)^k and the variance by the same factor
+    plus the decayed share of mean^2.
+    """
+    last, mean, variance, seen = baseline
+    if not last or times <= 0:
+        return baseline
+    decay = (1 - config.MODEL_ANOMALY_ALPHA) ** times
+    variance = decay * (variance + mean**2 * (1 - decay))
+    return (last, mean * decay, variance, seen + times)
+
+
+# ---------------------------------------------------------------------------
+# Change-only (SCD type 2) storage
+# ---------------------------------------------------------------------------
+# model_versions holds one row per model per run of unchanged values: the row
+# is valid for every catalog date in [valid_from, valid_to), valid_to NULL
+# meaning "still current". The model_snapshots view expands versions back into
+# one row per model per snapshot, so every query above is unchanged.
+
+_TRACKED_COLUMNS = (
+    "name",
+    "creator",
+    "intelligence_index",
+    "coding_index",
+    "math_index",
+    "speed_index",
+    "price_input",
+    "price_output",
+    "speed_tokens_per_sec",
+    "ttft_seconds",
+)
+_VALUE_COLUMNS = "model_id, " + ", ".join(_TRACKED_COLUMNS)
+_UNCHANGED = " AND ".join(f"i.{c} IS model_versions.{c}" for c in _TRACKED_COLUMNS)
+
+_CREATE_VERSIONS_SQL = """\
+CREATE TABLE model_versions (
+    model_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    creator TEXT,
+    intelligence_index REAL,
+    coding_index REAL,
+    math_index REAL,
+    speed_index REAL,
+    price_input REAL,
+    price_output REAL,
+    speed_tokens_per_sec REAL,
+    ttft_seconds REAL,
+    valid_from TEXT NOT NULL,
+    valid_to TEXT,
+    PRIMARY KEY (model_id, valid_from)
+);
+CREATE INDEX idx_model_versions_open ON model_versions (model_id)
+    WHERE valid_to IS NULL;
+"""
+
+# Replaces idx_model_snapshots_fetched_at, which went with the old table: a
+# snapshot read is a seek on the versions still open after its date. Recent
+# dates, the ones the pipeline reads, touch little more than the open rows.
+_CREATE_VERSIONS_VALID_TO_INDEX_SQL = """\
+CREATE INDEX IF NOT EXISTS idx_model_versions_valid_to
+    ON model_versions (valid_to, valid_from);
+"""
+
+_CREATE_SNAPSHOT_VIEW_SQL = """\
+CREATE VIEW model_snapshots AS
+SELECT v.model_id, v.name, v.creator,
+       v.intelligence_index, v.coding_index, v.math_index, v.speed_index,
+       v.price_input, v.price_output, v.speed_tokens_per_sec, v.ttft_seconds,
+       s.fetched_at
+FROM snapshots AS s
+JOIN model_versions AS v
+  ON v.valid_from <= s.fetched_at
+ AND (v.valid_to IS NULL OR s.fetched_at < v.valid_to);
+"""
+
+# Full-copy table → versions: a row starts a new version unless the same model
+# had identical values in the immediately preceding catalog snapshot.
+_CONVERT_TO_VERSIONS_SQL = f"""\
+INSERT INTO model_versions ({_VALUE_COLUMNS}, valid_from, valid_to)
+WITH dates AS (
+    SELECT fetched_at, ROW_NUMBER() OVER (ORDER BY fetched_at) AS seq
+    FROM snapshots
+),
+marked AS (
+    SELECT m.*, d.seq,
+           CASE WHEN LAG(d.seq) OVER w = d.seq - 1
+                 {"".join(f"AND LAG(m.{c}) OVER w IS m.{c} " for c in _TRACKED_COLUMNS)}
+                THEN 0 ELSE 1 END AS starts
+    FROM model_snapshots AS m JOIN dates AS d USING (fetched_at)
+    WINDOW w AS (PARTITION BY m.model_id ORDER BY d.seq)
+),
+grouped AS (
+    SELECT *, SUM(starts) OVER (PARTITION BY model_id ORDER BY seq) AS version
+    FROM marked
+),
+spans AS (
+    SELECT model_id, version,
+           {", ".join(f"MAX({c}) AS {c}" for c in _TRACKED_COLUMNS)},
+           MIN(fetched_at) AS valid_from, MAX(seq) AS last_seq
+    FROM grouped GROUP BY model_id, version
+)
+SELECT {_VALUE_COLUMNS}, valid_from, d.fetched_at
+FROM spans LEFT JOIN dates AS d ON d.seq = spans.last_seq + 1;
+DROP TABLE model_snapshots;
+"""
+
+_CREATE_INCOMING_SQL = f"""\
+CREATE TEMP TABLE IF NOT EXISTS incoming (
+    model_id TEXT PRIMARY KEY,
+    {", ".join(_TRACKED_COLUMNS)}
+);
+"""
+
+_STAGE_SQL = (
+    f"INSERT OR REPLACE INTO incoming ({_VALUE_COLUMNS}) "
+    f"VALUES ({', '.join('?' * (len(_TRACKED_COLUMNS) + 1))})"
+)
+
+# Undo a previous save of the same (latest) date before re-applying it.
+_REOPEN_SQL = (
+    "DELETE FROM model_versions WHERE valid_from = :date;"
+    "UPDATE model_versions SET valid_to = NULL WHERE valid_to = :date;"
+)
+
+_CLOSE_CHANGED_SQL = f"""\
+UPDATE model_versions SET valid_to = :date
+WHERE valid_to IS NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM incoming AS i
+      WHERE i.model_id = model_versions.model_id AND {_UNCHANGED}
+  );
+"""
+
+_OPEN_NEW_SQL = f"""\
+INSERT INTO model_versions ({_VALUE_COLUMNS}, valid_from, valid_to)
+SELECT {_VALUE_COLUMNS}, :date, NULL FROM incoming AS i
+WHERE NOT EXISTS (
+    SELECT 1 FROM model_versions AS v
+    WHERE v.model_id = i.model_id AND v.valid_to IS NULL
+);
+"""
+
+# ---------------------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------------------
+# Recent snapshots are kept daily, older ones thinned to one per week and then
+# one per month (the last snapshot of each period). Dropped dates lose their
+# catalog and frontier rows. A version that no remaining date falls in, and
+# that directly follows and precedes other versions of its model, is folded
+# into the version before it: that one's valid_to moves up to the next kept
+# version, and the folded version survives only as its changed fields in
+# model_changes. The view reads the same for every kept date, and
+# model_history() replays the change log, so no change event is lost.
+
+_CREATE_CHANGES_SQL = """\
+CREATE TABLE IF NOT EXISTS model_changes (
+    model_id TEXT NOT NULL,
+    changed_at TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value,
+    PRIMARY KEY (model_id, changed_at, field)
+) WITHOUT ROWID;
+"""
+
+_CREATE_COLLAPSED_SQL = """\
+CREATE TEMP TABLE IF NOT EXISTS collapsed (
+    model_id TEXT NOT NULL,
+    valid_from TEXT NOT NULL,
+    PRIMARY KEY (model_id, valid_from)
+) WITHOUT ROWID;
+"""
+
+_FIND_COLLAPSED_SQL = """\
+INSERT INTO collapsed
+SELECT v.model_id, v.valid_from FROM model_versions AS v
+WHERE v.valid_to IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM snapshots AS s
+      WHERE s.fetched_at >= v.valid_from AND s.fetched_at < v.valid_to
+  )
+  AND EXISTS (
+      SELECT 1 FROM model_versions AS p
+      WHERE p.valid_to = v.valid_from AND p.model_id = v.model_id
+  )
+  AND EXISTS (
+      SELECT 1 FROM model_versions AS n
+      WHERE n.model_id = v.model_id AND n.valid_from = v.valid_to
+  );
+"""
+
+# Each folded version as the fields that differ from the version before it.
+_CHANGED_FIELDS_SQL = "UNION ALL ".join(
+    f"SELECT model_id, valid_from, '{c}', {c} FROM pairs WHERE {c} IS NOT old_{c}\n"
+    for c in _TRACKED_COLUMNS
+)
+_LOG_CHANGES_SQL = f"""\
+INSERT INTO model_changes (model_id, changed_at, field, value)
+WITH pairs AS MATERIALIZED (
+    SELECT v.*, {", ".join(f"p.{c} AS old_{c}" for c in _TRACKED_COLUMNS)}
+    FROM collapsed AS c
+    JOIN model_versions AS v USING (model_id, valid_from)
+    JOIN model_versions AS p
+      ON p.valid_to = v.valid_from AND p.model_id = v.model_id
+)
+{_CHANGED_FIELDS_SQL};
+"""
+
+# The version before a folded run now lasts until the next version kept.
+_EXTEND_KEPT_SQL = """\
+UPDATE model_versions SET valid_to = (
+    SELECT MIN(n.valid_from) FROM model_versions AS n
+    WHERE n.model_id = model_versions.model_id
+      AND n.valid_from > model_versions.valid_from
+      AND (n.model_id, n.valid_from) NOT IN collapsed
+)
+WHERE (model_id, valid_to) IN collapsed
+  AND (model_id, valid_from) NOT IN collapsed;
+"""
+
+_DELETE_COLLAPSED_SQL = (
+    "DELETE FROM model_versions WHERE (model_id, valid_from) IN collapsed"
+)
+
+_MODEL_HISTORY_SQL = (
+    f"SELECT {_VALUE_COLUMNS}, valid_from, valid_to FROM model_versions "
+    "WHERE model_id = ? ORDER BY valid_from"
+)
+
+_MODEL_CHANGES_SQL = (
+    "SELECT changed_at, field, value FROM model_changes "
+    "WHERE model_id = ? ORDER BY changed_at"
+)
+
+
+@dataclass
+class RetentionReport:
+    snapshots_kept: int = 0
+    snapshots_dropped: int = 0
+    frontier_rows_dropped: int = 0
+    versions_collapsed: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    dry_run: bool = False
+
+
+def retained_dates(
+    dates: Sequence[str], daily_days: int, weekly_days: int
+) -> set[str]:
+    """Snapshot dates kept by the daily → weekly → monthly policy.
+
+    Ages are counted back from the newest date. Within ``daily_days`` every
+    date is kept; up to ``weekly_days`` the last date of each ISO week (split
+    at month boundaries, so each month's last snapshot survives into the
+    monthly tier); beyond that the last date of each month.
+    """
+    if not 0 <= daily_days <= weekly_days:
+        raise ValueError("need 0 <= daily_days <= weekly_days")
+    if not dates:
+        return set()
+    newest = datetime.fromisoformat(max(dates)).date()
+    daily_cutoff = (newest - timedelta(days=daily_days)).isoformat()
+    weekly_cutoff = (newest - timedelta(days=weekly_days)).isoformat()
+
+    periods: dict[tuple[int, ...], str] = {}
+    kept: set[str] = set()
+    for date in dates:
+        if date >= daily_cutoff:
+            kept.add(date)
+            continue
+        day = datetime.fromisoformat(date).date()
+        if date >= weekly_cutoff:
+            period: tuple[int, ...] = (day.year, day.month, day.isocalendar()[1])
+        else:
+            period = (day.year, day.month)
+        periods[period] = max(periods.get(period, date), date)
+    return kept | set(periods.values())
+
+
+# Schema migrations, applied in order; PRAGMA user_version records how many
+# have run. Append new steps, never edit existing ones.
+_MIGRATIONS: tuple[str, ...] = (
+    _CREATE_TABLE_SQL,
+    _CREATE_CATALOG_SQL
+    + """\
+INSERT OR IGNORE INTO snapshots (fetched_at, model_count, created_at, updated_at)
+SELECT fetched_at, COUNT(*), now, now
+FROM model_snapshots, (SELECT strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now') AS now)
+GROUP BY fetched_at;
+""",
+    _CREATE_VERSIONS_SQL + _CONVERT_TO_VERSIONS_SQL + _CREATE_SNAPSHOT_VIEW_SQL,
+    _CREATE_FRONTIER_SQL,
+    _CREATE_BASELINES_SQL,
+    _CREATE_VERSIONS_VALID_TO_INDEX_SQL,
+    _CREATE_CHANGES_SQL,
+)
+
+# Applied once per connection. WAL lets readers run while a snapshot is being
+# written; NORMAL sync is durable across application crashes in WAL mode.
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
+
+
+def _snapshot_row(model: dict[str, Any]) -> tuple[Any, ...] | None:
+    model_id = model.get("model_id") or model.get("id")
+    name = model.get("name") or model.get("model_name")
+    if not model_id or not name:
+        return None
+    return (
+        str(model_id),
+        str(name),
+        model.get("creator"),
+        model.get("intelligence_index"),
+        model.get("coding_index"),
+        model.get("math_index"),
+        model.get("speed_index"),
+        model.get("price_input"),
+        model.get("price_output"),
+        model.get("speed_tokens_per_sec"),
+        model.get("ttft_seconds"),
+    )
+
+
+class SnapshotRepository:
+    """Long-lived connection to the model snapshot database.
+
+    Pending schema migrations run once when the connection opens (tracked
+    in ``PRAGMA user_version``), and the statements above are
+    constant strings, so sqlite3's statement cache reuses them prepared.
+    Access is serialized by a lock so the repository can be shared across
+    threads.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or DB_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, cached_statements=64
+        )
+        self._lock = threading.Lock()
+        for pragma in _PRAGMAS:
+            self.conn.execute(pragma)
+        self._migrate()
+
+    def __enter__(self) -> SnapshotRepository:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def _migrate(self) -> None:
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, script in enumerate(_MIGRATIONS[version:], start=version + 1):
+            logger.info("Migrating %s to schema version %d", self.path, number)
+            # executescript() commits first, so run each step in an explicit
+            # transaction together with its version bump.
+            self.conn.executescript(
+                f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;"
+            )
+
+    def save(self, models: list[dict[str, Any]], date: str) -> int:
+        """Record the snapshot for ``date``; returns the number of models in it.
+
+        Only models whose tracked values changed (or that appeared or
+        disappeared) since the latest snapshot get a version row written.
+        Re-saving the latest date replaces it; older dates are rejected.
+        """
+        rows = [row for m in models if (row := _snapshot_row(m)) is not None]
+        include_speed = config.MODEL_FRONTIER_INCLUDE_SPEED
+        frontier = pareto_frontier(
+            [dict(zip(("model_id", *_TRACKED_COLUMNS), row)) for row in rows],
+            include_speed,
+        )
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        params = {"date": date}
+        with self._lock, self.conn:
+            latest = self.conn.execute(_LATEST_DATE_SQL).fetchone()[0]
+            if latest is not None and date < latest:
+                raise ValueError(
+                    f"Cannot save snapshot {date}: newer snapshot {latest} exists"
+                )
+            self.conn.execute(_CREATE_INCOMING_SQL)
+            self.conn.execute("DELETE FROM incoming")
+            self.conn.executemany(_STAGE_SQL, rows)
+            if date == latest:
+                for statement in _REOPEN_SQL.split(";")[:-1]:
+                    self.conn.execute(statement, params)
+            closed = self.conn.execute(_CLOSE_CHANGED_SQL, params).rowcount
+            opened = self.conn.execute(_OPEN_NEW_SQL, params).rowcount
+            self.conn.execute(_UPSERT_CATALOG_SQL, (date, now))
+            # Frontiers of a re-saved date are stale for every dimension set.
+            self.conn.execute(
+                "DELETE FROM model_frontier WHERE fetched_at = ?", (date,)
+            )
+            self._store_frontier(date, _frontier_dimensions(include_speed), frontier)
+            count = self.conn.execute("SELECT COUNT(*) FROM incoming").fetchone()[0]
+        logger.info(
+            "Snapshot %s: %d model(s), %d version(s) closed, %d written",
+            date,
+            count,
+            closed,
+            opened,
+        )
+        return count
+
+    def _query(
+        self, sql: str, params: dict[str, Any] | tuple[Any, ...]
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def evaluate_rules(
+        self,
+        old_date: str,
+        new_date: str,
+        rules: Sequence[dict[str, Any]] | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Matches of every change rule between two dates, grouped by rule key.
+
+        Rules without ``window_days`` compare against ``old_date``; the others
+        against the latest snapshot at least ``window_days`` before
+        ``new_date``. Defaults to ``config.MODEL_CHANGE_RULES``.
+        """
+        normalized = _normalize_rules(
+            config.MODEL_CHANGE_RULES if rules is None else rules
+        )
+        updates: dict[str, list[dict[str, Any]]] = {
+            rule["key"]: [] for rule in normalized
+        }
+        params = {"old": old_date, "new": new_date, "rules": json.dumps(normalized)}
+        for row in self._query(_RULES_SQL, params):
+            rule = normalized[row["rule_id"]]
+            updates[rule["key"]].append(_rule_update(rule, row))
+        return updates
+
+    def diff(
+        self,
+        old_date: str,
+        new_date: str,
+        rules: Sequence[dict[str, Any]] | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """New models, every change rule's matches and frontier changes."""
+        return {
+            "new_models": self._query(
+                _NEW_MODELS_SQL, {"old": old_date, "new": new_date}
+            ),
+            **self.evaluate_rules(old_date, new_date, rules),
+            "frontier_changes": self.frontier_changes(old_date, new_date),
+        }
+
+    def period_deltas(self, lag_days: int) -> list[dict[str, Any]]:
+        """Per-model intelligence and price deltas vs. ``lag_days`` earlier."""
+        return self._query(_PERIOD_DELTAS_SQL, {"lag_days": lag_days})
+
+    def time_series(
+        self,
+        metric: str,
+        start: str | None = None,
+        end: str | None = None,
+        model_ids: list[str] | None = None,
+        window: int = 7,
+    ) -> dict[str, list[Any]]:
+        """Column-oriented series of ``metric`` with rolling analytics.
+
+        Returns one list per ``SERIES_COLUMNS`` entry, rows sorted by model
+        then date. ``rolling_mean`` averages the last ``window`` snapshots,
+        ``pct_change`` is vs. the model's previous snapshot and ``drawdown``
+        is the fall from its running maximum. Series are expanded from the
+        change-only versions (one list repeat per version), not read row by
+        row from the snapshot view.
+        """
+        if metric not in METRICS:
+            raise ValueError(
+                f"Unknown metric {metric!r}; choose from {sorted(METRICS)}"
+            )
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        params = {
+            "start": start or "0000-00-00",
+            "end": end or "9999-99-99",
+            "model_ids": json.dumps(model_ids) if model_ids else None,
+        }
+        with self._lock:
+            dates = [
+                row[0] for row in self.conn.execute(_SERIES_DATES_SQL, params)
+            ]
+            versions = self.conn.execute(
+                _SERIES_VERSIONS_SQL.format(metric=METRICS[metric]), params
+            ).fetchall()
+
+        columns: dict[str, list[Any]] = {name: [] for name in SERIES_COLUMNS}
+        for model_id, group in groupby(versions, key=itemgetter(0)):
+            name = ""
+            model_dates: list[str] = []
+            values: list[Any] = []
+            for _, name, value, valid_from, valid_to in group:
+                first = bisect_left(dates, valid_from)
+                last = bisect_left(dates, valid_to) if valid_to else len(dates)
+                model_dates += dates[first:last]
+                values += [value] * (last - first)
+            if not values:
                 continue
+            rolling, pct, drawdown = _series_analytics(values, window)
+            columns["model_id"] += [model_id] * len(values)
+            columns["name"] += [name] * len(values)
+            columns["fetched_at"] += model_dates
+            columns["value"] += values
+            columns["rolling_mean"] += rolling
+            columns["pct_change"] += pct
+            columns["drawdown"] += drawdown
+        return columns
 
-            row = (
-                str(model_id),
-                str(name),
-                model.get("creator"),
-                model.get("intelligence_index"),
-                model.get("coding_index"),
-                model.get("math_index"),
-                model.get("speed_index"),
-                model.get("price_input"),
-                model.get("price_output"),
-                model.get("speed_tokens_per_sec"),
-                model.get("ttft_seconds"),
-                date,
+    def trends(
+        self,
+        metric: str,
+        start: str | None = None,
+        end: str | None = None,
+        model_ids: list[str] | None = None,
+        window: int = 7,
+    ) -> list[dict[str, Any]]:
+        """Per-model summary of ``metric`` over the range, biggest risers first."""
+        series = self.time_series(metric, start, end, model_ids, window)
+        rows: list[dict[str, Any]] = []
+        ids = series["model_id"]
+        position = 0
+        for model_id, group in groupby(ids):
+            count = sum(1 for _ in group)
+            span = slice(position, position + count)
+            position += count
+            values = [v for v in series["value"][span] if v is not None]
+            if not values:
+                continue
+            drawdowns = [d for d in series["drawdown"][span] if d is not None]
+            rows.append(
+                {
+                    "model_id": model_id,
+                    "name": series["name"][span.start],
+                    "points": len(values),
+                    "first_date": series["fetched_at"][span.start],
+                    "last_date": series["fetched_at"][span.stop - 1],
+                    "first_value": values[0],
+                    "last_value": values[-1],
+                    "total_change": _ratio_minus_one(values[-1], values[0]),
+                    "max_drawdown": min(drawdowns) if drawdowns else None,
+                    "last_rolling_mean": series["rolling_mean"][span.stop - 1],
+                }
             )
-            _ = conn.execute(_INSERT_SQL, row)
-            count += 1
+        rows.sort(key=lambda row: row["total_change"] or 0.0, reverse=True)
+        return rows
+
+    def _store_frontier(self, date: str, dimensions: str, frontier: list[str]) -> None:
+        """Replace the stored frontier; caller holds the lock and transaction."""
+        self.conn.execute(
+            "DELETE FROM model_frontier WHERE fetched_at = ? AND dimensions = ?",
+            (date, dimensions),
+        )
+        self.conn.executemany(
+            _INSERT_FRONTIER_SQL,
+            [(date, dimensions, i, model_id) for i, model_id in enumerate(frontier)],
+        )
+
+    def frontier(self, date: str, include_speed: bool | None = None) -> list[str]:
+        """Frontier model ids of ``date``, cheapest first.
+
+        Computed and stored on first use for dates saved before frontiers
+        were tracked, or for the dimensions not chosen in config.
+        """
+        if include_speed is None:
+            include_speed = config.MODEL_FRONTIER_INCLUDE_SPEED
+        dimensions = _frontier_dimensions(include_speed)
+        with self._lock:
+            rows = self.conn.execute(_SELECT_FRONTIER_SQL, (date, dimensions))
+            stored = [row[0] for row in rows]
+        if stored:
+            return stored
+
+        frontier = pareto_frontier(self.snapshot(date), include_speed)
+        if frontier:
+            with self._lock, self.conn:
+                self._store_frontier(date, dimensions, frontier)
+        return frontier
+
+    def frontier_changes(
+        self, old_date: str, new_date: str, include_speed: bool | None = None
+    ) -> list[dict[str, Any]]:
+        """Models that joined or left the frontier between two dates."""
+        old_ids = self.frontier(old_date, include_speed)
+        new_ids = self.frontier(new_date, include_speed)
+        old_models = {m["model_id"]: m for m in self.snapshot(old_date)}
+        new_models = {m["model_id"]: m for m in self.snapshot(new_date)}
+
+        changes: list[dict[str, Any]] = []
+        for status, ids, others in (
+            ("joined", new_ids, set(old_ids)),
+            ("left", old_ids, set(new_ids)),
+        ):
+            for model_id in ids:
+                if model_id in others:
+                    continue
+                model = new_models.get(model_id) or old_models[model_id]
+                point = _frontier_point(model, include_speed=False)
+                changes.append(
+                    {
+                        "model_id": model_id,
+                        "name": model["name"],
+                        "status": status,
+                        "price": point[0] if point else None,
+                        "intelligence_index": model["intelligence_index"],
+                        "speed_tokens_per_sec": model["speed_tokens_per_sec"],
+                        "frontier_size": len(new_ids),
+                    }
+                )
+        return changes
+
+    def _apply_baselines(self, date: str, metrics: list[str]) -> int:
+        """Fold one snapshot into the baselines; caller holds the transaction."""
+        rows = self.conn.execute(
+            _BASELINE_INPUT_SQL, {"date": date, "metrics": json.dumps(metrics)}
+        ).fetchall()
+
+        baselines: list[tuple[Any, ...]] = []
+        anomalies: list[tuple[Any, ...]] = []
+        for model_id, metric, value, applied, *stored in rows:
+            if value is None or (applied is not None and applied >= date):
+                continue
+            if applied is None:
+                baselines.append((model_id, metric, date, value, 0.0, 0.0, 0))
+                continue
+            baseline, flagged = _baseline_step(tuple(stored), value)
+            if flagged is not None:
+                anomalies.append((date, model_id, metric, stored[0], value, *flagged))
+            baselines.append((model_id, metric, date, *baseline))
+
+        self.conn.executemany(_UPSERT_BASELINE_SQL, baselines)
+        self.conn.executemany(_INSERT_ANOMALY_SQL, anomalies)
+        return len(anomalies)
+
+    def _seed_baselines(self, until: str, metrics: list[str]) -> None:
+        """Build baselines from every snapshot before ``until`` in one pass.
+
+        Reads model_versions rather than each snapshot: a version is a run of
+        identical snapshots, so it costs one step for its first snapshot plus
+        a closed-form fold of the unchanged rest (_baseline_repeat).
+        """
+        dates = [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT fetched_at FROM snapshots WHERE fetched_at < ? "
+                "ORDER BY fetched_at",
+                (until,),
+            )
+        ]
+        if not dates:
+            return
+        logger.info("Seeding model baselines from %d snapshot(s)", len(dates))
+        values = ", ".join(METRICS[metric] for metric in metrics)
+        versions = self.conn.execute(
+            f"SELECT model_id, valid_from, valid_to, {values} FROM model_versions "
+            "WHERE valid_from < ? ORDER BY model_id, valid_from",
+            (until,),
+        )
+
+        baselines: list[tuple[Any, ...]] = []
+        anomalies: list[tuple[Any, ...]] = []
+        for model_id, group in groupby(versions, key=itemgetter(0)):
+            state: dict[str, tuple[str, tuple[float, float, float, int]]] = {}
+            for _, valid_from, valid_to, *row in group:
+                first = bisect_left(dates, valid_from)
+                last = bisect_left(dates, valid_to) if valid_to else len(dates)
+                if first >= last:
+                    continue
+                for metric, value in zip(metrics, row):
+                    if value is None:
+                        continue
+                    if metric not in state:
+                        baseline = (value, 0.0, 0.0, 0)
+                    else:
+                        previous = state[metric][1]
+                        baseline, flagged = _baseline_step(previous, value)
+                        if flagged is not None:
+                            anomalies.append(
+                                (dates[first], model_id, metric, previous[0], value)
+                                + flagged
+                            )
+                    baseline = _baseline_repeat(baseline, last - first - 1)
+                    state[metric] = (dates[last - 1], baseline)
+            baselines.extend(
+                (model_id, metric, applied, *baseline)
+                for metric, (applied, baseline) in state.items()
+            )
+
+        self.conn.executemany(_UPSERT_BASELINE_SQL, baselines)
+        self.conn.executemany(_INSERT_ANOMALY_SQL, anomalies)
+
+    def update_baselines(self, date: str) -> int:
+        """Fold ``date`` into the anomaly baselines; returns anomalies found.
+
+        Dates already applied are skipped, so re-runs are no-ops. With no
+        baselines yet, the earlier history is folded in first, in one batch.
+        """
+        metrics = list(config.MODEL_ANOMALY_METRICS)
+        with self._lock, self.conn:
+            seeded = self.conn.execute("SELECT 1 FROM model_baselines LIMIT 1")
+            if seeded.fetchone() is None:
+                self._seed_baselines(date, metrics)
+            found = self._apply_baselines(date, metrics)
+        logger.info("Anomaly baselines updated for %s: %d anomaly(ies)", date, found)
+        return found
+
+    def anomalies(self, date: str) -> list[dict[str, Any]]:
+        """Changes on ``date`` flagged against each model's own baseline."""
+        return self._query(_SELECT_ANOMALIES_SQL, (date,))
+
+    def model_history(self, model_id: str) -> list[dict[str, Any]]:
+        """Every version of ``model_id``, oldest first.
 
-        conn.commit()
+        Each row holds the tracked values with their ``[valid_from,
+        valid_to)`` range. Versions that retention folded into
+        ``model_changes`` are replayed in place, so the history reads the
+        same before and after retention.
+        """
+        versions = self._query(_MODEL_HISTORY_SQL, (model_id,))
+        changes: dict[str, dict[str, Any]] = defaultdict(dict)
+        for row in self._query(_MODEL_CHANGES_SQL, (model_id,)):
+            changes[row["changed_at"]][row["field"]] = row["value"]
+        dates = list(changes)
+        history: list[dict[str, Any]] = []
+        for version in versions:
+            first = bisect_right(dates, version["valid_from"])
+            end = version["valid_to"]
+            last = bisect_left(dates, end) if end else len(dates)
+            for date in dates[first:last]:
+                history.append({**version, "valid_to": date})
+                version = {**version, **changes[date], "valid_from": date}
+            history.append(version)
+        return history
+
+    def apply_retention(
+        self,
+        daily_days: int | None = None,
+        weekly_days: int | None = None,
+        dry_run: bool = False,
+    ) -> RetentionReport:
+        """Thin old catalog dates to weekly/monthly, then VACUUM the file.
+
+        Dropped dates lose their catalog and frontier rows, and versions only
+        they could see are folded into ``model_changes`` (see above), so no
+        change event is lost. Defaults come from ``config.MODEL_RETENTION_*``.
+        A dry run makes the same changes in a transaction it rolls back.
+        """
+        if daily_days is None:
+            daily_days = config.MODEL_RETENTION_DAILY_DAYS
+        if weekly_days is None:
+            weekly_days = config.MODEL_RETENTION_WEEKLY_DAYS
+        report = RetentionReport(dry_run=dry_run, bytes_before=self.size())
+        with self._lock:
+            dates = [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT fetched_at FROM snapshots ORDER BY fetched_at"
+                )
+            ]
+            retained = retained_dates(dates, daily_days, weekly_days)
+            dropped = json.dumps([date for date in dates if date not in retained])
+            report.snapshots_kept = len(retained)
+            report.snapshots_dropped = len(dates) - len(retained)
+            if report.snapshots_dropped:
+                in_dropped = "fetched_at IN (SELECT value FROM json_each(?))"
+                try:
+                    self.conn.execute(
+                        f"DELETE FROM snapshots WHERE {in_dropped}", (dropped,)
+                    )
+                    report.frontier_rows_dropped = self.conn.execute(
+                        f"DELETE FROM model_frontier WHERE {in_dropped}", (dropped,)
+                    ).rowcount
+                    self.conn.execute(_CREATE_COLLAPSED_SQL)
+                    self.conn.execute("DELETE FROM collapsed")
+                    report.versions_collapsed = self.conn.execute(
+                        _FIND_COLLAPSED_SQL
+                    ).rowcount
+                    self.conn.execute(_LOG_CHANGES_SQL)
+                    self.conn.execute(_EXTEND_KEPT_SQL)
+                    self.conn.execute(_DELETE_COLLAPSED_SQL)
+                except BaseException:
+                    self.conn.rollback()
+                    raise
+                if dry_run:
+                    self.conn.rollback()
+                else:
+                    self.conn.commit()
+                    self.conn.execute("VACUUM")
+                    self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        report.bytes_after = report.bytes_before if dry_run else self.size()
+        logger.info(
+            "%sRetention: %d snapshot(s) kept, %d dropped, "
+            "%d frontier row(s) removed, %d version(s) folded, %d -> %d bytes",
+            "[DRY RUN] " if dry_run else "",
+            report.snapshots_kept,
+            report.snapshots_dropped,
+            report.frontier_rows_dropped,
+            report.versions_collapsed,
+            report.bytes_before,
+            report.bytes_after,
+        )
+        return report
+
+    def size(self) -> int:
+        """Database size in bytes, as it will be once the WAL is checkpointed."""
+        with self._lock:
+            pages = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return pages * page_size
+
+    def list_snapshots(self) -> list[dict[str, Any]]:
+        """Catalog rows (fetched_at, model_count, timestamps), oldest first."""
+        return self._query(
+            "SELECT fetched_at, model_count, created_at, updated_at "
+            "FROM snapshots ORDER BY fetched_at",
+            (),
+        )
+
+    def snapshot_count(self, date: str) -> int:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT model_count FROM snapshots WHERE fetched_at = ?", (date,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def previous_date(self, date: str) -> str | None:
+        with self._lock:
+            row = self.conn.execute(_PREVIOUS_DATE_SQL, (date,)).fetchone()
+        return row[0] if row else None
+
+    def snapshot(self, date: str) -> list[dict[str, Any]]:
+        return self._query(_SELECT_SNAPSHOT_SQL, (date,))
+
+
+_repository: SnapshotRepository | None = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> SnapshotRepository:
+    """Return the process-wide repository for ``DB_PATH``, opening it once."""
+    global _repository
+    with _repository_lock:
+        if _repository is None or _repository.path != DB_PATH:
+            if _repository is not None:
+                _repository.close()
+            _repository = SnapshotRepository(DB_PATH)
+        return _repository
+
+
+@atexit.register
+def close_repository() -> None:
+    """Close the shared connection (checkpoints and removes the WAL file)."""
+    global _repository
+    with _repository_lock:
+        if _repository is not None:
+            _repository.close()
+            _repository = None
+
+
+@metrics.timed("model_tracker.save")
+def save_model_snapshots(models: list[dict[str, Any]], date: str) -> int:
+    if not models:
+        logger.info("No models to save")
+        return 0
+
+    try:
+        count = get_repository().save(models, date)
         logger.info("Saved %d model snapshots for %s", count, date)
+    except ValueError as e:
+        logger.error("Skipping model snapshot: %s", e)
+        count = 0
     except sqlite3.Error:
         logger.exception("Database error while saving model snapshots")
-        conn.rollback()
         count = 0
-    finally:
-        conn.close()
 
     return count
 
@@ -131,34 +1430,13 @@ def get_previous_snapshot(date: str) -> list[dict[str, Any]]:
     if not DB_PATH.exists():
         return []
 
-    conn = _init_db()
     try:
-        cursor = conn.execute(
-            (
-                "SELECT DISTINCT fetched_at FROM model_snapshots "
-                "WHERE fetched_at < ? ORDER BY fetched_at DESC LIMIT 1"
-            ),
-            (date,),
-        )
-        row = cursor.fetchone()
-        if not row:
+        repo = get_repository()
+        prev_date = repo.previous_date(date)
+        if not prev_date:
             return []
 
-        prev_date: str = row[0]
-        cursor = conn.execute(
-            (
-                "SELECT model_id, name, creator, "
-                "intelligence_index, coding_index, math_index, speed_index, "
-                "price_input, price_output, speed_tokens_per_sec, ttft_seconds, "
-                "fetched_at "
-                "FROM model_snapshots WHERE fetched_at = ?"
-            ),
-            (prev_date,),
-        )
-        columns: list[str] = [desc[0] for desc in cursor.description]  # type: ignore[misc]
-        results: list[dict[str, Any]] = [
-            dict(zip(columns, r)) for r in cursor.fetchall()
-        ]
+        results = repo.snapshot(prev_date)
         logger.info(
             "Found %d models in previous snapshot (%s)", len(results), prev_date
         )
@@ -166,8 +1444,6 @@ def get_previous_snapshot(date: str) -> list[dict[str, Any]]:
     except sqlite3.Error:
         logger.exception("Database error while querying previous snapshot")
         return []
-    finally:
-        conn.close()
 
 
 def detect_new_models(
@@ -315,31 +1591,41 @@ def _get_today_snapshot(date_str: str) -> list[dict[str, Any]]:
     if not DB_PATH.exists():
         return []
 
-    conn = _init_db()
     try:
-        cursor = conn.execute(
-            (
-                "SELECT model_id, name, creator, "
-                "intelligence_index, coding_index, math_index, speed_index, "
-                "price_input, price_output, speed_tokens_per_sec, ttft_seconds, "
-                "fetched_at "
-                "FROM model_snapshots WHERE fetched_at = ?"
-            ),
-            (date_str,),
-        )
-        columns: list[str] = [desc[0] for desc in cursor.description]  # type: ignore[misc]
-        results: list[dict[str, Any]] = [
-            dict(zip(columns, r)) for r in cursor.fetchall()
-        ]
+        results = get_repository().snapshot(date_str)
         logger.info("Found %d models in today's snapshot (%s)", len(results), date_str)
         return results
     except sqlite3.Error:
         logger.exception("Database error while querying today's snapshot")
         return []
-    finally:
-        conn.close()
 
 
+def empty_updates() -> dict[str, list[dict[str, Any]]]:
+    """An updates dict with every key the configured rules can emit."""
+    keys = [
+        "new_models",
+        *(rule["key"] for rule in config.MODEL_CHANGE_RULES),
+        "frontier_changes",
+        "anomalies",
+    ]
+    return {key: [] for key in keys}
+
+
+def compare_snapshots(
+    old_date: str, new_date: str
+) -> dict[str, list[dict[str, Any]]]:
+    """Diff any two stored snapshots in SQL (see ``SnapshotRepository.diff``)."""
+    updates = get_repository().diff(old_date, new_date)
+    logger.info(
+        "Snapshot diff %s → %s: %s",
+        old_date,
+        new_date,
+        ", ".join(f"{len(rows)} {key}" for key, rows in updates.items()),
+    )
+    return updates
+
+
+@metrics.timed("model_tracker.updates")
 def get_model_updates(date_str: str) -> dict[str, list[dict[str, Any]]]:
     """
     Get all model updates for a given date.
@@ -348,26 +1634,122 @@ def get_model_updates(date_str: str) -> dict[str, list[dict[str, Any]]]:
         date_str: Date string to check updates for
 
     Returns:
-        Dict with keys: new_models, rank_changes, price_changes
+        Dict with new_models plus one key per ``config.MODEL_CHANGE_RULES``
+        key (rank_changes, price_changes, metric_changes by default),
+        frontier_changes and anomalies
     """
-    yesterday_models = get_previous_snapshot(date_str)
+    empty = empty_updates()
+    if not DB_PATH.exists():
+        return empty
 
-    # If no previous snapshot, return empty results
-    if not yesterday_models:
-        logger.info("No previous snapshot found, returning empty updates")
-        return {"new_models": [], "rank_changes": [], "price_changes": []}
+    try:
+        repo = get_repository()
+        if not repo.snapshot_count(date_str):
+            logger.info("No today snapshot found, returning empty updates")
+            return empty
+        # Baselines take every snapshot, including the very first one.
+        repo.update_baselines(date_str)
+        prev_date = repo.previous_date(date_str)
+        # If no previous snapshot, return empty results
+        if not prev_date:
+            logger.info("No previous snapshot found, returning empty updates")
+            return empty
+        updates = compare_snapshots(prev_date, date_str)
+        updates["anomalies"] = repo.anomalies(date_str)
+        return updates
+    except sqlite3.Error:
+        logger.exception("Database error while computing model updates")
+        return empty
+
+
+@metrics.timed("model_tracker.retention")
+def apply_retention(dry_run: bool = False) -> RetentionReport | None:
+    """Apply the configured snapshot retention to ``DB_PATH`` (non-raising)."""
+    if not DB_PATH.exists():
+        return None
+    try:
+        return get_repository().apply_retention(dry_run=dry_run)
+    except sqlite3.Error:
+        logger.exception("Database error while applying snapshot retention")
+        return None
 
-    today_models = _get_today_snapshot(date_str)
-    if not today_models:
-        logger.info("No today snapshot found, returning empty updates")
-        return {"new_models": [], "rank_changes": [], "price_changes": []}
 
-    new_models = detect_new_models(today_models, yesterday_models)
-    rank_changes = detect_rank_changes(today_models, yesterday_models)
-    price_changes = detect_price_changes(today_models, yesterday_models)
+def _format_number(value: float | None, pattern: str) -> str:
+    return "-" if value is None else format(value, pattern)
 
-    return {
-        "new_models": new_models,
-        "rank_changes": rank_changes,
-        "price_changes": price_changes,
-    }
+
+def print_trends(
+    metric: str,
+    days: int,
+    model_ids: list[str] | None = None,
+    window: int = 7,
+    limit: int = 20,
+) -> None:
+    """Print the per-model trend of ``metric`` over the last ``days`` days."""
+    repo = get_repository()
+    end = repo.conn.execute(_LATEST_DATE_SQL).fetchone()[0]
+    if end is None:
+        print("No model snapshots recorded yet")
+        return
+    start = (datetime.fromisoformat(end) - timedelta(days=days)).date().isoformat()
+    rows = repo.trends(metric, start, end, model_ids, window)
+
+    print(f"{metric} from {start} to {end} (rolling window {window})")
+    print(
+        f"{'model':<40}{'first':>12}{'last':>12}{'change':>9}"
+        f"{'max dd':>9}{'rolling':>12}"
+    )
+    for row in rows[:limit]:
+        print(
+            f"{str(row['name'])[:39]:<40}"
+            f"{_format_number(row['first_value'], '.4g'):>12}"
+            f"{_format_number(row['last_value'], '.4g'):>12}"
+            f"{_format_number(row['total_change'], '+.1%'):>9}"
+            f"{_format_number(row['max_drawdown'], '.1%'):>9}"
+            f"{_format_number(row['last_rolling_mean'], '.4g'):>12}"
+        )
+
+
+def cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AI model tracker analytics")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    trends = subparsers.add_parser("trends", help="Print per-model metric trends")
+    trends.add_argument("--metric", choices=sorted(METRICS), default="price")
+    trends.add_argument("--days", type=int, default=90)
+    trends.add_argument("--window", type=int, default=7)
+    trends.add_argument("--limit", type=int, default=20)
+    trends.add_argument(
+        "--model",
+        action="append",
+        dest="model_ids",
+        help="Restrict to a model_id (repeatable)",
+    )
+    retention = subparsers.add_parser(
+        "retention", help="Thin old snapshots to weekly/monthly and VACUUM"
+    )
+    retention.add_argument(
+        "--daily-days", type=int, default=config.MODEL_RETENTION_DAILY_DAYS
+    )
+    retention.add_argument(
+        "--weekly-days", type=int, default=config.MODEL_RETENTION_WEEKLY_DAYS
+    )
+    retention.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would be removed",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(levelname)s - %(message)s",
+    )
+    args = cli()
+    if args.command == "retention":
+        get_repository().apply_retention(
+            args.daily_days, args.weekly_days, dry_run=args.dry_run
+        )
+    else:
+        print_trends(args.metric, args.days, args.model_ids, args.window, args.limit)
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
-import time
 from datetime import datetime, timezone
 from typing import Any
 
 import requests
 
-from src import config
+from src import config, metrics
+from src.outbox import Outbox, drain
 from src.scraper import Article
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,11 @@ def _escape_md(text: str | None) -> str:
     return re.sub(r"([_*\[\]()~`>#+\-=|{}.!\\])", r"\\\1", str(text))
 
 
+def _escape_number(value: float | None, spec: str) -> str:
+    return "" if value is None else _escape_md(format(value, spec))
+
+
+@metrics.timed("format.digest")
 def format_digest(
     articles: list[Article],
     model_updates: dict[str, list[dict[str, Any]]] | None = None,
@@ -76,8 +82,18 @@ def format_digest(
         new_models = model_updates.get("new_models", [])
         rank_changes = model_updates.get("rank_changes", [])
         price_changes = model_updates.get("price_changes", [])
-
-        if new_models or rank_changes or price_changes:
+        metric_changes = model_updates.get("metric_changes", [])
+        frontier_changes = model_updates.get("frontier_changes", [])
+        anomalies = model_updates.get("anomalies", [])
+
+        if (
+            new_models
+            or rank_changes
+            or price_changes
+            or metric_changes
+            or frontier_changes
+            or anomalies
+        ):
             lines.append("📊 *AI Model Updates*\n")
 
             if new_models:
@@ -106,6 +122,40 @@ def format_digest(
                         f"💰 {model_name}: \\${old_price} → \\${new_price} \\({change_pct}%\\)\n"
                     )
 
+            for change in metric_changes:
+                model_name = _escape_md(change["name"])
+                metric = _escape_md(change["metric"])
+                old_value = _escape_number(change["old_value"], ".4g")
+                new_value = _escape_number(change["new_value"], ".4g")
+                delta = _escape_number(change["change"], "+.4g")
+                lines.append(
+                    f"📐 {model_name} {metric}: {old_value} → {new_value} \\({delta}\\)\n"
+                )
+
+            for change in frontier_changes:
+                model_name = _escape_md(change["name"])
+                score = _escape_number(change["intelligence_index"], ".4g")
+                price = _escape_number(change["price"], ".4g")
+                if change["status"] == "joined":
+                    lines.append(
+                        f"🎯 {model_name} joined the price/intelligence frontier \\(intelligence: {score}, \\${price}\\)\n"
+                    )
+                else:
+                    lines.append(
+                        f"🚪 {model_name} left the price/intelligence frontier\n"
+                    )
+
+            for anomaly in anomalies:
+                model_name = _escape_md(anomaly["name"])
+                metric = _escape_md(anomaly["metric"])
+                old_value = _escape_number(anomaly["old_value"], ".4g")
+                new_value = _escape_number(anomaly["new_value"], ".4g")
+                change_pct = _escape_number(anomaly["change_percent"], "+.1%")
+                zscore = _escape_number(anomaly["zscore"], "+.1f")
+                lines.append(
+                    f"⚠️ {model_name} {metric}: {old_value} → {new_value} \\({change_pct}, z {zscore}\\)\n"
+                )
+
     return "\n".join(lines)
 
 
@@ -164,6 +214,7 @@ def send_telegram(text: str) -> bool:
 
     for attempt in range(1, max_retries + 1):
         try:
+            metrics.incr("http.telegram")
             resp = requests.post(url, json=payload, timeout=30)
 
             if resp.status_code == 200:
@@ -188,18 +239,24 @@ def send_telegram(text: str) -> bool:
 
         if attempt < max_retries:
             logger.info("Retrying in %ds...", backoff)
-            time.sleep(backoff)
+            metrics.incr("retries.telegram")
+            metrics.sleep("telegram_backoff", backoff)
             backoff *= 3  # exponential: 2s → 6s → 18s
 
     logger.error("Failed to send Telegram message after %d attempts", max_retries)
     return False
 
 
+@metrics.timed("deliver.telegram")
 def send_digest(
     articles: list[Article],
     model_updates: dict[str, list[dict[str, Any]]] | None = None,
 ) -> bool:
-    """Format articles into digest, chunk, and send via Telegram (1s between chunks)."""
+    """Format articles into digest, chunk, and deliver the chunks via the outbox.
+
+    Each chunk is keyed by date and content, so a re-run on the same day only
+    sends the chunks that did not go out the first time.
+    """
     if not articles:
         logger.info("No articles to send in digest")
         return True
@@ -211,24 +268,78 @@ def send_digest(
         "Sending digest: %d article(s) in %d chunk(s)", len(articles), len(chunks)
     )
 
-    for i, chunk in enumerate(chunks, 1):
-        if not send_telegram(chunk):
-            logger.error("Failed to send chunk %d/%d", i, len(chunks))
-            return False
-        if i < len(chunks):
-            time.sleep(1)
+    payloads = [{"text": chunk} for chunk in chunks]
+    if config.DRY_RUN:
+        results = deliver_telegram_chunks(payloads)
+        return not any(isinstance(r, BaseException) for r in results)
+
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    with Outbox() as box:
+        for payload in payloads:
+            digest = hashlib.sha1(payload["text"].encode("utf-8")).hexdigest()[:12]
+            box.enqueue("telegram", f"telegram:{today}:{digest}", payload)
+        stats = drain(["telegram"], outbox=box)
+
+    if stats["telegram"].failed:
+        logger.error("Failed to send %d chunk(s)", stats["telegram"].failed)
+        return False
 
     logger.info("Digest sent successfully")
     return True
 
 
-def send_failure_notification(error_message: str) -> bool:
-    """Send a MarkdownV2-escaped failure notification with timestamp via Telegram."""
+def deliver_telegram_chunks(payloads: list[dict[str, Any]]) -> list[Any]:
+    """Outbox handler: send chunks in order, 1s apart.
+
+    Once a chunk fails the rest are not attempted, so a retry never delivers
+    a later part of the digest before an earlier one.
+    """
+    results: list[Any] = []
+    for i, payload in enumerate(payloads, 1):
+        if results and isinstance(results[-1], BaseException):
+            results.append(RuntimeError("previous chunk failed"))
+            continue
+        if not send_telegram(payload["text"]):
+            logger.error("Failed to send chunk %d/%d", i, len(payloads))
+            results.append(RuntimeError("Telegram send failed"))
+            continue
+        results.append(True)
+        if i < len(payloads):
+            metrics.sleep("telegram_pacing", 1)
+    return results
+
+
+def _format_regressions(regressions: list[str]) -> str:
+    lines = "\n".join(f"• {_escape_md(line)}" for line in regressions)
+    return f"📉 *성능 저하 감지*\n{lines}"
+
+
+def send_failure_notification(
+    error_message: str, regressions: list[str] | None = None
+) -> bool:
+    """Send a MarkdownV2-escaped failure notification with timestamp via Telegram.
+
+    ``regressions`` (run history flags, see src.run_history) are appended.
+    """
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     escaped_error = _escape_md(error_message)
     escaped_timestamp = _escape_md(timestamp)
 
-    text = f"⚠️ *InsightFlow 실행 실패*\n\n{escaped_error}\n\n{escaped_timestamp}"
+    text = f"⚠️ *InsightFlow 실행 실패*\n\n{escaped_error}\n\n"
+    if regressions:
+        text += f"{_format_regressions(regressions)}\n\n"
+    text += escaped_timestamp
 
     logger.warning("Sending failure notification: %s", error_message)
     return send_telegram(text)
+
+
+def send_health_notification(regressions: list[str]) -> bool:
+    """Warn via Telegram about performance regressions of a successful run."""
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    text = (
+        f"🩺 *InsightFlow 성능 경고*\n\n{_format_regressions(regressions)}"
+        f"\n\n{_escape_md(timestamp)}"
+    )
+    logger.warning("Sending health notification: %d regressions", len(regressions))
+    return send_telegram(text)
@@ -1,20 +1,234 @@
-"""Shared utilities for Notion integration modules."""
+"""Shared utilities for Notion integration modules.
+
+Every Notion request of the process, sync or async and from any delivery
+stage, draws from one :func:`request_bucket`, so the integration as a whole
+stays inside Notion's ~3 requests/second. ``data/notion_cache.json`` is only
+changed through :func:`cache_transaction`, which serializes read-modify-write
+cycles and replaces the file atomically.
+"""
 
 from __future__ import annotations
 
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Any, cast
 
+import httpx
 import notion_client
+from notion_client.errors import APIErrorCode, APIResponseError
+
+from src import config, metrics
+
+logger = logging.getLogger(__name__)
+
+NOTION_CACHE_PATH = Path("data") / "notion_cache.json"
+
+# Notion API calls made by this process, keyed by "METHOD endpoint"
+API_CALLS: Counter[str] = Counter()
+
+_ID_SEGMENT = re.compile(r"^[0-9a-fA-F-]{32,36}$")
+
+# Serializes every read-modify-write of NOTION_CACHE_PATH in this process
+_cache_lock = threading.RLock()
+
+
+class TokenBucket:
+    """Token bucket: ``rate`` tokens/second, bursts up to ``capacity``.
+
+    A caller reserves its token under a thread lock and then sleeps until the
+    token is due, so one bucket can be shared by threads and by any number of
+    event loops (each delivery stage runs its own ``asyncio.run``).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()  # tokens accrue from this instant on
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds`` (used on 429 Retry-After)."""
+        with self._lock:
+            self._updated = max(self._updated, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def _reserve(self) -> tuple[float, bool]:
+        """Take a token: seconds until it is due, and whether a pause applies."""
+        with self._lock:
+            now = time.monotonic()
+            paused = self._updated > now
+            if not paused:
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+            self._tokens -= 1
+            due = self._updated + max(0.0, -self._tokens) / self.rate
+        return due - now, paused
+
+    async def acquire(self) -> None:
+        wait, paused = self._reserve()
+        if wait > 0:
+            name = "notion_rate_limit" if paused else "notion_pacing"
+            await metrics.async_sleep(name, wait)
+
+    def acquire_sync(self) -> None:
+        wait, paused = self._reserve()
+        if wait > 0:
+            metrics.sleep("notion_rate_limit" if paused else "notion_pacing", wait)
+
+
+_bucket: TokenBucket | None = None
+_bucket_lock = threading.Lock()
+
+
+def request_bucket() -> TokenBucket:
+    """The process-wide bucket every Notion request draws from."""
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            _bucket = TokenBucket(config.NOTION_REQUESTS_PER_SECOND)
+        return _bucket
+
+
+def _endpoint_key(request: httpx.Request) -> str:
+    segments = [
+        "{id}" if _ID_SEGMENT.match(seg) else seg
+        for seg in request.url.path.split("/")
+        if seg and seg != "v1"
+    ]
+    return f"{request.method} {'/'.join(segments)}"
+
+
+def _count_request(request: httpx.Request) -> None:
+    API_CALLS[_endpoint_key(request)] += 1
+    metrics.incr("http.notion")
+
+
+def _throttle_request(request: httpx.Request) -> None:
+    request_bucket().acquire_sync()
 
-from src import config
+
+async def count_request_async(request: httpx.Request) -> None:
+    """httpx.AsyncClient request hook (async hooks must be coroutines)."""
+    _count_request(request)
 
 
 def get_client() -> notion_client.Client:
     """Create and return a Notion API client."""
-    return notion_client.Client(auth=config.NOTION_API_KEY)
+    client = notion_client.Client(auth=config.NOTION_API_KEY)
+    client.client.event_hooks["request"] += [_throttle_request, _count_request]
+    return client
+
+
+def log_api_calls(label: str) -> None:
+    """Log the Notion API call counts accumulated so far in this run."""
+    total = sum(API_CALLS.values())
+    breakdown = ", ".join(f"{key}={count}" for key, count in sorted(API_CALLS.items()))
+    logger.info("%s: %d Notion API call(s) (%s)", label, total, breakdown or "none")
 
 
 def resolve_data_source_id(client: notion_client.Client, database_id: str) -> str:
-    """Retrieve the data_source_id from a database_id (Notion API 2025-09-03)."""
+    """Retrieve the data_source_id from a database_id (Notion API 2025-09-03).
+
+    Cached in data/notion_cache.json; see :func:`invalidate_data_source`.
+    """
+    cache_key = f"database:{database_id}"
+    cached = cached_data_source_id(cache_key)
+    if cached:
+        return cached
+
     data = cast(dict[str, Any], client.databases.retrieve(database_id=database_id))
-    return data["data_sources"][0]["id"]
+    data_source_id: str = data["data_sources"][0]["id"]
+    remember_data_source_id(cache_key, data_source_id)
+    return data_source_id
+
+
+def load_cache() -> dict[str, Any]:
+    """Load the local Notion cache (data/notion_cache.json). Empty if missing."""
+    if not NOTION_CACHE_PATH.exists():
+        return {}
+
+    try:
+        with _cache_lock, open(NOTION_CACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (json.JSONDecodeError, OSError):
+        logger.exception("Failed to load notion_cache.json, starting fresh")
+        return {}
+
+
+def save_cache(cache: dict[str, Any]) -> None:
+    """Replace the cache file atomically (temp file + ``os.replace``)."""
+    NOTION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with _cache_lock:
+        fd, tmp_name = tempfile.mkstemp(dir=NOTION_CACHE_PATH.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_name, NOTION_CACHE_PATH)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+@contextmanager
+def cache_transaction() -> Iterator[dict[str, Any]]:
+    """Yield the current cache for in-place changes, then save it.
+
+    The whole cycle holds the cache lock, so concurrent stages merge their
+    changes instead of overwriting each other with stale copies. Keep
+    network calls outside the block.
+    """
+    with _cache_lock:
+        cache = load_cache()
+        yield cache
+        save_cache(cache)
+
+
+def page_title(page: dict[str, Any], prop: str = "제목") -> str:
+    """Plain-text title of a page returned by the Notion API."""
+    parts = page.get("properties", {}).get(prop, {}).get("title", [])
+    return "".join(part.get("plain_text", "") for part in parts)
+
+
+def cached_data_source_id(key: str) -> str | None:
+    """Return the cached data_source_id for ``key`` (e.g. "weekly:2026-W07")."""
+    return load_cache().get("data_sources", {}).get(key)
+
+
+def remember_data_source_id(key: str, data_source_id: str) -> None:
+    with cache_transaction() as cache:
+        cache.setdefault("data_sources", {})[key] = data_source_id
+
+
+def invalidate_data_source(data_source_id: str) -> None:
+    """Drop every cache entry pointing at ``data_source_id``.
+
+    Resolutions are never revalidated proactively; this is called only when a
+    write against the data source fails with ``object_not_found``.
+    """
+    with cache_transaction() as cache:
+        resolved = cache.get("data_sources", {})
+        stale = [key for key, value in resolved.items() if value == data_source_id]
+        for key in stale:
+            del resolved[key]
+        cache.get("dedup", {}).pop(data_source_id, None)
+    logger.info("Invalidated cached data source %s (%s)", data_source_id, stale)
+
+
+def is_object_not_found(result: object) -> bool:
+    return (
+        isinstance(result, APIResponseError)
+        and result.code == APIErrorCode.ObjectNotFound
+    )
@@ -1,17 +1,30 @@
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
 from typing import Any, cast
 
 import notion_client
 
-from src import config
-from src.notion_common import get_client, resolve_data_source_id
+from src import config, metrics
+from src.article_codec import article_from_dict, article_to_dict
+from src.notion_common import (
+    cache_transaction,
+    cached_data_source_id,
+    get_client,
+    load_cache,
+    log_api_calls,
+    page_title,
+    remember_data_source_id,
+    resolve_data_source_id,
+)
+from src.notion_writer import create_pages_in
+from src.outbox import Outbox, drain
 from src.scraper import Article
 
 logger = logging.getLogger(__name__)
 
-MAX_NOTION_PER_RUN = 5
+MAX_NOTION_PER_RUN = 200
 
 _DATABASE_PROPERTIES: dict[str, Any] = {
     "제목": {"type": "title", "title": {}},
@@ -40,15 +53,22 @@ _DATABASE_PROPERTIES: dict[str, Any] = {
 }
 
 
-def ensure_database(client: notion_client.Client) -> str:
+def ensure_database(client: notion_client.Client, week_id: str | None = None) -> str:
+    """Find or create the weekly Articles database for ``week_id`` (default: now)."""
     # Backward-compatible: use explicit DB ID if set
     if config.NOTION_DATABASE_ID:
         logger.info("Using existing Notion database: %s", config.NOTION_DATABASE_ID)
         return resolve_data_source_id(client, config.NOTION_DATABASE_ID)
 
-    week_id = config.get_week_identifier()  # e.g. "2026-W07"
+    week_id = week_id or config.get_week_identifier()  # e.g. "2026-W07"
     db_title = f"{week_id} Articles"
 
+    cache_key = f"weekly:{week_id}"
+    cached = cached_data_source_id(cache_key)
+    if cached:
+        logger.info("Using cached weekly database '%s': %s", db_title, cached)
+        return cached
+
     # 1. Search for existing weekly DB
     results = cast(
         dict[str, Any],
@@ -62,6 +82,7 @@ def ensure_database(client: notion_client.Client) -> str:
         if title_parts and title_parts[0].get("plain_text") == db_title:
             ds_id = result["id"]  # search result id is the data_source_id
             logger.info("Reusing weekly database '%s': %s", db_title, ds_id)
+            remember_data_source_id(cache_key, ds_id)
             return ds_id
 
     # 2. Create new weekly DB (uses initial_data_source to work around SDK pick() bug)
@@ -80,23 +101,84 @@ def ensure_database(client: notion_client.Client) -> str:
     )
     ds_id = data["data_sources"][0]["id"]
     logger.info("Created weekly database '%s': %s", db_title, ds_id)
+    remember_data_source_id(cache_key, ds_id)
     return ds_id
 
 
-def _is_duplicate(
-    client: notion_client.Client,
-    data_source_id: str,
-    source: str,
-    source_id: str,
-) -> bool:
-    response = cast(
-        dict[str, Any],
-        client.data_sources.query(
-            data_source_id=data_source_id,
-            filter={"property": "제목", "title": {"contains": f"{source}:{source_id}"}},
-        ),
+def _article_key(article: Article) -> str:
+    return f"{article.source}:{article.source_id}"
+
+
+def load_existing_keys(client: notion_client.Client, data_source_id: str) -> set[str]:
+    """Return the ``source:source_id`` keys of every page in the data source.
+
+    One paginated scan replaces a per-article ``contains`` query. The result is
+    cached in data/notion_cache.json and reused while the data source's
+    ``last_edited_time`` is unchanged (:func:`remember_keys` moves it along
+    with our own writes), so a warm run costs a single retrieve.
+    """
+    data_source = cast(
+        dict[str, Any], client.data_sources.retrieve(data_source_id=data_source_id)
+    )
+    validator = data_source.get("last_edited_time")
+
+    entry = load_cache().get("dedup", {}).get(data_source_id)
+    if entry and validator and entry.get("last_edited_time") == validator:
+        keys = set(entry.get("keys", []))
+        logger.info("Dedup cache hit for %s (%d keys)", data_source_id, len(keys))
+        return keys
+
+    keys: set[str] = set()
+    cursor: str | None = None
+    while True:
+        query: dict[str, Any] = {
+            "data_source_id": data_source_id,
+            "page_size": 100,
+            "filter_properties": ["title"],
+        }
+        if cursor:
+            query["start_cursor"] = cursor
+        response = cast(dict[str, Any], client.data_sources.query(**query))
+        for page in response.get("results", []):
+            title = page_title(page)
+            if title:
+                keys.add(title.split(" ", 1)[0])
+        if not response.get("has_more"):
+            break
+        cursor = response.get("next_cursor")
+
+    # Re-read under the lock: the scan took a while and other stages may have
+    # updated the cache meanwhile.
+    with cache_transaction() as cache:
+        cache.setdefault("dedup", {})[data_source_id] = {
+            "last_edited_time": validator,
+            "keys": sorted(keys),
+        }
+    logger.info("Scanned %d existing pages in %s", len(keys), data_source_id)
+    return keys
+
+
+def remember_keys(
+    client: notion_client.Client, data_source_id: str, keys: set[str]
+) -> None:
+    """Record keys we just created so the cached set stays complete.
+
+    Creating pages moves the data source's ``last_edited_time``, so the
+    validator is re-read too; otherwise the next run would rescan. An entry
+    that was never validated by a full scan keeps no validator.
+    """
+    if not keys:
+        return
+    data_source = cast(
+        dict[str, Any], client.data_sources.retrieve(data_source_id=data_source_id)
     )
-    return len(response.get("results", [])) > 0
+    with cache_transaction() as cache:
+        entry = cache.setdefault("dedup", {}).setdefault(
+            data_source_id, {"last_edited_time": None, "keys": []}
+        )
+        entry["keys"] = sorted(set(entry.get("keys", [])) | keys)
+        if entry.get("last_edited_time"):
+            entry["last_edited_time"] = data_source.get("last_edited_time")
 
 
 def _build_page_properties(
@@ -129,7 +211,13 @@ def _build_page_properties(
     }
 
 
+@metrics.timed("deliver.notion")
 def send_to_notion(articles: list[Article]) -> int:
+    """Enqueue notable articles in the outbox and deliver pending Notion pages.
+
+    Returns:
+        Number of pages created in this drain.
+    """
     if not config.NOTION_API_KEY:
         logger.warning("NOTION_API_KEY not set, skipping Notion sync")
         return 0
@@ -138,35 +226,103 @@ def send_to_notion(articles: list[Article]) -> int:
         logger.info("[DRY RUN] Skipping Notion sync")
         return 0
 
+    notable = [a for a in articles if a.relevance_score >= config.ISSUE_THRESHOLD]
+    if not notable:
+        logger.info("No articles above issue threshold (%.1f)", config.ISSUE_THRESHOLD)
+        return 0
+
+    # Pinned at enqueue time, so a retry next week still lands in this
+    # week's database (and is deduped against it).
+    week_id = config.get_week_identifier()
     try:
-        client = get_client()
-        data_source_id = ensure_database(client)
+        with Outbox() as box:
+            for article in notable[:MAX_NOTION_PER_RUN]:
+                box.enqueue(
+                    "notion",
+                    f"notion:{_article_key(article)}",
+                    {**article_to_dict(article), "week_id": week_id},
+                )
+            stats = drain(["notion"], outbox=box)
+        # Articles found to already have a page are delivered, not created
+        return sum(1 for result in stats["notion"].results if "page_id" in result)
 
-        notable = [a for a in articles if a.relevance_score >= config.ISSUE_THRESHOLD]
-        if not notable:
-            logger.info(
-                "No articles above issue threshold (%.1f)", config.ISSUE_THRESHOLD
-            )
-            return 0
+    except Exception:
+        logger.exception("Notion sync failed")
+        return 0
+    finally:
+        log_api_calls("Notion sync")
 
-        notable = notable[:MAX_NOTION_PER_RUN]
-        created_count = 0
 
-        for article in notable:
-            if _is_duplicate(client, data_source_id, article.source, article.source_id):
-                logger.info(
-                    "Skipping duplicate: %s:%s", article.source, article.source_id
-                )
-                continue
+def deliver_notion_pages(payloads: list[dict[str, Any]]) -> list[Any]:
+    """Outbox handler: create article pages in their weekly databases.
 
-            page_payload = _build_page_properties(article, data_source_id)
-            client.pages.create(**page_payload)
-            logger.info("Created Notion page: [%s] %s", article.source, article.title)
-            created_count += 1
+    Each payload goes to the database of the week it was enqueued in
+    (``week_id``; payloads from before it was recorded use this week), so
+    retries of older items neither land in nor dedupe against the wrong
+    week. Articles that already have a page there (per
+    :func:`load_existing_keys`) count as delivered without another write.
+    """
+    client = get_client()
+    weeks: dict[str | None, list[int]] = defaultdict(list)
+    for i, payload in enumerate(payloads):
+        weeks[payload.get("week_id")].append(i)
 
-        logger.info("Created %d/%d Notion pages", created_count, len(notable))
-        return created_count
+    results: list[Any] = [None] * len(payloads)
+    for week_id, indices in weeks.items():
+        week_results = _deliver_week(
+            client, week_id, [article_from_dict(payloads[i]) for i in indices]
+        )
+        for i, result in zip(indices, week_results):
+            results[i] = result
+    return results
 
-    except Exception:
-        logger.exception("Notion sync failed")
-        return 0
+
+def _deliver_week(
+    client: notion_client.Client, week_id: str | None, articles: list[Article]
+) -> list[Any]:
+    data_source_id = ensure_database(client, week_id)
+    existing = load_existing_keys(client, data_source_id)
+
+    results: list[Any] = [None] * len(articles)
+    pending: list[int] = []
+    for i, article in enumerate(articles):
+        key = _article_key(article)
+        if key in existing:
+            logger.info("Skipping duplicate: %s", key)
+            results[i] = {"duplicate": key}
+            continue
+        existing.add(key)
+        pending.append(i)
+
+    created = create_pages_in(
+        data_source_id,
+        [_build_page_properties(articles[i], data_source_id) for i in pending],
+        resolve=lambda: ensure_database(client, week_id),
+    )
+
+    created_keys: set[str] = set()
+    for i, result in zip(pending, created):
+        article = articles[i]
+        if isinstance(result, BaseException):
+            logger.error(
+                "Failed to create Notion page [%s] %s: %s",
+                article.source,
+                article.title,
+                result,
+            )
+            results[i] = result
+            continue
+        logger.info("Created Notion page: [%s] %s", article.source, article.title)
+        results[i] = {"page_id": result.get("id")}
+        created_keys.add(_article_key(article))
+
+    if created_keys:
+        remember_keys(client, data_source_id, created_keys)
+
+    logger.info(
+        "Created %d/%d Notion pages in %s",
+        len(created_keys),
+        len(articles),
+        week_id or "this week",
+    )
+    return results
@@ -6,8 +6,15 @@ from typing import Any, cast
 
 import notion_client
 
-from src import config
-from src.notion_common import get_client, resolve_data_source_id
+from src import config, metrics
+from src.notion_common import (
+    cached_data_source_id,
+    get_client,
+    remember_data_source_id,
+    resolve_data_source_id,
+)
+from src.notion_writer import create_pages_in
+from src.outbox import Outbox, drain
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +27,9 @@ _MODEL_TRACKER_PROPERTIES: dict[str, Any] = {
                 {"name": "신규 모델", "color": "green"},
                 {"name": "순위 변동", "color": "blue"},
                 {"name": "가격 변동", "color": "orange"},
+                {"name": "지표 변동", "color": "purple"},
+                {"name": "프론티어 변동", "color": "pink"},
+                {"name": "이상 변동", "color": "red"},
             ]
         },
     },
@@ -43,6 +53,11 @@ def ensure_model_tracker_db(client: notion_client.Client) -> str:
         return resolve_data_source_id(client, config.NOTION_MODEL_TRACKER_DB_ID)
 
     db_title = "AI Model Tracker"
+    cache_key = f"title:{db_title}"
+    cached = cached_data_source_id(cache_key)
+    if cached:
+        logger.info("Using cached Model Tracker database '%s': %s", db_title, cached)
+        return cached
 
     results = cast(
         dict[str, Any],
@@ -58,6 +73,7 @@ def ensure_model_tracker_db(client: notion_client.Client) -> str:
             logger.info(
                 "Reusing Model Tracker database '%s': %s", db_title, data_source_id
             )
+            remember_data_source_id(cache_key, data_source_id)
             return data_source_id
 
     logger.info(
@@ -75,6 +91,7 @@ def ensure_model_tracker_db(client: notion_client.Client) -> str:
     )
     data_source_id = data["data_sources"][0]["id"]
     logger.info("Created Model Tracker database '%s': %s", db_title, data_source_id)
+    remember_data_source_id(cache_key, data_source_id)
     return data_source_id
 
 
@@ -84,8 +101,9 @@ def _build_model_page(
     title_text: str,
     model_name: str,
     detail_text: str,
+    date: str | None = None,
 ) -> dict[str, Any]:
-    today = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
+    today = date or datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
     return {
         "parent": {"type": "data_source_id", "data_source_id": data_source_id},
         "properties": {
@@ -98,16 +116,18 @@ def _build_model_page(
     }
 
 
+@metrics.timed("deliver.notion_model")
 def send_model_updates_to_notion(
     model_updates: dict[str, list[dict[str, Any]]] | None,
 ) -> int:
     """Write model change entries to the AI Model Tracker Notion database.
 
     Args:
-        model_updates: Dict with keys new_models, rank_changes, price_changes.
+        model_updates: Dict with keys new_models, rank_changes, price_changes,
+            metric_changes, frontier_changes, anomalies.
 
     Returns:
-        Number of pages created.
+        Number of pages delivered from the outbox.
     """
     if not config.NOTION_API_KEY:
         logger.warning("NOTION_API_KEY not set, skipping Model Tracker Notion sync")
@@ -123,65 +143,163 @@ def send_model_updates_to_notion(
     new_models = model_updates.get("new_models", [])
     rank_changes = model_updates.get("rank_changes", [])
     price_changes = model_updates.get("price_changes", [])
+    metric_changes = model_updates.get("metric_changes", [])
+    frontier_changes = model_updates.get("frontier_changes", [])
+    anomalies = model_updates.get("anomalies", [])
 
-    if not new_models and not rank_changes and not price_changes:
+    if not any(
+        (
+            new_models,
+            rank_changes,
+            price_changes,
+            metric_changes,
+            frontier_changes,
+            anomalies,
+        )
+    ):
         return 0
 
-    try:
-        client = get_client()
-        data_source_id = ensure_model_tracker_db(client)
-        created_count = 0
-
-        for model in new_models:
-            name = model.get("name", "Unknown")
-            creator = model.get("creator", "Unknown")
-            intelligence_index = model.get("intelligence_index", 0)
-            page_payload = _build_model_page(
-                data_source_id=data_source_id,
-                change_type="신규 모델",
-                title_text=f"🆕 {name} by {creator}",
-                model_name=name,
-                detail_text=f"Intelligence: {intelligence_index}",
-            )
-            client.pages.create(**page_payload)
-            logger.info("Created Model Tracker page: new model %s", name)
-            created_count += 1
-
-        for change in rank_changes:
-            name = change.get("name", "Unknown")
-            old_rank = change.get("old_rank", "?")
-            new_rank = change.get("new_rank", "?")
-            intelligence_index = change.get("intelligence_index", 0)
-            page_payload = _build_model_page(
-                data_source_id=data_source_id,
-                change_type="순위 변동",
-                title_text=f"📈 {name}: #{old_rank} → #{new_rank}",
-                model_name=name,
-                detail_text=f"Intelligence: {intelligence_index}",
-            )
-            client.pages.create(**page_payload)
-            logger.info("Created Model Tracker page: rank change %s", name)
-            created_count += 1
-
-        for change in price_changes:
-            name = change.get("name", "Unknown")
-            old_price = change.get("old_price", 0)
-            new_price = change.get("new_price", 0)
-            change_percent = change.get("change_percent", 0)
-            page_payload = _build_model_page(
-                data_source_id=data_source_id,
-                change_type="가격 변동",
-                title_text=f"💰 {name}: ${old_price:.4f} → ${new_price:.4f}",
-                model_name=name,
-                detail_text=f"{change_percent:+.1%} change",
-            )
-            client.pages.create(**page_payload)
-            logger.info("Created Model Tracker page: price change %s", name)
-            created_count += 1
+    today = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
+    entries: list[dict[str, Any]] = []
 
-        logger.info("Created %d Model Tracker pages total", created_count)
-        return created_count
+    for model in new_models:
+        name = model.get("name", "Unknown")
+        creator = model.get("creator", "Unknown")
+        intelligence_index = model.get("intelligence_index", 0)
+        entries.append(
+            {
+                "change_type": "신규 모델",
+                "title_text": f"🆕 {name} by {creator}",
+                "model_name": name,
+                "detail_text": f"Intelligence: {intelligence_index}",
+            }
+        )
+
+    for change in rank_changes:
+        name = change.get("name", "Unknown")
+        old_rank = change.get("old_rank", "?")
+        new_rank = change.get("new_rank", "?")
+        intelligence_index = change.get("intelligence_index", 0)
+        entries.append(
+            {
+                "change_type": "순위 변동",
+                "title_text": f"📈 {name}: #{old_rank} → #{new_rank}",
+                "model_name": name,
+                "detail_text": f"Intelligence: {intelligence_index}",
+            }
+        )
+
+    for change in price_changes:
+        name = change.get("name", "Unknown")
+        old_price = change.get("old_price", 0)
+        new_price = change.get("new_price", 0)
+        change_percent = change.get("change_percent", 0)
+        entries.append(
+            {
+                "change_type": "가격 변동",
+                "title_text": f"💰 {name}: ${old_price:.4f} → ${new_price:.4f}",
+                "model_name": name,
+                "detail_text": f"{change_percent:+.1%} change",
+            }
+        )
+
+    for change in metric_changes:
+        name = change.get("name", "Unknown")
+        metric = change.get("metric", "?")
+        old_value = change.get("old_value", 0)
+        new_value = change.get("new_value", 0)
+        change_percent = change.get("change_percent")
+        detail = f"{change.get('change', 0):+.4g}"
+        if change_percent is not None:
+            detail += f" ({change_percent:+.1%})"
+        title = f"📐 {name} {metric}: {old_value:.4g} → {new_value:.4g}"
+        entries.append(
+            {
+                "change_type": "지표 변동",
+                "title_text": title,
+                "model_name": name,
+                "detail_text": detail,
+                "metric": metric,
+            }
+        )
+
+    for change in frontier_changes:
+        name = change.get("name", "Unknown")
+        joined = change.get("status") == "joined"
+        price = change.get("price")
+        price_text = "?" if price is None else f"${price:.4f}"
+        entries.append(
+            {
+                "change_type": "프론티어 변동",
+                "title_text": (
+                    f"🎯 {name} joined the frontier"
+                    if joined
+                    else f"🚪 {name} left the frontier"
+                ),
+                "model_name": name,
+                "detail_text": (
+                    f"Intelligence: {change.get('intelligence_index')}, "
+                    f"Price: {price_text}, "
+                    f"Frontier size: {change.get('frontier_size')}"
+                ),
+            }
+        )
+
+    for anomaly in anomalies:
+        name = anomaly.get("name", "Unknown")
+        metric = anomaly.get("metric", "?")
+        old_value = anomaly.get("old_value", 0)
+        new_value = anomaly.get("new_value", 0)
+        title = f"⚠️ {name} {metric}: {old_value:.4g} → {new_value:.4g}"
+        entries.append(
+            {
+                "change_type": "이상 변동",
+                "title_text": title,
+                "model_name": name,
+                "detail_text": (
+                    f"{anomaly.get('change_percent', 0):+.1%} change, "
+                    f"z-score {anomaly.get('zscore', 0):+.1f} vs. its own baseline"
+                ),
+                "metric": metric,
+            }
+        )
+
+    try:
+        with Outbox() as box:
+            for entry in entries:
+                # Several metrics can change for one model on the same day.
+                metric = entry.pop("metric", None)
+                parts = [today, entry["change_type"], entry["model_name"]]
+                key = ":".join(["notion_model", *parts, *([metric] if metric else [])])
+                box.enqueue("notion_model", key, {**entry, "date": today})
+            stats = drain(["notion_model"], outbox=box)
+        return stats["notion_model"].sent
 
     except Exception:
         logger.exception("Model tracker Notion sync failed")
         return 0
+
+
+def deliver_model_pages(payloads: list[dict[str, Any]]) -> list[Any]:
+    """Outbox handler: create Model Tracker pages from queued change entries."""
+    client = get_client()
+    data_source_id = ensure_model_tracker_db(client)
+    pages = [_build_model_page(data_source_id, **payload) for payload in payloads]
+    results = create_pages_in(
+        data_source_id, pages, resolve=lambda: ensure_model_tracker_db(client)
+    )
+
+    created_count = 0
+    delivered: list[Any] = []
+    for payload, result in zip(payloads, results):
+        label = f"{payload['change_type']} {payload['model_name']}"
+        if isinstance(result, BaseException):
+            logger.error("Failed to create Model Tracker page (%s): %s", label, result)
+            delivered.append(result)
+            continue
+        logger.info("Created Model Tracker page: %s", label)
+        delivered.append({"page_id": result.get("id")})
+        created_count += 1
+
+    logger.info("Created %d Model Tracker pages total", created_count)
+    return delivered
@@ -0,0 +1,203 @@
+"""Incremental pull of the Notion "읽음" checkbox into a local read-state index.
+
+``data/read_state.json`` maps ``source:source_id`` to the page's read flag and
+stores a high-water mark: the newest page ``last_edited_time`` seen so far.
+A sync only reads what changed since then:
+
+1. the weekly Articles data sources are listed once and cached in the state
+   (weeks are only ever added); the list is refreshed by a search only while
+   the current week's data source is not known yet;
+2. each weekly data source is queried with a page-level ``last_edited_time``
+   filter (title and 읽음 properties only): one small query per week.
+
+A data source's own ``last_edited_time`` is not used to skip weeks: nothing
+guarantees that ticking a page's checkbox moves it.
+
+Notion timestamps are minute-granular, so the filter uses ``on_or_after`` and
+pages edited in the mark's minute are re-read; applying them twice is harmless.
+
+Usage:
+    uv run python -m src.notion_read_sync
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, cast
+
+import notion_client
+from notion_client.errors import APIResponseError
+
+from src import config
+from src.notion_common import (
+    get_client,
+    is_object_not_found,
+    log_api_calls,
+    page_title,
+    resolve_data_source_id,
+)
+
+logger = logging.getLogger(__name__)
+
+READ_STATE_PATH = Path("data") / "read_state.json"
+READ_PROPERTY = "읽음"
+
+_WEEKLY_TITLE = re.compile(r"^\d{4}-W\d{2} Articles$")
+
+
+def load_read_state() -> dict[str, Any]:
+    if not READ_STATE_PATH.exists():
+        return {"high_water_mark": None, "articles": {}, "data_sources": {}}
+    try:
+        with open(READ_STATE_PATH, encoding="utf-8") as f:
+            state = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        logger.exception("Failed to load %s, starting fresh", READ_STATE_PATH)
+        return {"high_water_mark": None, "articles": {}, "data_sources": {}}
+    state.setdefault("high_water_mark", None)
+    state.setdefault("articles", {})
+    state.setdefault("data_sources", {})
+    return state
+
+
+def save_read_state(state: dict[str, Any]) -> None:
+    READ_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(READ_STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def read_keys() -> set[str]:
+    """Keys (``source:source_id``) of articles marked read in Notion."""
+    articles = load_read_state()["articles"]
+    return {key for key, entry in articles.items() if entry.get("read")}
+
+
+def _list_weekly_data_sources(client: notion_client.Client) -> dict[str, str]:
+    """Search every weekly Articles data source: ``{week_id: data_source_id}``."""
+    found: dict[str, str] = {}
+    cursor: str | None = None
+    while True:
+        params: dict[str, Any] = {
+            "query": "Articles",
+            "filter": {"value": "data_source", "property": "object"},
+            "page_size": 100,
+        }
+        if cursor:
+            params["start_cursor"] = cursor
+        response = cast(dict[str, Any], client.search(**params))
+        for result in response.get("results", []):
+            title = "".join(p.get("plain_text", "") for p in result.get("title", []))
+            if _WEEKLY_TITLE.match(title):
+                found[title.split(" ", 1)[0]] = result["id"]
+        if not response.get("has_more"):
+            return found
+        cursor = response.get("next_cursor")
+
+
+def _weekly_data_sources(
+    client: notion_client.Client, known: dict[str, str]
+) -> list[str]:
+    """Every weekly Articles data source, oldest week first.
+
+    ``known`` is the cached ``{week_id: data_source_id}`` map, updated in
+    place; it is re-listed only while the current week is missing from it.
+    """
+    if config.NOTION_DATABASE_ID:
+        return [resolve_data_source_id(client, config.NOTION_DATABASE_ID)]
+    if config.get_week_identifier() not in known:
+        known.update(_list_weekly_data_sources(client))
+    return [known[week_id] for week_id in sorted(known)]
+
+
+def _query_changed_pages(
+    client: notion_client.Client,
+    data_source_id: str,
+    high_water_mark: str | None,
+) -> list[dict[str, Any]]:
+    pages: list[dict[str, Any]] = []
+    cursor: str | None = None
+    while True:
+        query: dict[str, Any] = {
+            "data_source_id": data_source_id,
+            "page_size": 100,
+            "filter_properties": ["title", READ_PROPERTY],
+        }
+        if high_water_mark:
+            query["filter"] = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": high_water_mark},
+            }
+        if cursor:
+            query["start_cursor"] = cursor
+        response = cast(dict[str, Any], client.data_sources.query(**query))
+        pages.extend(response.get("results", []))
+        if not response.get("has_more"):
+            return pages
+        cursor = response.get("next_cursor")
+
+
+def sync_read_state(client: notion_client.Client | None = None) -> int:
+    """Pull read flags edited since the last sync; returns pages applied."""
+    client = client or get_client()
+    state = load_read_state()
+    high_water_mark: str | None = state["high_water_mark"]
+    articles: dict[str, dict[str, Any]] = state["articles"]
+    known: dict[str, str] = state["data_sources"]
+
+    data_source_ids = _weekly_data_sources(client, known)
+    logger.info(
+        "Read-state sync: %d data source(s), pages edited since %s",
+        len(data_source_ids),
+        high_water_mark or "the beginning",
+    )
+
+    newest = high_water_mark or ""
+    applied = 0
+    for data_source_id in data_source_ids:
+        try:
+            pages = _query_changed_pages(client, data_source_id, high_water_mark)
+        except APIResponseError as e:
+            if not is_object_not_found(e):
+                raise
+            # A deleted weekly database: forget it, the next listing has the rest
+            logger.warning("Data source %s not found, dropping it", data_source_id)
+            for week_id in [w for w, ds in known.items() if ds == data_source_id]:
+                del known[week_id]
+            continue
+        for page in pages:
+            title = page_title(page)
+            if not title:
+                continue
+            key = title.split(" ", 1)[0]
+            edited = page.get("last_edited_time", "")
+            checkbox = page.get("properties", {}).get(READ_PROPERTY, {})
+            articles[key] = {
+                "read": bool(checkbox.get("checkbox")),
+                "last_edited_time": edited,
+            }
+            newest = max(newest, edited)
+            applied += 1
+
+    state["high_water_mark"] = newest or None
+    save_read_state(state)
+    logger.info(
+        "Read-state sync: %d page(s) applied, %d read of %d tracked",
+        applied,
+        sum(1 for entry in articles.values() if entry.get("read")),
+        len(articles),
+    )
+    return applied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(levelname)s - %(message)s",
+    )
+    try:
+        sync_read_state()
+    finally:
+        log_api_calls("Read-state sync")
@@ -0,0 +1,177 @@
+"""Async, rate-limited Notion page writer shared by the Notion handlers.
+
+Pages are created concurrently on one ``notion_client.AsyncClient`` (a single
+pooled ``httpx.AsyncClient``). Writers draw from the process-wide
+:func:`~src.notion_common.request_bucket`, which keeps the sustained request
+rate of all Notion traffic at the documented ~3 requests/second, and a
+``rate_limited`` (429) response pauses the whole bucket for the server's
+``Retry-After``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import notion_client
+from notion_client.errors import (
+    APIErrorCode,
+    APIResponseError,
+    HTTPResponseError,
+    RequestTimeoutError,
+)
+
+from src import config, metrics
+from src.notion_common import (
+    TokenBucket,
+    count_request_async,
+    invalidate_data_source,
+    is_object_not_found,
+    request_bucket,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 4
+
+
+class AsyncNotionWriter:
+    """Creates Notion pages concurrently under a shared rate limit."""
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        concurrency: int | None = None,
+    ) -> None:
+        """``rate`` gives the writer its own bucket; by default it shares
+        the process-wide one with every other Notion caller."""
+        self.concurrency = concurrency or config.NOTION_WRITE_CONCURRENCY
+        self._bucket = request_bucket() if rate is None else TokenBucket(rate)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._client: notion_client.AsyncClient | None = None
+
+    async def __aenter__(self) -> AsyncNotionWriter:
+        http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.concurrency),
+            event_hooks={"request": [count_request_async]},
+        )
+        self._client = notion_client.AsyncClient(
+            auth=config.NOTION_API_KEY, client=http
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def create_page(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Create one page, retrying rate limits, timeouts and 5xx responses."""
+        assert self._client is not None, "use AsyncNotionWriter as a context manager"
+        backoff = 1.0
+        attempt = 0
+
+        while True:
+            attempt += 1
+            await self._bucket.acquire()
+            try:
+                async with self._slots:
+                    return await self._client.pages.create(**payload)
+            except APIResponseError as e:
+                if e.code != APIErrorCode.RateLimited or attempt == MAX_RETRIES:
+                    raise
+                wait = _retry_after(e.headers, backoff)
+                logger.warning("Notion rate limited, pausing writes for %.1fs", wait)
+                metrics.incr("retries.notion")
+                self._bucket.pause(wait)
+            except (HTTPResponseError, RequestTimeoutError) as e:
+                status = getattr(e, "status", None)
+                if (status is not None and status < 500) or attempt == MAX_RETRIES:
+                    raise
+                logger.warning(
+                    "Notion write failed (attempt %d/%d): %s, retrying in %.0fs",
+                    attempt,
+                    MAX_RETRIES,
+                    e,
+                    backoff,
+                )
+                metrics.incr("retries.notion")
+                await metrics.async_sleep("notion_backoff", backoff)
+            backoff *= 2
+
+    async def create_pages(
+        self, payloads: list[dict[str, Any]]
+    ) -> list[dict[str, Any] | BaseException]:
+        """Create pages concurrently; results keep payload order.
+
+        Failures are returned in place (not raised) so one bad page does not
+        abort the rest of the batch.
+        """
+        return await asyncio.gather(
+            *(self.create_page(payload) for payload in payloads),
+            return_exceptions=True,
+        )
+
+
+def _retry_after(headers: httpx.Headers, default: float) -> float:
+    try:
+        return float(headers.get("retry-after", default))
+    except ValueError:
+        return default
+
+
+def create_pages(
+    payloads: list[dict[str, Any]],
+) -> list[dict[str, Any] | BaseException]:
+    """Synchronous entry point: create ``payloads`` with one shared writer."""
+    if not payloads:
+        return []
+
+    async def _run() -> list[dict[str, Any] | BaseException]:
+        async with AsyncNotionWriter() as writer:
+            return await writer.create_pages(payloads)
+
+    started = time.monotonic()
+    results = asyncio.run(_run())
+    failed = sum(1 for r in results if isinstance(r, BaseException))
+    logger.info(
+        "Notion writer: %d/%d page(s) created in %.1fs",
+        len(results) - failed,
+        len(results),
+        time.monotonic() - started,
+    )
+    return results
+
+
+def create_pages_in(
+    data_source_id: str,
+    payloads: list[dict[str, Any]],
+    resolve: Callable[[], str],
+) -> list[dict[str, Any] | BaseException]:
+    """Create pages under ``data_source_id``, recovering from a stale cache entry.
+
+    If any write fails with ``object_not_found`` the cached resolution is
+    invalidated, ``resolve()`` is called once for a fresh data_source_id and
+    only the failed pages are retried under it.
+    """
+    results = create_pages(payloads)
+    stale = [i for i, result in enumerate(results) if is_object_not_found(result)]
+    if not stale:
+        return results
+
+    logger.warning(
+        "Data source %s not found for %d page(s), re-resolving",
+        data_source_id,
+        len(stale),
+    )
+    invalidate_data_source(data_source_id)
+    fresh_id = resolve()
+    parent = {"type": "data_source_id", "data_source_id": fresh_id}
+    retried = create_pages([{**payloads[i], "parent": parent} for i in stale])
+    for i, result in zip(stale, retried):
+        results[i] = result
+    return results
@@ -0,0 +1,269 @@
+"""Durable outbox for Notion, GitHub and Telegram deliveries.
+
+Every side effect of a run is first enqueued in ``data/outbox.db`` under an
+idempotency key, then delivered by :func:`drain`. Enqueuing an existing key is
+a no-op, so a re-run only sends what is still outstanding; failed items stay
+``pending`` (with their attempt count and last error) and are retried by the
+next drain until ``OUTBOX_MAX_ATTEMPTS`` is reached. Delivered items are kept
+for ``OUTBOX_RETENTION_DAYS`` so same-day re-runs still see their keys.
+
+Destinations are drained concurrently, one worker thread each. Within a
+destination the handler receives the whole batch and applies that API's own
+concurrency limits (GitHubClient, AsyncNotionWriter, sequential Telegram).
+
+Usage:
+    uv run python -m src.outbox status   # outstanding items per destination
+    uv run python -m src.outbox drain    # deliver everything outstanding
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sqlite3
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DB_PATH = Path("data") / "outbox.db"
+
+# A batch handler gets payloads in enqueue order and returns one result per
+# payload: any JSON-serializable value on success, an exception on failure.
+BatchHandler = Callable[[list[dict[str, Any]]], list[Any]]
+
+_CREATE_TABLE_SQL = """\
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    destination TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (status, destination, id);
+"""
+
+
+@dataclass(frozen=True)
+class OutboxItem:
+    id: int
+    destination: str
+    idempotency_key: str
+    payload: dict[str, Any]
+    attempts: int
+
+
+@dataclass
+class DrainStats:
+    sent: int = 0
+    failed: int = 0
+    results: list[Any] = field(default_factory=list)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Outbox:
+    """SQLite-backed delivery queue keyed by idempotency key."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or OUTBOX_DB_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(_CREATE_TABLE_SQL)
+
+    def __enter__(self) -> Outbox:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def enqueue(self, destination: str, key: str, payload: dict[str, Any]) -> bool:
+        """Add a delivery; returns False if ``key`` was already enqueued."""
+        now = _now()
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(destination, idempotency_key, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (destination, key, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+        return cursor.rowcount > 0
+
+    def pending(self, destination: str | None = None) -> list[OutboxItem]:
+        sql = (
+            "SELECT id, destination, idempotency_key, payload, attempts "
+            "FROM outbox WHERE status = 'pending'"
+        )
+        params: tuple[str, ...] = ()
+        if destination is not None:
+            sql += " AND destination = ?"
+            params = (destination,)
+        rows = self.conn.execute(sql + " ORDER BY id", params).fetchall()
+        return [
+            OutboxItem(row[0], row[1], row[2], json.loads(row[3]), row[4])
+            for row in rows
+        ]
+
+    def mark_sent(self, item_id: int, result: Any = None) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, "
+                "result = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result, ensure_ascii=False, default=str), _now(), item_id),
+            )
+
+    def mark_failed(self, item: OutboxItem, error: BaseException) -> None:
+        attempts = item.attempts + 1
+        status = "dead" if attempts >= config.OUTBOX_MAX_ATTEMPTS else "pending"
+        with self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, "
+                "updated_at = ? WHERE id = ?",
+                (status, attempts, f"{type(error).__name__}: {error}", _now(), item.id),
+            )
+        if status == "dead":
+            logger.error(
+                "Outbox item %s gave up after %d attempts: %s",
+                item.idempotency_key,
+                attempts,
+                error,
+            )
+
+    def prune_sent(self, older_than_days: int | None = None) -> int:
+        """Delete delivered items older than the retention window."""
+        days = older_than_days
+        if days is None:
+            days = config.OUTBOX_RETENTION_DAYS
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM outbox WHERE status = 'sent' AND updated_at < ?",
+                (cutoff,),
+            )
+        return cursor.rowcount
+
+    def counts(self) -> dict[tuple[str, str], int]:
+        rows = self.conn.execute(
+            "SELECT destination, status, COUNT(*) FROM outbox GROUP BY 1, 2"
+        ).fetchall()
+        return {(row[0], row[1]): row[2] for row in rows}
+
+
+def _default_handlers() -> dict[str, BatchHandler]:
+    # Imported lazily: the sender modules themselves enqueue into the outbox.
+    from src.notifier import deliver_telegram_chunks
+    from src.notion_handler import deliver_notion_pages
+    from src.notion_model_handler import deliver_model_pages
+    from src.storage import deliver_github_issues
+
+    return {
+        "github": deliver_github_issues,
+        "notion": deliver_notion_pages,
+        "notion_model": deliver_model_pages,
+        "telegram": deliver_telegram_chunks,
+    }
+
+
+def _run_handler(handler: BatchHandler, items: list[OutboxItem]) -> list[Any]:
+    try:
+        results = handler([item.payload for item in items])
+    except Exception as e:
+        logger.exception("Outbox handler failed for %d item(s)", len(items))
+        return [e] * len(items)
+    if len(results) != len(items):
+        error = RuntimeError(
+            f"handler returned {len(results)} results for {len(items)} items"
+        )
+        return [error] * len(items)
+    return results
+
+
+def drain(
+    destinations: list[str] | None = None,
+    handlers: dict[str, BatchHandler] | None = None,
+    outbox: Outbox | None = None,
+) -> dict[str, DrainStats]:
+    """Deliver every pending item for ``destinations`` (default: all).
+
+    Destinations run concurrently; results are written back on the calling
+    thread so the SQLite connection is never shared across threads.
+    """
+    handlers = handlers or _default_handlers()
+    box = outbox or Outbox()
+    try:
+        batches = {
+            name: items
+            for name in (destinations or list(handlers))
+            if (items := box.pending(name))
+        }
+        stats = {name: DrainStats() for name in destinations or handlers}
+        if not batches:
+            return stats
+
+        with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+            futures = {
+                name: pool.submit(_run_handler, handlers[name], items)
+                for name, items in batches.items()
+            }
+            for name, future in futures.items():
+                for item, result in zip(batches[name], future.result()):
+                    if isinstance(result, BaseException):
+                        box.mark_failed(item, result)
+                        stats[name].failed += 1
+                    else:
+                        box.mark_sent(item.id, result)
+                        stats[name].sent += 1
+                        stats[name].results.append(result)
+                logger.info(
+                    "Outbox %s: %d sent, %d failed",
+                    name,
+                    stats[name].sent,
+                    stats[name].failed,
+                )
+        box.prune_sent()
+        return stats
+    finally:
+        if outbox is None:
+            box.close()
+
+
+def cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect or drain the delivery outbox")
+    parser.add_argument("command", choices=["status", "drain"])
+    parser.add_argument(
+        "--destination",
+        action="append",
+        help="Limit drain to a destination (repeatable)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(levelname)s - %(message)s",
+    )
+    args = cli()
+    if args.command == "drain":
+        drain(args.destination)
+    else:
+        with Outbox() as box:
+            for (destination, status), count in sorted(box.counts().items()):
+                print(f"{destination:<14} {status:<8} {count}")
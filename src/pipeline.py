@@ -0,0 +1,159 @@
+"""Dependency-ordered stage executor for the delivery half of the pipeline.
+
+A run is a list of :class:`Stage` objects, each naming the stages it
+``needs``. Every stage starts as soon as those have finished and runs on its
+own worker thread, so independent side effects (GitHub, Notion, model
+tracker, Telegram) overlap and the run takes about as long as its slowest
+chain of dependent stages.
+
+Failures are isolated: a failed stage skips only the stages that need it,
+everything else still runs. A non-fatal stage (``fatal=False``) that fails or
+times out counts as finished with a ``None`` result, so its dependents run
+anyway. A stage past its ``timeout`` is reported as failed; its thread cannot
+be interrupted, so it finishes in the background and its result is dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One unit of work; ``run`` gets the results of the finished stages."""
+
+    name: str
+    run: Callable[[Mapping[str, Any]], Any]
+    needs: tuple[str, ...] = ()
+    timeout: float | None = None
+    fatal: bool = True
+
+
+@dataclass
+class PipelineRun:
+    results: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+    tolerated: dict[str, BaseException] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    durations: dict[str, float] = field(default_factory=dict)
+
+    def raise_for_errors(self) -> None:
+        """Re-raise the first fatal failure, in stage declaration order."""
+        if self.errors:
+            raise next(iter(self.errors.values()))
+
+
+def _topological(stages: Sequence[Stage]) -> list[Stage]:
+    """Stages ordered so each follows everything it needs.
+
+    Raises ValueError for duplicate names, unknown dependencies and cycles.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise ValueError(f"duplicate stage names in {[s.name for s in stages]}")
+    for stage in stages:
+        unknown = set(stage.needs) - by_name.keys()
+        if unknown:
+            raise ValueError(f"stage {stage.name!r} needs unknown {sorted(unknown)}")
+
+    ordered: list[Stage] = []
+    visiting: set[str] = set()
+    done: set[str] = set()
+
+    def visit(stage: Stage) -> None:
+        if stage.name in done:
+            return
+        if stage.name in visiting:
+            raise ValueError(f"dependency cycle through stage {stage.name!r}")
+        visiting.add(stage.name)
+        for name in stage.needs:
+            visit(by_name[name])
+        done.add(stage.name)
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return ordered
+
+
+async def _execute(stages: Sequence[Stage], max_workers: int) -> PipelineRun:
+    loop = asyncio.get_running_loop()
+    run = PipelineRun()
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
+    tasks: dict[str, asyncio.Task[None]] = {}
+
+    async def execute(stage: Stage) -> None:
+        await asyncio.gather(*(tasks[name] for name in stage.needs))
+        blocked = [n for n in stage.needs if n in run.errors or n in run.skipped]
+        if blocked:
+            logger.warning(
+                "Stage %s skipped: %s failed", stage.name, ", ".join(blocked)
+            )
+            run.skipped.append(stage.name)
+            return
+
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(pool, stage.run, dict(run.results)),
+                stage.timeout,
+            )
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(
+                    f"stage {stage.name} timed out after {stage.timeout:g}s"
+                )
+            run.durations[stage.name] = time.perf_counter() - start
+            metrics.observe(f"stage.{stage.name}", run.durations[stage.name])
+            if stage.fatal:
+                logger.error("Stage %s failed: %s", stage.name, e, exc_info=e)
+                run.errors[stage.name] = e
+            else:
+                logger.error(
+                    "Stage %s failed (non-fatal): %s", stage.name, e, exc_info=e
+                )
+                run.tolerated[stage.name] = e
+                run.results[stage.name] = None
+            return
+        run.durations[stage.name] = time.perf_counter() - start
+        metrics.observe(f"stage.{stage.name}", run.durations[stage.name])
+        run.results[stage.name] = result
+        logger.info(
+            "Stage %s done in %.2fs", stage.name, run.durations[stage.name]
+        )
+
+    try:
+        # Topological order: every task a stage awaits already exists.
+        for stage in _topological(stages):
+            tasks[stage.name] = asyncio.ensure_future(execute(stage))
+        await asyncio.gather(*tasks.values())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    order = [stage.name for stage in stages]
+    run.errors = {name: run.errors[name] for name in order if name in run.errors}
+    return run
+
+
+def run_stages(
+    stages: Sequence[Stage], max_workers: int | None = None
+) -> PipelineRun:
+    """Run ``stages`` concurrently in dependency order and collect outcomes.
+
+    Raises ValueError for an invalid graph; stage failures are returned in
+    the :class:`PipelineRun` (see :meth:`PipelineRun.raise_for_errors`).
+    """
+    _topological(stages)
+    if not stages:
+        return PipelineRun()
+    return asyncio.run(_execute(stages, max_workers or len(stages)))
@@ -0,0 +1,263 @@
+"""Profiling mode for pipeline runs (``python -m src.main --profile``).
+
+:func:`profiled` wraps a run and writes three files to ``PROFILE_DIR``:
+
+- ``<stem>.pstats``: cProfile statistics of every thread the run started
+  (``python -m pstats``, snakeviz). Before 3.12 each thread gets its own
+  profiler; from 3.12 cProfile runs on ``sys.monitoring``, which is
+  process-wide and takes one profiler only, so a single profiler covers all
+  threads;
+- ``<stem>.collapsed.txt``: wall-clock stack samples in collapsed format
+  (``flamegraph.pl``, speedscope, inferno), rooted at the thread name. Open
+  metric spans appear as ``[name]`` frames under the code that opened them,
+  marking the hot paths: ``[scrape.*]``, ``[parse.tldrai]``,
+  ``[json.encode.*]`` / ``[json.decode.*]``, ``[format.digest]``,
+  ``[stage.*]``;
+- ``<stem>.alloc.txt``: the top-N tracemalloc allocation sites at peak traced
+  memory, and what the run still held at the end compared to its start.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import linecache
+import logging
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+from src import config, metrics
+
+logger = logging.getLogger(__name__)
+
+# A new allocation snapshot is taken when traced memory grows by this factor
+PEAK_SNAPSHOT_GROWTH = 1.1
+
+# A second cProfile.enable() raises ValueError from 3.12 on, which inside the
+# threading.setprofile hook would kill every thread started under --profile.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+_IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass(frozen=True)
+class ProfileOutput:
+    pstats: Path
+    collapsed: Path
+    allocations: Path
+
+
+@functools.lru_cache(maxsize=4096)
+def _label(code: CodeType) -> str:
+    path = Path(code.co_filename)
+    if "site-packages" in path.parts:
+        where = "/".join(path.parts[path.parts.index("site-packages") + 1 :])
+    elif path.is_absolute() and path.is_relative_to(Path.cwd()):
+        where = str(path.relative_to(Path.cwd()))
+    else:
+        where = path.name
+    return f"{code.co_qualname} ({where}:{code.co_firstlineno})".replace(";", ",")
+
+
+def collapse_stack(
+    thread_name: str,
+    frame: FrameType | None,
+    spans: Sequence[tuple[str, FrameType]] = (),
+) -> str:
+    """One sample as ``thread;outer;...;leaf``, with span markers inserted."""
+    markers: dict[int, list[str]] = {}
+    for name, opener in spans:
+        markers.setdefault(id(opener), []).append(f"[{name}]")
+    frames: list[FrameType] = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    parts = [thread_name.replace(";", ",")]
+    for f in reversed(frames):
+        parts.append(_label(f.f_code))
+        parts.extend(markers.get(id(f), ()))
+    return ";".join(parts)
+
+
+class _Sampler(threading.Thread):
+    """Samples every other thread's stack and snapshots allocation peaks."""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self.peak_size = 0
+        self.peak_snapshot: tracemalloc.Snapshot | None = None
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own:
+                    self.samples[
+                        collapse_stack(
+                            names.get(thread_id, str(thread_id)),
+                            frame,
+                            metrics.open_spans(thread_id),
+                        )
+                    ] += 1
+            self.snapshot_if_peak()
+
+    def snapshot_if_peak(self) -> None:
+        size, _ = tracemalloc.get_traced_memory()
+        if size > self.peak_size * PEAK_SNAPSHOT_GROWTH:
+            self.peak_size = size
+            self.peak_snapshot = tracemalloc.take_snapshot()
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def _format_size(size: float, sign: bool = False) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024 or unit == "MiB":
+            break
+        size /= 1024
+    return f"{size:+.1f} {unit}" if sign else f"{size:.1f} {unit}"
+
+
+def _allocation_lines(stats: list[Any], top_n: int, diff: bool) -> list[str]:
+    lines: list[str] = []
+    for stat in stats[:top_n]:
+        frame = stat.traceback[0]
+        if diff:
+            size = _format_size(stat.size_diff, sign=True)
+            count = f"{stat.count_diff:+d}"
+        else:
+            size, count = _format_size(stat.size), str(stat.count)
+        lines.append(f"{size:>12} {count:>9} blocks  {frame.filename}:{frame.lineno}")
+        source = linecache.getline(frame.filename, frame.lineno).strip()
+        if source:
+            lines.append(f"{'':>31}{source}")
+    return lines
+
+
+def allocation_report(
+    peak: tracemalloc.Snapshot | None,
+    start: tracemalloc.Snapshot,
+    end: tracemalloc.Snapshot,
+    peak_size: int,
+    top_n: int,
+) -> str:
+    start = start.filter_traces(_IGNORED_ALLOCATIONS)
+    end = end.filter_traces(_IGNORED_ALLOCATIONS)
+    lines = [f"Peak traced memory: {_format_size(peak_size)}", ""]
+    if peak is not None:
+        peak = peak.filter_traces(_IGNORED_ALLOCATIONS)
+        held = sum(stat.size for stat in peak.statistics("filename"))
+        lines.append(f"Top {top_n} allocation sites at peak ({_format_size(held)}):")
+        lines += _allocation_lines(peak.statistics("lineno"), top_n, diff=False)
+        lines.append("")
+    lines.append(f"Top {top_n} allocation sites still held at the end, vs start:")
+    growth = [s for s in end.compare_to(start, "lineno") if s.size_diff > 0]
+    lines += _allocation_lines(growth, top_n, diff=True)
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profiled(
+    directory: str | Path | None = None,
+    stem: str | None = None,
+    top_n: int | None = None,
+    interval: float | None = None,
+) -> Iterator[ProfileOutput]:
+    """Profile the enclosed code and write the pstats, collapsed-stack and
+    allocation files (also when it raises)."""
+    directory = Path(directory or config.PROFILE_DIR)
+    stem = stem or f"{datetime.now():%Y-%m-%d-%H%M%S}"
+    top_n = top_n or config.PROFILE_TOP_N
+    output = ProfileOutput(
+        directory / f"{stem}.pstats",
+        directory / f"{stem}.collapsed.txt",
+        directory / f"{stem}.alloc.txt",
+    )
+
+    profiles: list[cProfile.Profile] = []
+    lock = threading.Lock()
+
+    def profile_thread(*_: Any) -> None:
+        # threading.setprofile hook: runs once per new thread, then
+        # profile.enable() replaces it with cProfile for that thread.
+        profile = cProfile.Profile()
+        with lock:
+            profiles.append(profile)
+        profile.enable()
+
+    own_tracing = not tracemalloc.is_tracing()
+    if own_tracing:
+        tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+    start_snapshot = tracemalloc.take_snapshot()
+    sampler = _Sampler(interval or config.PROFILE_SAMPLE_INTERVAL)
+    sampler.start()
+    metrics.track_open_spans(True)
+    if PER_THREAD_PROFILES:
+        threading.setprofile(profile_thread)
+    main_profile = cProfile.Profile()
+    main_profile.enable()
+    try:
+        yield output
+    finally:
+        main_profile.disable()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(None)
+        metrics.track_open_spans(False)
+        sampler.stop()
+        sampler.snapshot_if_peak()
+        end_snapshot = tracemalloc.take_snapshot()
+        peak_size = tracemalloc.get_traced_memory()[1]
+        if own_tracing:
+            tracemalloc.stop()
+
+        directory.mkdir(parents=True, exist_ok=True)
+        stats = pstats.Stats()
+        for profile in [main_profile, *profiles]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                pass  # a thread that made no profiled calls
+        stats.dump_stats(output.pstats)
+        with open(output.collapsed, "w", encoding="utf-8") as f:
+            for stack, count in sorted(sampler.samples.items()):
+                f.write(f"{stack} {count}\n")
+        with open(output.allocations, "w", encoding="utf-8") as f:
+            f.write(
+                allocation_report(
+                    sampler.peak_snapshot,
+                    start_snapshot,
+                    end_snapshot,
+                    peak_size,
+                    top_n,
+                )
+            )
+        logger.info(
+            "Profile written: %s, %s, %s (%d threads, %d stack samples)",
+            output.pstats,
+            output.collapsed,
+            output.allocations,
+            len(profiles) + 1,
+            sum(sampler.samples.values()),
+        )
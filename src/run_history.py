@@ -0,0 +1,416 @@
+"""Run history: every run report in SQLite, with percentile trends and
+performance regression flags.
+
+``main`` records each run report (see :mod:`src.metrics`) in
+``data/run_history.db`` as soon as it is written: one ``runs`` row plus one
+``run_metrics`` row per timer (its total seconds) and counter. The reports in
+``data/runs/`` are committed as well, so ``sync`` can rebuild a lost database.
+
+A run is checked against a rolling baseline, the median of the previous
+``RUN_HISTORY_BASELINE_RUNS`` successful non-dry runs. A timer, or a counter
+under ``RUN_HISTORY_COUNTER_PREFIXES`` (``retries.*``), is flagged when it
+reaches ``RUN_HISTORY_REGRESSION_FACTOR`` times its baseline and exceeds it by
+the minimum delta, either in this run (a spike) or as the median of the last
+``RUN_HISTORY_RECENT_RUNS`` runs against the runs before them (a drift, e.g.
+Gemini retries creeping up over a week). Counters missing from a run count
+as 0; timers missing from a run (a stage that did not run) are skipped.
+
+Usage:
+    uv run python -m src.run_history stats --days 30 --prefix stage.
+    uv run python -m src.run_history trend --metric scrape.hackernews
+    uv run python -m src.run_history check   # flag the latest run
+    uv run python -m src.run_history sync    # ingest data/runs/*.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import sqlite3
+import statistics
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from src import config, metrics
+
+logger = logging.getLogger(__name__)
+
+RUN_HISTORY_DB_PATH = Path("data") / "run_history.db"
+
+# The whole run's wall time (the report's duration_s), stored as a timer.
+RUN_TIMER = "run"
+
+_SCHEMA_SQL = """\
+CREATE TABLE IF NOT EXISTS runs (
+    report TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    dry_run INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT NOT NULL,
+    duration_s REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started_at);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    report TEXT NOT NULL REFERENCES runs (report) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (report, kind, name)
+) WITHOUT ROWID;
+"""
+
+MetricKey = tuple[str, str]  # (kind, name), kind is "timer" or "counter"
+
+
+@dataclass(frozen=True)
+class Regression:
+    metric: str
+    kind: str
+    window: str  # "run" (this run) or "recent" (median of the last runs)
+    value: float
+    baseline: float
+    runs: int  # runs behind ``value``: 1 for a spike, the window for a drift
+
+    @property
+    def ratio(self) -> float:
+        return self.value / self.baseline if self.baseline else math.inf
+
+    def describe(self) -> str:
+        unit = "s" if self.kind == "timer" else ""
+        ratio = "new" if math.isinf(self.ratio) else f"{self.ratio:.1f}x"
+        scope = (
+            "this run" if self.window == "run" else f"median of last {self.runs} runs"
+        )
+        return (
+            f"{self.metric}: {self.value:.1f}{unit} vs baseline "
+            f"{self.baseline:.1f}{unit} ({ratio}, {scope})"
+        )
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """The ``q``-th percentile (0-100) with linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _watched(kind: str, name: str) -> bool:
+    return kind == "timer" or name.startswith(config.RUN_HISTORY_COUNTER_PREFIXES)
+
+
+def _value(run: dict[MetricKey, float], key: MetricKey) -> float | None:
+    if key in run:
+        return run[key]
+    return 0.0 if key[0] == "counter" else None
+
+
+def _check(
+    key: MetricKey,
+    window: str,
+    recent: list[dict[MetricKey, float]],
+    baseline: list[dict[MetricKey, float]],
+) -> Regression | None:
+    recent_values = [v for v in (_value(run, key) for run in recent) if v is not None]
+    base_values = [v for v in (_value(run, key) for run in baseline) if v is not None]
+    if not recent_values or len(base_values) < config.RUN_HISTORY_MIN_BASELINE_RUNS:
+        return None
+    value = statistics.median(recent_values)
+    base = statistics.median(base_values)
+    kind, name = key
+    min_delta = (
+        config.RUN_HISTORY_MIN_DELTA_SECONDS
+        if kind == "timer"
+        else config.RUN_HISTORY_MIN_DELTA_COUNT
+    )
+    if value - base < min_delta or value < config.RUN_HISTORY_REGRESSION_FACTOR * base:
+        return None
+    return Regression(name, kind, window, value, base, len(recent_values))
+
+
+class RunHistory:
+    """SQLite store of run reports keyed by report file name."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or RUN_HISTORY_DB_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(_SCHEMA_SQL)
+
+    def __enter__(self) -> RunHistory:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record(self, key: str, report: dict[str, Any]) -> None:
+        """Store (or replace) the run report ``report`` under ``key``."""
+        rows = [
+            (key, "timer", name, timer["total_s"])
+            for name, timer in report.get("timers", {}).items()
+        ]
+        rows += [
+            (key, "counter", name, value)
+            for name, value in report.get("counters", {}).items()
+        ]
+        if report.get("duration_s") is not None:
+            rows.append((key, "timer", RUN_TIMER, report["duration_s"]))
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE report = ?", (key,))
+            self.conn.execute(
+                "INSERT INTO runs "
+                "(report, run_id, status, dry_run, started_at, duration_s, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    report["run_id"],
+                    report["status"],
+                    bool(report.get("dry_run")),
+                    report["started_at"],
+                    report.get("duration_s"),
+                    report.get("error"),
+                ),
+            )
+            self.conn.executemany(
+                "INSERT INTO run_metrics (report, kind, name, value) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def sync(self, runs_dir: Path | None = None) -> int:
+        """Record every report in ``runs_dir`` not stored yet; returns the count."""
+        runs_dir = runs_dir or metrics.RUNS_DIR
+        known = {row[0] for row in self.conn.execute("SELECT report FROM runs")}
+        added = 0
+        for path in sorted(runs_dir.glob("*.json")):
+            if path.stem in known:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.record(path.stem, json.load(f))
+            except (json.JSONDecodeError, KeyError, OSError):
+                logger.exception("Skipping unreadable run report %s", path)
+                continue
+            added += 1
+        return added
+
+    def latest(self) -> str | None:
+        row = self.conn.execute(
+            "SELECT report FROM runs ORDER BY started_at DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def _metrics(self, reports: list[str]) -> dict[str, dict[MetricKey, float]]:
+        by_report: dict[str, dict[MetricKey, float]] = {r: {} for r in reports}
+        rows = self.conn.execute(
+            "SELECT report, kind, name, value FROM run_metrics "
+            "WHERE report IN (SELECT value FROM json_each(?))",
+            (json.dumps(reports),),
+        )
+        for report, kind, name, value in rows:
+            by_report[report][(kind, name)] = value
+        return by_report
+
+    def regressions(self, key: str) -> list[Regression]:
+        """Regressions of run ``key`` against the runs that preceded it."""
+        row = self.conn.execute(
+            "SELECT started_at FROM runs WHERE report = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        baseline_runs = config.RUN_HISTORY_BASELINE_RUNS
+        recent_runs = config.RUN_HISTORY_RECENT_RUNS
+        previous = [
+            report
+            for (report,) in self.conn.execute(
+                "SELECT report FROM runs "
+                "WHERE started_at < ? AND status != 'failed' AND NOT dry_run "
+                "ORDER BY started_at DESC LIMIT ?",
+                (row[0], recent_runs - 1 + baseline_runs),
+            )
+        ]
+        by_report = self._metrics([key, *previous])
+        current = by_report[key]
+        earlier = [by_report[report] for report in previous]
+        recent = [current, *earlier[: recent_runs - 1]]
+        drift_baseline = earlier[recent_runs - 1 :]
+
+        found: list[Regression] = []
+        keys = {k for run in recent for k in run if _watched(*k)}
+        for metric_key in sorted(keys, key=lambda k: (k[1], k[0])):
+            regression = None
+            if metric_key in current:
+                regression = _check(
+                    metric_key, "run", [current], earlier[:baseline_runs]
+                )
+            if regression is None and recent_runs > 1:
+                regression = _check(metric_key, "recent", recent, drift_baseline)
+            if regression is not None:
+                found.append(regression)
+        return found
+
+    def _window(self, days: int) -> dict[str, dict[MetricKey, float]]:
+        """Metrics of the non-dry runs of the last ``days`` days, oldest first."""
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        reports = [
+            report
+            for (report,) in self.conn.execute(
+                "SELECT report FROM runs WHERE started_at >= ? AND NOT dry_run "
+                "ORDER BY started_at",
+                (since.isoformat(timespec="seconds"),),
+            )
+        ]
+        return self._metrics(reports)
+
+    def stats(self, days: int, prefix: str = "") -> list[dict[str, Any]]:
+        """p50/p95/last per metric over the non-dry runs of the last ``days``."""
+        values: dict[MetricKey, list[float]] = defaultdict(list)
+        for run in self._window(days).values():
+            for (kind, name), value in run.items():
+                if name.startswith(prefix):
+                    values[(kind, name)].append(value)
+        return [
+            {
+                "name": name,
+                "kind": kind,
+                "runs": len(series),
+                "p50": percentile(series, 50),
+                "p95": percentile(series, 95),
+                "last": series[-1],
+            }
+            for (kind, name), series in sorted(
+                values.items(), key=lambda item: (item[0][1], item[0][0])
+            )
+        ]
+
+    def trend(self, metric: str, days: int) -> list[dict[str, Any]]:
+        """Weekly p50/p95 of ``metric`` over the non-dry runs of the last ``days``."""
+        started = dict(self.conn.execute("SELECT report, started_at FROM runs"))
+        weeks: dict[str, list[float]] = defaultdict(list)
+        for report, run in self._window(days).items():
+            for (_, name), value in run.items():
+                if name == metric:
+                    week = config.get_week_identifier(
+                        datetime.fromisoformat(started[report])
+                    )
+                    weeks[week].append(value)
+        return [
+            {
+                "week": week,
+                "runs": len(series),
+                "p50": percentile(series, 50),
+                "p95": percentile(series, 95),
+            }
+            for week, series in sorted(weeks.items())
+        ]
+
+
+def record_run(report_path: Path) -> list[Regression]:
+    """Add a written run report to the history and return its regressions.
+
+    Never raises: the history is diagnostics, a broken database only logs.
+    """
+    try:
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        with RunHistory() as history:
+            history.record(report_path.stem, report)
+            found = history.regressions(report_path.stem)
+    except (sqlite3.Error, OSError, ValueError, KeyError):
+        logger.exception("Failed to record %s in the run history", report_path)
+        return []
+    for regression in found:
+        logger.warning("Performance regression: %s", regression.describe())
+    return found
+
+
+def _format_number(value: float | None) -> str:
+    return "-" if value is None else f"{value:.4g}"
+
+
+def print_stats(days: int, prefix: str) -> None:
+    with RunHistory() as history:
+        rows = history.stats(days, prefix)
+    if not rows:
+        print(f"No runs recorded in the last {days} days")
+        return
+    print(f"{'metric':<40}{'kind':>8}{'runs':>6}{'p50':>10}{'p95':>10}{'last':>10}")
+    for row in rows:
+        print(
+            f"{row['name'][:39]:<40}{row['kind']:>8}{row['runs']:>6}"
+            f"{_format_number(row['p50']):>10}"
+            f"{_format_number(row['p95']):>10}"
+            f"{_format_number(row['last']):>10}"
+        )
+
+
+def print_trend(metric: str, days: int) -> None:
+    with RunHistory() as history:
+        rows = history.trend(metric, days)
+    if not rows:
+        print(f"No values of {metric} in the last {days} days")
+        return
+    print(f"{metric} per week")
+    print(f"{'week':<10}{'runs':>6}{'p50':>10}{'p95':>10}")
+    for row in rows:
+        print(
+            f"{row['week']:<10}{row['runs']:>6}"
+            f"{_format_number(row['p50']):>10}{_format_number(row['p95']):>10}"
+        )
+
+
+def print_check() -> None:
+    with RunHistory() as history:
+        history.sync()
+        latest = history.latest()
+        if latest is None:
+            print("No runs recorded yet")
+            return
+        found = history.regressions(latest)
+    if not found:
+        print(f"{latest}: no regressions")
+    for regression in found:
+        print(f"{latest}: {regression.describe()}")
+
+
+def cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="InsightFlow run history")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stats = subparsers.add_parser("stats", help="p50/p95 per stage and counter")
+    stats.add_argument("--days", type=int, default=30)
+    stats.add_argument("--prefix", default="", help="Only metrics with this prefix")
+    trend = subparsers.add_parser("trend", help="Weekly p50/p95 of one metric")
+    trend.add_argument("--metric", required=True)
+    trend.add_argument("--days", type=int, default=90)
+    subparsers.add_parser("check", help="Flag regressions of the latest run")
+    subparsers.add_parser("sync", help="Record reports missing from the database")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(levelname)s - %(message)s",
+    )
+    args = cli()
+    if args.command == "stats":
+        print_stats(args.days, args.prefix)
+    elif args.command == "trend":
+        print_trend(args.metric, args.days)
+    elif args.command == "check":
+        print_check()
+    else:
+        with RunHistory() as history:
+            print(f"Recorded {history.sync()} run reports")
@@ -16,14 +16,14 @@ import feedparser
 import requests
 from bs4 import BeautifulSoup  # type: ignore[import-untyped]
 
-from src import config
+from src import config, metrics
 
 logger = logging.getLogger(__name__)
 
 USER_AGENT = "InsightFlow/1.0 (GitHub Actions; +https://github.com)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     source: str  # "geeknews" | "hackernews"
     source_id: str
@@ -49,8 +49,10 @@ def _extract_url_from_content(content_html: str) -> str | None:
     return None
 
 
+@metrics.timed("scrape.geeknews")
 def fetch_geeknews() -> list[Article]:
     try:
+        metrics.incr("http.geeknews")
         feed = feedparser.parse(
             config.GEEKNEWS_RSS_URL,
             request_headers={"User-Agent": USER_AGENT},
@@ -117,6 +119,7 @@ async def _fetch_hn_item(
 ) -> Article | None:
     url = f"{config.HN_API_BASE}item/{item_id}.json"
     try:
+        metrics.incr("http.hackernews")
         async with session.get(url) as resp:
             if resp.status != 200:
                 return None
@@ -152,10 +155,12 @@ async def _fetch_hn_item(
         return None
 
 
+@metrics.timed("scrape.hackernews")
 async def fetch_hackernews(count: int = 30) -> list[Article]:
     try:
         async with aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}) as session:
             top_url = f"{config.HN_API_BASE}topstories.json"
+            metrics.incr("http.hackernews")
             async with session.get(top_url) as resp:
                 if resp.status != 200:
                     logger.error("Failed to fetch HN top stories: HTTP %d", resp.status)
@@ -184,69 +189,76 @@ def _strip_utm_params(url: str) -> str:
     return urlunparse(parsed._replace(query=new_query))
 
 
-def fetch_tldr_ai() -> list[Article]:
-    """Fetch and parse articles from the TLDR AI newsletter."""
-    try:
-        resp = requests.get(
-            config.TLDR_AI_URL,
-            headers={"User-Agent": USER_AGENT},
-            timeout=15,
-        )
-        resp.raise_for_status()
+@metrics.timed("parse.tldrai")
+def _parse_tldr_ai(html: str) -> list[Article]:
+    soup = BeautifulSoup(html, "html.parser")
+    today_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    articles: list[Article] = []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        today_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
-        articles: list[Article] = []
+    for section in soup.find_all("section"):
+        header = section.find("header")
+        if not header:
+            continue
 
-        for section in soup.find_all("section"):
-            header = section.find("header")
-            if not header:
-                continue
+        h3_header = header.find("h3")
+        if not h3_header:
+            continue
 
-            h3_header = header.find("h3")
-            if not h3_header:
+        section_name = h3_header.get_text(strip=True)
+        if section_name not in config.TLDR_SECTIONS:
+            continue
+
+        for article_tag in section.find_all("article"):
+            link_tag = article_tag.find("a", class_="font-bold")
+            if not link_tag:
                 continue
 
-            section_name = h3_header.get_text(strip=True)
-            if section_name not in config.TLDR_SECTIONS:
+            title_tag = link_tag.find("h3")
+            if not title_tag:
                 continue
 
-            for article_tag in section.find_all("article"):
-                link_tag = article_tag.find("a", class_="font-bold")
-                if not link_tag:
-                    continue
+            title = title_tag.get_text(strip=True)
 
-                title_tag = link_tag.find("h3")
-                if not title_tag:
-                    continue
+            if "(Sponsor)" in title:
+                continue
 
-                title = title_tag.get_text(strip=True)
+            raw_url = link_tag.get("href", "")
+            if not raw_url:
+                continue
 
-                if "(Sponsor)" in title:
-                    continue
+            clean_url = _strip_utm_params(raw_url)
 
-                raw_url = link_tag.get("href", "")
-                if not raw_url:
-                    continue
+            desc_div = article_tag.find("div", class_="newsletter-html")
+            summary = desc_div.get_text(strip=True)[:500] if desc_div else ""
 
-                clean_url = _strip_utm_params(raw_url)
-
-                desc_div = article_tag.find("div", class_="newsletter-html")
-                summary = desc_div.get_text(strip=True)[:500] if desc_div else ""
-
-                articles.append(
-                    Article(
-                        source="tldrai",
-                        source_id=clean_url,
-                        title=title,
-                        url=clean_url,
-                        discussion_url=clean_url,
-                        summary=summary,
-                        score=0,
-                        published_at=today_iso,
-                    )
+            articles.append(
+                Article(
+                    source="tldrai",
+                    source_id=clean_url,
+                    title=title,
+                    url=clean_url,
+                    discussion_url=clean_url,
+                    summary=summary,
+                    score=0,
+                    published_at=today_iso,
                 )
+            )
+    return articles
+
+
+@metrics.timed("scrape.tldrai")
+def fetch_tldr_ai() -> list[Article]:
+    """Fetch and parse articles from the TLDR AI newsletter."""
+    try:
+        metrics.incr("http.tldrai")
+        resp = requests.get(
+            config.TLDR_AI_URL,
+            headers={"User-Agent": USER_AGENT},
+            timeout=15,
+        )
+        resp.raise_for_status()
 
+        articles = _parse_tldr_ai(resp.text)
         logger.info("Fetched %d articles from TLDR AI", len(articles))
         return articles
 
@@ -255,6 +267,7 @@ def fetch_tldr_ai() -> list[Article]:
         return []
 
 
+@metrics.timed("scrape")
 async def scrape_all() -> list[Article]:
     geeknews_task = asyncio.to_thread(fetch_geeknews)
     hackernews_task = fetch_hackernews(count=config.HN_TOP_N)
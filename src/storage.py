@@ -3,18 +3,24 @@
 import json
 import logging
 import os
-from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any
 
 import requests
 
-from src import config
+from src import config, metrics
+from src.archive import load_archived_day
+from src.article_codec import article_to_dict
+from src.github_client import GitHubClient
+from src.outbox import Outbox, drain
 from src.scraper import Article
 
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path("data")
 SEEN_IDS_PATH = DATA_DIR / "seen_ids.json"
+ISSUE_INDEX_PATH = DATA_DIR / "github_issues.json"
 MAX_ISSUES_PER_RUN = 5
 
 
@@ -24,7 +30,9 @@ def load_seen_ids() -> set[str]:
         return set()
 
     try:
-        with open(SEEN_IDS_PATH, encoding="utf-8") as f:
+        with open(SEEN_IDS_PATH, encoding="utf-8") as f, metrics.span(
+            "json.decode.seen_ids"
+        ):
             data = json.load(f)
         return set(data)
     except (json.JSONDecodeError, OSError):
@@ -32,15 +40,43 @@ def load_seen_ids() -> set[str]:
         return set()
 
 
+@metrics.timed("storage.save_seen_ids")
 def save_seen_ids(seen_ids: set[str]) -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    with open(SEEN_IDS_PATH, "w", encoding="utf-8") as f:
+    with open(SEEN_IDS_PATH, "w", encoding="utf-8") as f, metrics.span(
+        "json.encode.seen_ids"
+    ):
         json.dump(sorted(seen_ids), f, indent=2, ensure_ascii=False)
 
     logger.info("Saved %d seen IDs", len(seen_ids))
 
 
+def load_issue_index() -> dict[str, int]:
+    """Load the article-id -> issue number index. Returns empty dict if missing."""
+    if not ISSUE_INDEX_PATH.exists():
+        return {}
+
+    try:
+        with open(ISSUE_INDEX_PATH, encoding="utf-8") as f:
+            return {str(k): int(v) for k, v in json.load(f).items()}
+    except (json.JSONDecodeError, OSError, AttributeError, ValueError):
+        logger.exception("Failed to load github_issues.json, starting fresh")
+        return {}
+
+
+def save_issue_index(index: dict[str, int]) -> None:
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = ISSUE_INDEX_PATH.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(index.items())), f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, ISSUE_INDEX_PATH)
+
+    logger.debug("Saved %d GitHub issue index entries", len(index))
+
+
+@metrics.timed("storage.filter_new")
 def filter_new_articles(articles: list[Article], seen_ids: set[str]) -> list[Article]:
     """SIDE EFFECT: adds new article IDs to seen_ids."""
     new_articles: list[Article] = []
@@ -59,6 +95,7 @@ def filter_new_articles(articles: list[Article], seen_ids: set[str]) -> list[Art
     return new_articles
 
 
+@metrics.timed("storage.save_daily")
 def save_daily_articles(articles: list[Article], date_str: str) -> Path:
     parts = date_str.split("-")
     if len(parts) != 3:
@@ -73,15 +110,22 @@ def save_daily_articles(articles: list[Article], date_str: str) -> Path:
     existing: list[dict[str, object]] = []
     if file_path.exists():
         try:
-            with open(file_path, encoding="utf-8") as f:
+            with open(file_path, encoding="utf-8") as f, metrics.span(
+                "json.decode.daily"
+            ):
                 existing = json.load(f)
         except (json.JSONDecodeError, OSError):
             logger.warning("Failed to read existing %s, overwriting", file_path)
+    else:
+        # The month may already have been compacted; keep its archived records.
+        existing = load_archived_day(date_str)
 
-    new_data = [asdict(article) for article in articles]
+    new_data = [article_to_dict(article) for article in articles]
     combined = existing + new_data
 
-    with open(file_path, "w", encoding="utf-8") as f:
+    with open(file_path, "w", encoding="utf-8") as f, metrics.span(
+        "json.encode.daily"
+    ):
         json.dump(combined, f, indent=2, ensure_ascii=False)
 
     logger.info(
@@ -90,7 +134,28 @@ def save_daily_articles(articles: list[Article], date_str: str) -> Path:
     return file_path
 
 
+def _build_issue(article: Article) -> tuple[str, str, list[str]]:
+    title = f"[{article.source}] {article.title}"
+    body = (
+        f"## 기사 정보\n"
+        f"- **원본 URL**: {article.url}\n"
+        f"- **토론**: {article.discussion_url}\n"
+        f"- **소스**: {article.source}\n"
+        f"- **관련성 점수**: {article.relevance_score}\n"
+        f"\n"
+        f"## AI 요약\n"
+        f"{article.ai_summary}\n"
+    )
+    labels = [f"source:{article.source}", "auto-collected"]
+    return title, body, labels
+
+
+@metrics.timed("deliver.github")
 def create_github_issues(articles: list[Article]) -> int:
+    """Enqueue issues for notable articles in the outbox and deliver them.
+
+    Issues left over from earlier failed runs are delivered in the same drain.
+    """
     if config.DRY_RUN:
         logger.info("[DRY RUN] Skipping GitHub Issues creation")
         return 0
@@ -109,41 +174,74 @@ def create_github_issues(articles: list[Article]) -> int:
         logger.info("No articles above issue threshold (%.1f)", config.ISSUE_THRESHOLD)
         return 0
 
-    notable = notable[:MAX_ISSUES_PER_RUN]
+    issue_index = load_issue_index()
+    pending = [a for a in notable if f"{a.source}:{a.source_id}" not in issue_index]
+    if len(pending) < len(notable):
+        logger.info(
+            "Skipping %d article(s) already filed as issues",
+            len(notable) - len(pending),
+        )
 
-    api_url = f"https://api.github.com/repos/{github_repo}/issues"
-    headers = {
-        "Authorization": f"Bearer {github_token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
+    with Outbox() as box:
+        for article in pending[:MAX_ISSUES_PER_RUN]:
+            title, body, labels = _build_issue(article)
+            key = f"{article.source}:{article.source_id}"
+            box.enqueue(
+                "github",
+                f"github:{key}",
+                {"key": key, "title": title, "body": body, "labels": labels},
+            )
+        stats = drain(["github"], outbox=box)
 
-    created_count = 0
+    return stats["github"].sent
 
-    for article in notable:
-        title = f"[{article.source}] {article.title}"
-        body = (
-            f"## 기사 정보\n"
-            f"- **원본 URL**: {article.url}\n"
-            f"- **토론**: {article.discussion_url}\n"
-            f"- **소스**: {article.source}\n"
-            f"- **관련성 점수**: {article.relevance_score}\n"
-            f"\n"
-            f"## AI 요약\n"
-            f"{article.ai_summary}\n"
-        )
-        labels = [f"source:{article.source}", "auto-collected"]
 
-        payload = {"title": title, "body": body, "labels": labels}
+def deliver_github_issues(payloads: list[dict[str, Any]]) -> list[Any]:
+    """Outbox handler: create issues concurrently, returning issue numbers."""
+    github_token = os.getenv("GITHUB_TOKEN")
+    github_repo = os.getenv("GITHUB_REPOSITORY")
+    if not github_token or not github_repo:
+        raise RuntimeError("GITHUB_TOKEN or GITHUB_REPOSITORY not set")
 
-        try:
-            resp = requests.post(api_url, headers=headers, json=payload, timeout=30)
-            resp.raise_for_status()
-            issue_number = resp.json().get("number", "?")
-            logger.info("Created issue #%s: %s", issue_number, title)
+    issue_index = load_issue_index()
+    results: list[Any] = [None] * len(payloads)
+    todo: list[int] = []
+    for i, payload in enumerate(payloads):
+        if payload["key"] in issue_index:
+            results[i] = issue_index[payload["key"]]
+        else:
+            todo.append(i)
+
+    created_count = 0
+
+    with GitHubClient(github_token, github_repo) as client, ThreadPoolExecutor(
+        max_workers=client.max_concurrency
+    ) as pool:
+        futures = {
+            pool.submit(
+                client.create_issue,
+                payloads[i]["title"],
+                payloads[i]["body"],
+                payloads[i]["labels"],
+            ): i
+            for i in todo
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            payload = payloads[i]
+            try:
+                issue_number = future.result()
+            except requests.RequestException as e:
+                logger.exception("Failed to create issue: %s", payload["title"])
+                results[i] = e
+                continue
+            issue_index[payload["key"]] = issue_number
+            # Persist right away: a crash later in the batch must not lose
+            # issues that already exist on GitHub
+            save_issue_index(issue_index)
+            results[i] = issue_number
+            logger.info("Created issue #%s: %s", issue_number, payload["title"])
             created_count += 1
-        except requests.RequestException:
-            logger.exception("Failed to create issue: %s", title)
 
-    logger.info("Created %d/%d GitHub Issues", created_count, len(notable))
-    return created_count
+    logger.info("Created %d/%d GitHub Issues", created_count, len(todo))
+    return results
@@ -119,4 +119,47 @@ def sample_model_updates() -> dict[str, Any]:
                 "change_percent": -20.0,
             }
         ],
+        "metric_changes": [
+            {
+                "model_id": "gemini-2-5-pro",
+                "name": "Gemini 2.5 Pro",
+                "metric": "coding_index",
+                "old_value": 55.0,
+                "new_value": 61.5,
+                "change": 6.5,
+                "change_percent": 0.118,
+            }
+        ],
+        "frontier_changes": [
+            {
+                "model_id": "deepseek-v3",
+                "name": "DeepSeek V3",
+                "status": "joined",
+                "price": 0.69,
+                "intelligence_index": 66.0,
+                "speed_tokens_per_sec": 30.0,
+                "frontier_size": 9,
+            }
+        ],
+        "anomalies": [
+            {
+                "model_id": "o3",
+                "name": "o3",
+                "metric": "price",
+                "old_value": 25.0,
+                "new_value": 5.0,
+                "change_percent": -0.8,
+                "zscore": -80.0,
+            }
+        ],
     }
+
+
+@pytest.fixture(autouse=True)
+def isolated_outbox(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep every test's outbox deliveries out of the real data/outbox.db."""
+    from src import outbox
+
+    path = tmp_path / "outbox.db"
+    monkeypatch.setattr(outbox, "OUTBOX_DB_PATH", path)
+    return path
@@ -0,0 +1,90 @@
+"""Tests for src.archive monthly compaction."""
+
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src import archive
+
+
+def _record(source: str, source_id: str, tags: list[str] | None = None) -> dict:
+    record = {
+        "source": source,
+        "source_id": source_id,
+        "title": f"Title {source_id}",
+        "url": f"https://example.com/{source_id}",
+        "discussion_url": f"https://example.com/{source_id}/d",
+        "summary": "요약",
+        "score": 3,
+        "published_at": "2026-01-05T00:00:00+00:00",
+        "ai_summary": "",
+        "relevance_score": 0.7,
+        "notable": False,
+    }
+    if tags is not None:
+        record["tags"] = tags
+    return record
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(archive, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def _write_day(data_dir: Path, date_str: str, records: list[dict]) -> Path:
+    year, month, day = date_str.split("-")
+    path = data_dir / year / month / f"{day}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(records, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+class TestCompaction:
+    def test_round_trip_is_lossless(self, data_dir):
+        day1 = [_record("geeknews", "1", ["AI/ML", "Tool"]), _record("hackernews", "2")]
+        day2 = [_record("tldrai", "3", [])]
+        _write_day(data_dir, "2026-01-05", day1)
+        _write_day(data_dir, "2026-01-06", day2)
+
+        compacted = archive.compact_closed_months(today=date(2026, 2, 1))
+
+        assert compacted == [data_dir / "2026" / f"01{archive.ARCHIVE_SUFFIX}"]
+        assert not (data_dir / "2026" / "01").exists()
+        assert archive.load_day("2026-01-05") == day1
+        assert archive.load_day("2026-01-06") == day2
+
+    def test_current_month_is_left_raw(self, data_dir):
+        raw = _write_day(data_dir, "2026-02-03", [_record("geeknews", "1")])
+
+        assert archive.compact_closed_months(today=date(2026, 2, 10)) == []
+        assert raw.exists()
+
+    def test_incremental_and_idempotent(self, data_dir):
+        _write_day(data_dir, "2026-01-05", [_record("geeknews", "1")])
+        archive.compact_closed_months(today=date(2026, 2, 1))
+        path = data_dir / "2026" / f"01{archive.ARCHIVE_SUFFIX}"
+        first_bytes = path.read_bytes()
+
+        # Re-running with nothing new is a no-op
+        assert archive.compact_closed_months(today=date(2026, 2, 1)) == []
+        assert path.read_bytes() == first_bytes
+
+        # A late day file is merged into the existing archive
+        _write_day(data_dir, "2026-01-07", [_record("hackernews", "9")])
+        archive.compact_closed_months(today=date(2026, 2, 1))
+
+        days = [d for d, _ in archive.iter_days()]
+        assert days == ["2026-01-05", "2026-01-07"]
+
+    def test_iter_days_mixes_raw_and_compacted(self, data_dir):
+        _write_day(data_dir, "2026-01-05", [_record("geeknews", "1")])
+        archive.compact_closed_months(today=date(2026, 2, 1))
+        _write_day(data_dir, "2026-02-01", [_record("hackernews", "2")])
+
+        result = list(archive.iter_days(start="2026-01-01", end="2026-02-28"))
+
+        assert [d for d, _ in result] == ["2026-01-05", "2026-02-01"]
+        assert result[1][1][0]["source_id"] == "2"
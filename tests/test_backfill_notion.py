@@ -0,0 +1,104 @@
+"""Tests for the archive-driven Notion backfill."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+import backfill_notion
+from src import archive, notion_common, notion_writer
+
+
+def _record(source_id: str, published_at: str, relevance: float = 0.9) -> dict:
+    return {
+        "source": "hackernews",
+        "source_id": source_id,
+        "title": f"Article {source_id}",
+        "url": f"https://example.com/{source_id}",
+        "discussion_url": f"https://news.ycombinator.com/item?id={source_id}",
+        "summary": "",
+        "score": 1,
+        "published_at": published_at,
+        "ai_summary": "요약",
+        "relevance_score": relevance,
+        "notable": True,
+        "tags": ["Other"],
+    }
+
+
+@pytest.fixture
+def backfill_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(archive, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(notion_common, "NOTION_CACHE_PATH", tmp_path / "cache.json")
+    monkeypatch.setattr(
+        backfill_notion, "CHECKPOINT_PATH", tmp_path / "backfill_checkpoint.json"
+    )
+    monkeypatch.setattr(backfill_notion, "get_client", MagicMock)
+    monkeypatch.setattr(
+        backfill_notion, "ensure_database", lambda client, week_id: f"ds-{week_id}"
+    )
+    monkeypatch.setattr(
+        backfill_notion, "load_existing_keys", lambda client, ds: {"hackernews:1"}
+    )
+
+    day_dir = tmp_path / "2026" / "02"
+    day_dir.mkdir(parents=True)
+    (day_dir / "11.json").write_text(
+        json.dumps(
+            [
+                _record("1", "2026-02-11T01:00:00+00:00"),
+                _record("2", "2026-02-11T02:00:00+00:00"),
+                _record("3", "2026-02-11T03:00:00+00:00", relevance=0.1),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    (day_dir / "17.json").write_text(
+        json.dumps([_record("4", "2026-02-17T01:00:00+00:00")]), encoding="utf-8"
+    )
+    return tmp_path
+
+
+class TestBackfillNotion:
+    def test_routes_by_week_and_resumes_failures(self, backfill_env, monkeypatch):
+        calls: list[list[dict]] = []
+        attempts = iter(range(100))
+
+        def flaky_create(payloads):
+            calls.append(payloads)
+            if next(attempts) == 0:
+                return [RuntimeError("rate limited")] * len(payloads)
+            return [{"id": "p"}] * len(payloads)
+
+        monkeypatch.setattr(notion_writer, "create_pages", flaky_create)
+
+        backfill_notion.backfill_notion()
+        parents = [p["parent"]["data_source_id"] for batch in calls for p in batch]
+        assert parents == ["ds-2026-W07", "ds-2026-W08"]
+        done = backfill_notion.load_checkpoint()
+        assert done == {"hackernews:1", "hackernews:4"}
+
+        calls.clear()
+        backfill_notion.backfill_notion()
+        assert [len(batch) for batch in calls] == [1]
+        assert backfill_notion.load_checkpoint() == {
+            "hackernews:1",
+            "hackernews:2",
+            "hackernews:4",
+        }
+
+    def test_routes_by_archive_day_not_published_week(self, backfill_env):
+        # Archived on Thu 2026-02-12 (W07), published the Friday before (W06):
+        # the live run wrote it to the W07 database, so the backfill must too
+        (backfill_env / "2026" / "02" / "12.json").write_text(
+            json.dumps([_record("5", "2026-02-06T23:00:00+00:00")]),
+            encoding="utf-8",
+        )
+
+        weeks = backfill_notion.collect_articles()
+
+        assert [a.source_id for a in weeks["2026-W07"]] == ["1", "2", "5"]
+        assert "2026-W06" not in weeks
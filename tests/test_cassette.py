@@ -0,0 +1,200 @@
+"""Tests for src.cassette record/replay across every HTTP client."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import aiohttp
+import feedparser
+import google.generativeai as genai
+import httpx
+import pytest
+import requests
+
+from src import cassette as cassette_module
+from src import config
+from src.cassette import replay_sandbox, use_cassette
+
+FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>GN</title>
+<entry><title>First</title><link href="https://example.com/1"/></entry>
+</feed>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.startswith("/slow"):
+            time.sleep(0.2)
+        if self.path.startswith("/feed"):
+            status, body, kind = 200, FEED, "application/atom+xml"
+        elif self.path.startswith("/fail"):
+            status, body, kind = 503, b"down", "text/plain"
+        else:
+            body = json.dumps({"path": self.path, "calls": self.server.calls}).encode()
+            status, kind = 200, "application/json"
+        self.server.calls += 1  # type: ignore[attr-defined]
+        self.send_response(status)
+        self.send_header("Content-Type", kind)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.calls = 0  # type: ignore[attr-defined]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+async def _aiohttp_get(url: str) -> tuple[int, dict]:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, params={"q": "1"}) as resp:
+            return resp.status, await resp.json()
+
+
+async def _httpx_async_get(url: str) -> dict:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(url)).json()
+
+
+def _exercise(base: str) -> dict:
+    """One call through each client, as the pipeline makes them."""
+    results: dict = {}
+    results["requests"] = requests.get(f"{base}/tldr", timeout=5).json()
+    results["requests_fail"] = requests.get(f"{base}/fail", timeout=5).status_code
+    results["aiohttp"] = asyncio.run(_aiohttp_get(f"{base}/hn"))
+    results["httpx"] = httpx.get(f"{base}/notion").json()
+    results["httpx_async"] = asyncio.run(_httpx_async_get(f"{base}/notion-async"))
+    feed = feedparser.parse(f"{base}/feed")
+    results["feed"] = [entry.title for entry in feed.entries]
+    return results
+
+
+class TestRecordReplay:
+    def test_replay_serves_recorded_responses_offline(self, server, tmp_path):
+        with use_cassette(tmp_path / "c", "record"):
+            recorded = _exercise(server)
+        # Responses carry the server's call counter, so a live call would differ
+        assert recorded["aiohttp"][0] == 200
+        assert recorded["aiohttp"][1]["path"] == "/hn?q=1"
+        assert recorded["requests_fail"] == 503
+        assert recorded["feed"] == ["First"]
+
+        with use_cassette(tmp_path / "c", "replay", latency_scale=0) as replay:
+            replayed = _exercise(server)
+
+        assert replayed == recorded
+        assert replay.misses == []
+        assert replay.served == 6
+
+    def test_replay_keeps_recorded_latency(self, server, tmp_path):
+        with use_cassette(tmp_path / "c", "record"):
+            requests.get(f"{server}/slow", timeout=5)
+
+        for scale, check in ((1.0, lambda s: s >= 0.18), (0.0, lambda s: s < 0.1)):
+            with use_cassette(tmp_path / "c", "replay", latency_scale=scale):
+                start = time.perf_counter()
+                requests.get(f"{server}/slow", timeout=5)
+                assert check(time.perf_counter() - start)
+
+    def test_unknown_request_is_a_counted_connection_error(self, server, tmp_path):
+        with use_cassette(tmp_path / "c", "record"):
+            requests.get(f"{server}/a", timeout=5)
+
+        with use_cassette(tmp_path / "c", "replay", latency_scale=0) as replay:
+            with pytest.raises(requests.ConnectionError):
+                requests.get(f"{server}/b", timeout=5)
+
+        assert replay.misses == [f"GET {server}/b"]
+
+    def test_secrets_are_redacted_and_restored(self, server, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "TELEGRAM_BOT_TOKEN", "s3cret-token")
+        monkeypatch.setattr(config, "TELEGRAM_CHAT_ID", "42")
+        with use_cassette(tmp_path / "c", "record"):
+            requests.get(f"{server}/bot{config.TELEGRAM_BOT_TOKEN}/send", timeout=5)
+
+        text = (tmp_path / "c" / "interactions.json").read_text()
+        assert "s3cret-token" not in text
+        assert "/botREDACTED_TELEGRAM_BOT_TOKEN/send" in text
+
+        monkeypatch.setattr(config, "TELEGRAM_BOT_TOKEN", None)
+        monkeypatch.setattr(config, "TELEGRAM_CHAT_ID", None)
+        with use_cassette(tmp_path / "c", "replay", latency_scale=0) as replay:
+            assert config.TELEGRAM_BOT_TOKEN == "REDACTED_TELEGRAM_BOT_TOKEN"
+            assert config.TELEGRAM_CHAT_ID == "42"
+            url = f"{server}/bot{config.TELEGRAM_BOT_TOKEN}/send"
+            assert requests.get(url, timeout=5).status_code == 200
+        assert replay.misses == []
+        assert config.TELEGRAM_BOT_TOKEN is None
+
+
+class _FakeGemini:
+    def __init__(self, text: str | None) -> None:
+        self.text = text
+
+    @property
+    def usage_metadata(self):
+        return type("Usage", (), {"prompt_token_count": 7})()
+
+
+class TestGemini:
+    def test_generate_content_round_trip(self, tmp_path, monkeypatch):
+        def fake_generate(model, prompt, *args, **kwargs):
+            if "fail" in prompt:
+                raise RuntimeError("429 quota exceeded")
+            return _FakeGemini(f'[{{"echo": "{prompt}"}}]')
+
+        monkeypatch.setattr(genai.GenerativeModel, "generate_content", fake_generate)
+        model = genai.GenerativeModel("gemini-test")
+        with use_cassette(tmp_path / "c", "record"):
+            recorded = model.generate_content("hello").text
+            with pytest.raises(RuntimeError):
+                model.generate_content("fail")
+
+        monkeypatch.undo()
+        with use_cassette(tmp_path / "c", "replay", latency_scale=0):
+            response = model.generate_content("hello")
+            with pytest.raises(RuntimeError, match="429"):
+                model.generate_content("fail")
+
+        assert response.text == recorded
+        assert response.usage_metadata.prompt_token_count == 7
+
+
+class TestReplayEnvironment:
+    def test_sandbox_and_clock_follow_the_recording(self, tmp_path, monkeypatch):
+        data = tmp_path / "data"
+        data.mkdir()
+        (data / "seen_ids.json").write_text('["hackernews:1"]')
+        monkeypatch.chdir(tmp_path)
+        with use_cassette(tmp_path / "c", "record"):
+            pass
+        document = json.loads((tmp_path / "c" / "interactions.json").read_text())
+        document["metadata"]["started_at"] = "2026-01-05T06:00:00+00:00"
+        (tmp_path / "c" / "interactions.json").write_text(json.dumps(document))
+
+        from src import scraper
+
+        with replay_sandbox(tmp_path / "c") as sandbox:
+            with use_cassette(tmp_path / "c", "replay"):
+                now = scraper.datetime.now(cassette_module.timezone.utc)
+            assert Path.cwd() == sandbox
+            assert Path("data/seen_ids.json").read_text() == '["hackernews:1"]'
+
+        assert Path.cwd() == tmp_path
+        assert not sandbox.exists()
+        assert now.date().isoformat() == "2026-01-05"
+        assert scraper.datetime is cassette_module.datetime
@@ -1,10 +1,25 @@
 """Tests for src.main pipeline orchestration."""
 
-from unittest.mock import MagicMock, call, patch
+import json
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def isolated_checkpoints(tmp_path, monkeypatch):
+    """Keep checkpoints, run reports/history and the model DB out of data/."""
+    from src import checkpoint, metrics, model_tracker, run_history
+
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+    monkeypatch.setattr(metrics, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(model_tracker, "DB_PATH", tmp_path / "models.db")
+    monkeypatch.setattr(
+        run_history, "RUN_HISTORY_DB_PATH", tmp_path / "run_history.db"
+    )
+    return tmp_path / "checkpoints"
+
+
 class TestSeenIdsSaveTiming:
     """Task 3: Verify seen_ids are saved immediately after processing,
     before notifications (GitHub Issues, Notion, Telegram)."""
@@ -132,6 +147,117 @@ class TestSeenIdsSaveTiming:
 
         # Verify save_seen_ids was called despite the failure
         mock_save_seen.assert_called_once()
+        # No run history yet, so the failure notice carries no regressions
+        mock_send_failure.assert_called_once_with("Telegram API error", [])
+
+class TestRunHistoryRegressions:
+    """Regressions flagged by the run history reach Telegram."""
+
+    @patch("src.main.send_health_notification")
+    @patch("src.main.record_run")
+    @patch("src.main.send_digest")
+    @patch("src.main.send_model_updates_to_notion", return_value=0)
+    @patch("src.main.send_to_notion")
+    @patch("src.main.create_github_issues")
+    @patch("src.main.save_seen_ids")
+    @patch("src.main.save_daily_articles")
+    @patch("src.main.filter_and_summarize")
+    @patch("src.main.filter_new_articles")
+    @patch("src.main.load_seen_ids")
+    @patch("src.main.scrape_all")
+    @patch("src.main.fetch_model_data")
+    @patch("src.main.save_model_snapshots")
+    @patch("src.main.get_model_updates")
+    def test_successful_run_sends_health_notification(
+        self,
+        mock_get_model_updates,
+        mock_save_snapshots,
+        mock_fetch_model,
+        mock_scrape,
+        mock_load_seen,
+        mock_filter_new,
+        mock_filter_summarize,
+        mock_save_daily,
+        mock_save_seen,
+        mock_create_issues,
+        mock_send_notion,
+        mock_send_model_notion,
+        mock_send_digest,
+        mock_record_run,
+        mock_send_health,
+        sample_articles,
+    ):
+        from src.main import main
+        from src.run_history import Regression
+
+        mock_scrape.return_value = sample_articles
+        mock_load_seen.return_value = set()
+        mock_filter_new.return_value = sample_articles
+        mock_filter_summarize.return_value = sample_articles
+        mock_get_model_updates.return_value = {}
+        regression = Regression("scrape.hackernews", "timer", "run", 30.0, 9.0, 1)
+        mock_record_run.return_value = [regression]
+
+        main(dry_run=False)
+
+        [report_path] = mock_record_run.call_args.args
+        assert report_path.exists()
+        mock_send_health.assert_called_once_with([regression.describe()])
+
+
+class TestModelRetentionSchedule:
+    """Snapshot retention runs weekly, after the deliveries, never on dry runs."""
+
+    def _run(self, monkeypatch, sample_articles, dry_run: bool, due: bool):
+        from datetime import datetime
+
+        from src import config, main
+
+        weekday = datetime.now().weekday()
+        monkeypatch.setattr(
+            config, "MODEL_RETENTION_WEEKDAY", weekday if due else (weekday + 1) % 7
+        )
+        manager = MagicMock()
+        for name in (
+            "send_digest",
+            "send_model_updates_to_notion",
+            "send_to_notion",
+            "create_github_issues",
+            "save_seen_ids",
+            "save_daily_articles",
+            "save_model_snapshots",
+            "apply_retention",
+        ):
+            mock = MagicMock()
+            monkeypatch.setattr(main, name, mock)
+            manager.attach_mock(mock, name)
+        monkeypatch.setattr(main, "scrape_all", AsyncMock(return_value=sample_articles))
+        monkeypatch.setattr(main, "fetch_model_data", AsyncMock(return_value=[]))
+        monkeypatch.setattr(main, "load_seen_ids", MagicMock(return_value=set()))
+        for name in ("filter_new_articles", "filter_and_summarize"):
+            monkeypatch.setattr(main, name, MagicMock(return_value=sample_articles))
+        monkeypatch.setattr(main, "get_model_updates", MagicMock(return_value={}))
+
+        main.main(dry_run=dry_run)
+        return [c[0] for c in manager.mock_calls]
+
+    def test_runs_after_deliveries_on_its_weekday(self, monkeypatch, sample_articles):
+        calls = self._run(monkeypatch, sample_articles, dry_run=False, due=True)
+
+        assert calls[-1] == "apply_retention"
+        assert calls.count("apply_retention") == 1
+        assert {"send_digest", "send_to_notion", "create_github_issues"} <= set(
+            calls[:-1]
+        )
+
+    @pytest.mark.parametrize("dry_run, due", [(True, True), (False, False)])
+    def test_skipped_on_dry_runs_and_other_days(
+        self, monkeypatch, sample_articles, dry_run, due
+    ):
+        calls = self._run(monkeypatch, sample_articles, dry_run=dry_run, due=due)
+
+        assert "apply_retention" not in calls
+
 
 class TestErrorLoggingPreservesTraceback:
     """Task 6: Verify error handlers use logger.exception to preserve tracebacks."""
@@ -194,6 +320,7 @@ class TestDryRunNoGlobalMutation:
         mock_send_model_notion,
         mock_send_digest,
         sample_articles,
+        tmp_path,
     ):
         """In dry_run mode, Telegram/Notion/GitHub Issues should be skipped."""
         from src.main import main
@@ -211,3 +338,76 @@ class TestDryRunNoGlobalMutation:
         mock_send_notion.assert_not_called()
         mock_send_digest.assert_not_called()
         mock_send_model_notion.assert_not_called()
+
+        # The run still leaves a report behind
+        [report_path] = (tmp_path / "runs").glob("*.json")
+        report = json.loads(report_path.read_text())
+        assert report["status"] == "success"
+        assert report["dry_run"] is True
+        assert report["counters"]["items.new"] == len(sample_articles)
+        assert "main.deliver" in report["timers"]
+        assert "stage.telegram" in report["timers"]
+
+
+class TestResumeFromCheckpoint:
+    """Resuming a failed run must not re-scrape, re-summarize or re-save."""
+
+    @patch("src.main.send_failure_notification")
+    @patch("src.main.send_digest")
+    @patch("src.main.send_model_updates_to_notion", return_value=0)
+    @patch("src.main.send_to_notion")
+    @patch("src.main.create_github_issues")
+    @patch("src.main.save_seen_ids")
+    @patch("src.main.save_daily_articles")
+    @patch("src.main.filter_and_summarize")
+    @patch("src.main.filter_new_articles")
+    @patch("src.main.load_seen_ids")
+    @patch("src.main.scrape_all")
+    @patch("src.main.fetch_model_data")
+    @patch("src.main.save_model_snapshots")
+    @patch("src.main.get_model_updates")
+    def test_resume_skips_completed_stages(
+        self,
+        mock_get_model_updates,
+        mock_save_snapshots,
+        mock_fetch_model,
+        mock_scrape,
+        mock_load_seen,
+        mock_filter_new,
+        mock_filter_summarize,
+        mock_save_daily,
+        mock_save_seen,
+        mock_create_issues,
+        mock_send_notion,
+        mock_send_model_notion,
+        mock_send_digest,
+        mock_send_failure,
+        sample_articles,
+        isolated_checkpoints,
+    ):
+        from src.main import main
+
+        mock_scrape.return_value = sample_articles
+        mock_load_seen.return_value = set()
+        mock_filter_new.return_value = sample_articles
+        mock_filter_summarize.return_value = sample_articles
+        mock_get_model_updates.return_value = {"new_models": [], "rank_changes": [], "price_changes": []}
+        mock_send_notion.side_effect = Exception("Notion down")
+
+        with pytest.raises(Exception, match="Notion down"):
+            main(dry_run=False, run_id="run-1")
+        assert (isolated_checkpoints / "run-1.json").exists()
+        # Deliveries are isolated: the digest went out despite Notion failing
+        mock_send_digest.assert_called_once()
+
+        mock_send_notion.side_effect = None
+        main(dry_run=False, resume=True, run_id="run-1")
+
+        mock_scrape.assert_called_once()
+        mock_filter_summarize.assert_called_once()
+        mock_save_daily.assert_called_once()
+        mock_create_issues.assert_called_once()
+        assert mock_send_notion.call_count == 2
+        mock_send_digest.assert_called_once()
+        # Successful completion removes the checkpoint
+        assert not (isolated_checkpoints / "run-1.json").exists()
@@ -0,0 +1,77 @@
+"""Tests for src.metrics spans, counters and run reports."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from src import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "RUNS_DIR", tmp_path / "runs")
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestMetrics:
+    def test_spans_aggregate_count_total_and_max(self):
+        for seconds in (0.01, 0.03):
+            metrics.observe("work", seconds)
+        with metrics.span("work"):
+            pass
+
+        timer = metrics.snapshot()["timers"]["work"]
+        assert timer["count"] == 3
+        assert timer["total_s"] == pytest.approx(0.04, abs=0.005)
+        assert timer["max_s"] == pytest.approx(0.03)
+
+    def test_timed_wraps_sync_and_async_functions(self):
+        @metrics.timed("sync")
+        def double(x):
+            return x * 2
+
+        @metrics.timed("async")
+        async def triple(x):
+            await metrics.async_sleep("wait", 0)
+            return x * 3
+
+        assert double(2) == 4
+        assert asyncio.run(triple(2)) == 6
+        assert inspect.iscoroutinefunction(triple)
+        timers = metrics.snapshot()["timers"]
+        assert {"sync", "async", "sleep.wait"} <= timers.keys()
+
+    def test_counters_are_thread_safe(self):
+        def work():
+            for _ in range(1000):
+                metrics.incr("http.test")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert metrics.snapshot()["counters"] == {"http.test": 8000}
+
+    def test_run_report(self, tmp_path):
+        metrics.incr("tokens.prompt", 120)
+        metrics.sleep("backoff", 0)
+        started = datetime(2026, 3, 1, 7, 5, 9, tzinfo=timezone.utc)
+
+        path = metrics.write_run_report("2026-03-01", started, "success", dry_run=True)
+
+        assert path == tmp_path / "runs" / "2026-03-01-070509.json"
+        report = json.loads(path.read_text())
+        assert report["status"] == "success"
+        assert report["dry_run"] is True
+        assert report["counters"] == {"tokens.prompt": 120}
+        assert report["timers"]["sleep.backoff"]["count"] == 1
@@ -0,0 +1,147 @@
+"""Tests for src.model_fetcher streaming parse and conditional requests."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src import config, model_fetcher
+
+
+def _raw_model(i: int) -> dict:
+    return {
+        "id": f"m{i}",
+        "name": f"Model {i} ✨",
+        "model_creator": {"name": "Lab"},
+        "evaluations": {
+            "artificial_analysis_intelligence_index": 40 + i,
+            "artificial_analysis_coding_index": 30 + i,
+            "artificial_analysis_math_index": None,
+        },
+        "pricing": {"price_1m_input_tokens": 1.5, "price_1m_output_tokens": 6.0},
+        "median_output_tokens_per_second": 120.0,
+        "median_time_to_first_token_seconds": 0.4,
+    }
+
+
+def _parse(payload: bytes, chunk_size: int) -> list[dict]:
+    parser = model_fetcher.ModelStreamParser()
+    for i in range(0, len(payload), chunk_size):
+        parser.feed(payload[i : i + chunk_size])
+    return parser.close()
+
+
+class TestModelStreamParser:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+    def test_parses_data_array_in_any_chunking(self, chunk_size):
+        payload = json.dumps(
+            {"status": 200, "data": [_raw_model(i) for i in range(3)]},
+            ensure_ascii=False,
+        ).encode()
+
+        models = _parse(payload, chunk_size)
+
+        assert [m["model_id"] for m in models] == ["m0", "m1", "m2"]
+        assert models[0] == {
+            "model_id": "m0",
+            "name": "Model 0 ✨",
+            "creator": "Lab",
+            "intelligence_index": 40,
+            "coding_index": 30,
+            "math_index": None,
+            "speed_index": None,
+            "price_input": 1.5,
+            "price_output": 6.0,
+            "speed_tokens_per_sec": 120.0,
+            "ttft_seconds": 0.4,
+        }
+
+    def test_parses_bare_array_of_flat_entries(self):
+        payload = b' [{"model_id": "a", "name": "A", "intelligence_index": 50}]'
+
+        models = _parse(payload, 3)
+
+        assert models[0]["model_id"] == "a"
+        assert models[0]["intelligence_index"] == 50
+
+    def test_truncated_document_raises(self):
+        payload = json.dumps({"data": [_raw_model(0), _raw_model(1)]}).encode()
+
+        with pytest.raises(ValueError):
+            _parse(payload[:-40], 16)
+
+
+@pytest.fixture
+def cache_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "aa_models_cache.json"
+    monkeypatch.setattr(model_fetcher, "MODEL_CACHE_PATH", path)
+    monkeypatch.setattr(config, "ARTIFICIAL_ANALYSIS_API_KEY", "test-key")
+    return path
+
+
+async def _serve(monkeypatch: pytest.MonkeyPatch, handler) -> TestServer:
+    app = web.Application()
+    app.router.add_get("/models", handler)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(
+        config, "ARTIFICIAL_ANALYSIS_API_URL", str(server.make_url("/models"))
+    )
+    return server
+
+
+class TestFetchModelData:
+    async def test_reuses_cache_on_not_modified(self, cache_path, monkeypatch):
+        requests: list[dict] = []
+
+        async def handler(request: web.Request) -> web.StreamResponse:
+            requests.append(dict(request.headers))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+            response = web.StreamResponse(headers={"ETag": '"v1"'})
+            await response.prepare(request)
+            body = json.dumps({"data": [_raw_model(i) for i in range(5)]})
+            for i in range(0, len(body), 50):
+                await response.write(body[i : i + 50].encode())
+            await response.write_eof()
+            return response
+
+        server = await _serve(monkeypatch, handler)
+        try:
+            first = await model_fetcher.fetch_model_data()
+            second = await model_fetcher.fetch_model_data()
+        finally:
+            await server.close()
+
+        assert len(first) == 5
+        assert second == first
+        assert requests[0]["x-api-key"] == "test-key"
+        assert "If-None-Match" not in requests[0]
+        assert requests[1]["If-None-Match"] == '"v1"'
+        assert json.loads(cache_path.read_text())["etag"] == '"v1"'
+
+    async def test_malformed_payload_returns_empty(self, cache_path, monkeypatch):
+        async def handler(request: web.Request) -> web.Response:
+            return web.Response(text='{"data": [{"id": "m0", ', headers={"ETag": "x"})
+
+        server = await _serve(monkeypatch, handler)
+        try:
+            assert await model_fetcher.fetch_model_data() == []
+        finally:
+            await server.close()
+
+        assert not cache_path.exists()
+
+    async def test_http_error_returns_empty(self, cache_path, monkeypatch):
+        async def handler(request: web.Request) -> web.Response:
+            return web.Response(status=500)
+
+        server = await _serve(monkeypatch, handler)
+        try:
+            assert await model_fetcher.fetch_model_data() == []
+        finally:
+            await server.close()
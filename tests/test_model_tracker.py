@@ -0,0 +1,642 @@
+"""Tests for src.model_tracker snapshot storage and change detection."""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src import model_tracker
+
+
+def _model(model_id: str, intelligence: float, price: float = 1.0, **extra) -> dict:
+    return {
+        "model_id": model_id,
+        "name": model_id.upper(),
+        "creator": "Lab",
+        "intelligence_index": intelligence,
+        "price_input": price,
+        "price_output": price,
+        **extra,
+    }
+
+
+@pytest.fixture
+def models_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "models.db"
+    monkeypatch.setattr(model_tracker, "DB_PATH", path)
+    yield path
+    model_tracker.close_repository()
+
+
+class TestSnapshotRepository:
+    def test_uses_wal_and_one_connection(self, models_db):
+        model_tracker.save_model_snapshots([_model("a", 50)], "2026-02-10")
+        repo = model_tracker.get_repository()
+
+        assert model_tracker.get_repository() is repo
+        mode = repo.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_bulk_save_skips_models_without_id(self, models_db):
+        models = [_model("a", 50), {"name": "no id"}, _model("b", 40)]
+
+        assert model_tracker.save_model_snapshots(models, "2026-02-10") == 2
+        assert len(model_tracker._get_today_snapshot("2026-02-10")) == 2
+
+    def test_previous_snapshot_and_updates(self, models_db):
+        model_tracker.save_model_snapshots(
+            [_model("a", 50), _model("b", 40)], "2026-02-10"
+        )
+        model_tracker.save_model_snapshots(
+            [_model("a", 50, price=2.0), _model("b", 60), _model("c", 30)],
+            "2026-02-11",
+        )
+
+        previous = model_tracker.get_previous_snapshot("2026-02-11")
+        updates = model_tracker.get_model_updates("2026-02-11")
+
+        assert {m["model_id"] for m in previous} == {"a", "b"}
+        assert [m["model_id"] for m in updates["new_models"]] == ["c"]
+        changes = updates["rank_changes"]
+        ranks = [(c["name"], c["old_rank"], c["new_rank"]) for c in changes]
+        assert ranks == [("B", 2, 1), ("A", 1, 2)]
+        assert [c["name"] for c in updates["price_changes"]] == ["A"]
+
+    def test_legacy_database_is_migrated_to_catalog(self, models_db):
+        conn = sqlite3.connect(models_db)
+        conn.execute(model_tracker._CREATE_TABLE_SQL)
+        conn.executemany(
+            "INSERT INTO model_snapshots (model_id, name, intelligence_index, "
+            "price_input, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                ("a", "A", 50, 1.0, "2026-02-10"),
+                ("b", "B", 40, 1.0, "2026-02-10"),
+                ("a", "A", 50, 1.0, "2026-02-11"),
+                ("a", "A", 50, 1.0, "2026-02-12"),
+                ("b", "B", 40, 1.0, "2026-02-12"),
+                ("a", "A", 55, 1.0, "2026-02-13"),
+            ],
+        )
+        conn.commit()
+        legacy = {
+            day: sorted(
+                conn.execute(
+                    "SELECT * FROM model_snapshots WHERE fetched_at = ?", (day,)
+                ).fetchall()
+            )
+            for day in ("2026-02-10", "2026-02-11", "2026-02-12", "2026-02-13")
+        }
+        conn.close()
+
+        repo = model_tracker.get_repository()
+
+        assert repo.conn.execute("PRAGMA user_version").fetchone()[0] == len(
+            model_tracker._MIGRATIONS
+        )
+        assert [s["fetched_at"] for s in repo.list_snapshots()] == sorted(legacy)
+        assert repo.previous_date("2026-02-12") == "2026-02-11"
+        plan = repo.conn.execute(
+            "EXPLAIN QUERY PLAN " + model_tracker._PREVIOUS_DATE_SQL, ("2026-02-12",)
+        ).fetchall()
+        assert "USING COVERING INDEX" in plan[0][3]
+        # Only changes are stored, and the view reproduces every snapshot
+        versions = repo.conn.execute("SELECT COUNT(*) FROM model_versions").fetchone()
+        assert versions[0] == 4
+        for day, rows in legacy.items():
+            view = repo.conn.execute(
+                "SELECT * FROM model_snapshots WHERE fetched_at = ?", (day,)
+            ).fetchall()
+            assert sorted(view) == rows
+        plan = repo.conn.execute(
+            "EXPLAIN QUERY PLAN " + model_tracker._SELECT_SNAPSHOT_SQL,
+            ("2026-02-13",),
+        ).fetchall()
+        assert [row[3] for row in plan if row[3].startswith("SCAN")] == []
+        assert any("idx_model_versions_valid_to" in row[3] for row in plan)
+
+
+class TestChangeOnlyStorage:
+    def test_unchanged_models_write_no_rows(self, models_db):
+        models = [_model("a", 50), _model("b", 40)]
+        model_tracker.save_model_snapshots(models, "2026-02-10")
+        model_tracker.save_model_snapshots(models, "2026-02-11")
+        model_tracker.save_model_snapshots(
+            [_model("a", 50, price=2.0), _model("b", 40)], "2026-02-12"
+        )
+        repo = model_tracker.get_repository()
+
+        versions = repo.conn.execute(
+            "SELECT model_id, valid_from, valid_to FROM model_versions "
+            "ORDER BY model_id, valid_from"
+        ).fetchall()
+        assert versions == [
+            ("a", "2026-02-10", "2026-02-12"),
+            ("a", "2026-02-12", None),
+            ("b", "2026-02-10", None),
+        ]
+        assert [m["price_input"] for m in repo.snapshot("2026-02-11")] == [1.0, 1.0]
+
+    def test_resaving_latest_date_replaces_it(self, models_db):
+        model_tracker.save_model_snapshots([_model("a", 50)], "2026-02-10")
+        model_tracker.save_model_snapshots([_model("a", 60)], "2026-02-11")
+        model_tracker.save_model_snapshots(
+            [_model("a", 50), _model("b", 1)], "2026-02-11"
+        )
+        repo = model_tracker.get_repository()
+
+        snapshot = repo.snapshot("2026-02-11")
+        assert sorted(m["model_id"] for m in snapshot) == ["a", "b"]
+        assert repo.snapshot_count("2026-02-11") == 2
+        versions = repo.conn.execute("SELECT COUNT(*) FROM model_versions").fetchone()
+        assert versions[0] == 2
+
+    def test_older_date_is_rejected(self, models_db):
+        model_tracker.save_model_snapshots([_model("a", 50)], "2026-02-11")
+
+        assert model_tracker.save_model_snapshots([_model("a", 1)], "2026-02-10") == 0
+        assert model_tracker.get_repository().snapshot("2026-02-10") == []
+
+
+class TestSqlDiff:
+    def test_matches_python_detectors_for_any_date_pair(self, models_db):
+        rng = random.Random(3)
+        days = ["2026-01-01", "2026-01-08", "2026-02-01"]
+        for day in days:
+            models = [
+                _model(f"m{i}", rng.uniform(10, 80), rng.uniform(1, 3))
+                for i in range(40)
+                if rng.random() > 0.1
+            ]
+            model_tracker.save_model_snapshots(models, day)
+        repo = model_tracker.get_repository()
+
+        for old, new in (("2026-01-01", "2026-01-08"), ("2026-01-01", "2026-02-01")):
+            old_rows, new_rows = repo.snapshot(old), repo.snapshot(new)
+            diff = model_tracker.compare_snapshots(old, new)
+
+            expected_new = model_tracker.detect_new_models(new_rows, old_rows)
+            expected_ranks = model_tracker.detect_rank_changes(new_rows, old_rows)
+            expected_prices = model_tracker.detect_price_changes(new_rows, old_rows)
+            assert sorted(m["model_id"] for m in diff["new_models"]) == sorted(
+                m["model_id"] for m in expected_new
+            )
+            assert diff["rank_changes"] == expected_ranks
+            assert sorted(c["name"] for c in diff["price_changes"]) == sorted(
+                c["name"] for c in expected_prices
+            )
+
+    def test_period_deltas_pair_each_day_with_lagged_snapshot(self, models_db):
+        model_tracker.save_model_snapshots([_model("a", 50, price=1.0)], "2026-01-01")
+        model_tracker.save_model_snapshots([_model("a", 55, price=1.5)], "2026-01-05")
+        model_tracker.save_model_snapshots([_model("a", 60, price=2.0)], "2026-01-09")
+
+        deltas = model_tracker.get_repository().period_deltas(7)
+
+        assert [(d["old_date"], d["new_date"]) for d in deltas] == [
+            ("2026-01-01", "2026-01-09")
+        ]
+        assert deltas[0]["intelligence_delta"] == 10
+        assert deltas[0]["price_change"] == pytest.approx(1.0)
+
+
+class TestTimeSeries:
+    def _save_prices(self, prices: dict[str, list[float]]) -> None:
+        for day, row in enumerate(zip(*prices.values()), start=1):
+            models = [
+                _model(model_id, 50, price=price)
+                for model_id, price in zip(prices, row)
+            ]
+            model_tracker.save_model_snapshots(models, f"2026-03-{day:02d}")
+
+    def test_columns_and_rolling_analytics(self, models_db):
+        self._save_prices({"a": [1.0, 2.0, 2.0, 1.0], "b": [4.0, 4.0, 4.0, 4.0]})
+
+        series = model_tracker.get_repository().time_series("price", window=2)
+
+        assert set(series) == set(model_tracker.SERIES_COLUMNS)
+        assert series["model_id"] == ["a"] * 4 + ["b"] * 4
+        assert series["fetched_at"][:4] == [f"2026-03-0{d}" for d in range(1, 5)]
+        assert series["value"][:4] == [1.0, 2.0, 2.0, 1.0]
+        assert series["rolling_mean"][:4] == pytest.approx([1.0, 1.5, 2.0, 1.5])
+        assert series["pct_change"][0] is None
+        assert series["pct_change"][1:4] == pytest.approx([1.0, 0.0, -0.5])
+        assert series["drawdown"][:4] == pytest.approx([0.0, 0.0, 0.0, -0.5])
+        assert series["pct_change"][5:] == pytest.approx([0.0, 0.0, 0.0])
+
+    def test_range_filter_and_free_models(self, models_db):
+        self._save_prices({"a": [0.0, 1.0, 2.0, 4.0], "b": [1.0, 1.0, 1.0, 1.0]})
+
+        series = model_tracker.get_repository().time_series(
+            "price", "2026-03-01", "2026-03-03", model_ids=["a"]
+        )
+
+        assert series["fetched_at"] == ["2026-03-01", "2026-03-02", "2026-03-03"]
+        assert series["pct_change"] == [None, None, pytest.approx(1.0)]
+        assert series["drawdown"] == [None, 0.0, 0.0]
+
+    def test_trends_sorted_by_total_change(self, models_db):
+        self._save_prices({"a": [2.0, 1.0, 1.0], "b": [1.0, 1.5, 3.0]})
+
+        trends = model_tracker.get_repository().trends("price")
+
+        assert [t["model_id"] for t in trends] == ["b", "a"]
+        assert trends[0]["total_change"] == pytest.approx(2.0)
+        assert trends[1]["max_drawdown"] == pytest.approx(-0.5)
+
+    def test_unknown_metric_raises(self, models_db):
+        with pytest.raises(ValueError):
+            model_tracker.get_repository().time_series("vibes")
+
+
+class TestChangeRules:
+    def _save_days(self, *days: list[dict]) -> None:
+        for day, models in enumerate(days, start=1):
+            model_tracker.save_model_snapshots(models, f"2026-04-{day:02d}")
+
+    def test_metric_rules_with_threshold_and_scope(self, models_db):
+        self._save_days(
+            [_model("a", 80, coding_index=50), _model("b", 10, coding_index=50)],
+            [_model("a", 80, coding_index=54), _model("b", 10, coding_index=60)],
+        )
+        rules = [
+            {
+                "key": "metric_changes",
+                "metric": "coding_index",
+                "absolute": 3.0,
+                "top_n": 1,
+                "rank_by": "intelligence_index",
+            }
+        ]
+
+        updates = model_tracker.get_repository().diff(
+            "2026-04-01", "2026-04-02", rules
+        )
+
+        assert list(updates) == ["new_models", "metric_changes", "frontier_changes"]
+        [change] = updates["metric_changes"]
+        assert change["model_id"] == "a"  # b moved more but is outside the top 1
+        assert change["old_coding_index"] == 50
+        assert change["change"] == 4
+        assert change["change_percent"] == pytest.approx(0.08)
+
+    def test_window_days_compares_with_older_snapshot(self, models_db):
+        self._save_days(
+            [_model("a", 50, price=1.0)],
+            [_model("a", 50, price=1.05)],
+            [_model("a", 50, price=1.1)],
+        )
+        rules = [
+            {"key": "daily", "metric": "price", "relative": 0.08},
+            {"key": "two_day", "metric": "price", "relative": 0.08, "window_days": 2},
+        ]
+
+        updates = model_tracker.get_repository().evaluate_rules(
+            "2026-04-02", "2026-04-03", rules
+        )
+
+        assert updates["daily"] == []
+        assert [c["old_date"] for c in updates["two_day"]] == ["2026-04-01"]
+        assert updates["two_day"][0]["new_price"] == pytest.approx(1.1)
+
+    def test_lower_is_better_metrics_rank_ascending(self, models_db):
+        self._save_days(
+            [_model("a", 50, ttft_seconds=0.5), _model("b", 50, ttft_seconds=0.9)],
+            [_model("a", 50, ttft_seconds=0.9), _model("b", 50, ttft_seconds=0.4)],
+        )
+        rules = [{"key": "ttft", "kind": "rank", "metric": "ttft_seconds", "top_n": 2}]
+
+        updates = model_tracker.get_repository().evaluate_rules(
+            "2026-04-01", "2026-04-02", rules
+        )
+
+        assert updates["ttft"] == [
+            {"name": "B", "old_rank": 2, "new_rank": 1, "ttft_seconds": 0.4},
+            {"name": "A", "old_rank": 1, "new_rank": 2, "ttft_seconds": 0.9},
+        ]
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            {"key": "x", "metric": "vibes", "absolute": 1},
+            {"key": "x", "metric": "price"},
+            {"key": "x", "kind": "rank", "metric": "price"},
+            {"key": "x", "metric": "price", "relative": 0.1, "window_days": 0},
+        ],
+    )
+    def test_invalid_rules_raise(self, models_db, rule):
+        with pytest.raises(ValueError):
+            model_tracker.get_repository().evaluate_rules("a", "b", [rule])
+
+
+def _dominated(point: tuple, others: list[tuple]) -> bool:
+    price, *gains = point
+    return any(
+        o_price <= price
+        and all(o >= g for o, g in zip(o_gains, gains))
+        and (o_price, *o_gains) != point
+        for o_price, *o_gains in others
+    )
+
+
+class TestParetoFrontier:
+    @pytest.mark.parametrize("include_speed", [False, True])
+    def test_matches_brute_force(self, include_speed):
+        rng = random.Random(5)
+        models = [
+            _model(
+                f"m{i}",
+                rng.choice([40, 50, 60, 70]),
+                price=rng.choice([0.0, 0.5, 1.0, 2.0, 4.0]),
+                speed_tokens_per_sec=rng.choice([50, 100, 200]),
+            )
+            for i in range(300)
+        ]
+        points = {
+            m["model_id"]: (
+                m["price_input"],
+                m["intelligence_index"],
+                *([m["speed_tokens_per_sec"]] if include_speed else []),
+            )
+            for m in models
+        }
+
+        frontier = model_tracker.pareto_frontier(models, include_speed)
+
+        expected = {
+            model_id
+            for model_id, point in points.items()
+            if not _dominated(point, list(points.values()))
+        }
+        assert set(frontier) == expected
+        prices = [points[model_id][0] for model_id in frontier]
+        assert prices == sorted(prices)
+
+    def test_models_missing_a_dimension_are_skipped(self):
+        models = [_model("a", 50), _model("b", 60, price=None)]
+
+        assert model_tracker.pareto_frontier(models) == ["a"]
+
+    def test_frontier_is_stored_and_changes_are_reported(self, models_db):
+        model_tracker.save_model_snapshots(
+            [_model("cheap", 40, price=0.5), _model("smart", 70, price=5.0)],
+            "2026-05-01",
+        )
+        model_tracker.save_model_snapshots(
+            [
+                _model("cheap", 40, price=0.5),
+                _model("smart", 70, price=5.0),
+                _model("better", 75, price=3.0),
+            ],
+            "2026-05-02",
+        )
+        repo = model_tracker.get_repository()
+
+        stored = repo.conn.execute(
+            "SELECT fetched_at, model_id FROM model_frontier ORDER BY 1, position"
+        ).fetchall()
+        assert stored == [
+            ("2026-05-01", "cheap"),
+            ("2026-05-01", "smart"),
+            ("2026-05-02", "cheap"),
+            ("2026-05-02", "better"),
+        ]
+        updates = model_tracker.get_model_updates("2026-05-02")
+        assert [(c["model_id"], c["status"]) for c in updates["frontier_changes"]] == [
+            ("better", "joined"),
+            ("smart", "left"),
+        ]
+        assert updates["frontier_changes"][0]["price"] == 3.0
+
+
+class TestAnomalyBaselines:
+    def _save_prices(self, prices: dict[str, list[float]]) -> list[str]:
+        days = []
+        for i, row in enumerate(zip(*prices.values())):
+            day = f"2026-06-{i + 1:02d}"
+            model_tracker.save_model_snapshots(
+                [_model(m, 50, price=p) for m, p in zip(prices, row)], day
+            )
+            days.append(day)
+        return days
+
+    def test_flags_changes_relative_to_each_models_volatility(self, models_db):
+        rng = random.Random(9)
+        noisy = [1.0]
+        for _ in range(24):
+            noisy.append(noisy[-1] * rng.choice([0.85, 1.15]))
+        stable = [2.0] * 25
+        # Day 26: both move 20%, typical for "noisy" but never seen for "stable".
+        days = self._save_prices(
+            {"noisy": [*noisy, noisy[-1] * 1.2], "stable": [*stable, 2.4]}
+        )
+        repo = model_tracker.get_repository()
+
+        for day in days:
+            repo.update_baselines(day)
+
+        assert [(a["model_id"], a["metric"]) for a in repo.anomalies(days[-1])] == [
+            ("stable", "price")
+        ]
+        [anomaly] = repo.anomalies(days[-1])
+        assert anomaly["change_percent"] == pytest.approx(0.2)
+        assert anomaly["zscore"] == pytest.approx(20.0)
+
+    def test_update_is_incremental_and_idempotent(self, models_db):
+        days = self._save_prices({"a": [1.0, 1.0, 1.5]})
+        repo = model_tracker.get_repository()
+
+        repo.update_baselines(days[-1])  # seeds from the two earlier snapshots
+        first = repo.conn.execute("SELECT * FROM model_baselines").fetchall()
+        repo.update_baselines(days[-1])
+
+        assert repo.conn.execute("SELECT * FROM model_baselines").fetchall() == first
+        price = next(row for row in first if row[1] == "price")
+        assert price[2:4] == (days[-1], 1.5)
+        assert price[6] == 2  # two changes observed: 0% then +50%
+
+    def test_batch_seed_matches_day_by_day_updates(self, models_db, monkeypatch):
+        monkeypatch.setattr(model_tracker.config, "MODEL_ANOMALY_MIN_HISTORY", 3)
+        rng = random.Random(4)
+        prices = {"a": [], "b": [], "c": []}
+        for day in range(40):
+            for model_id, series in prices.items():
+                previous = series[-1] if series else 1.0
+                moved = previous * rng.choice([1.0, 1.0, 1.0, 0.9, 1.3])
+                series.append(0.0 if model_id == "c" and 10 <= day < 14 else moved)
+        days = []
+        for i, row in enumerate(zip(*prices.values())):
+            day = f"2026-07-{i + 1:02d}" if i < 31 else f"2026-08-{i - 30:02d}"
+            models = [_model(m, 50, price=p) for m, p in zip(prices, row)]
+            if 20 <= i < 25:
+                models = models[1:]  # "a" missing for a few snapshots
+            model_tracker.save_model_snapshots(models, day)
+            days.append(day)
+        repo = model_tracker.get_repository()
+
+        for day in days:
+            repo.update_baselines(day)
+        stepwise = repo.conn.execute(
+            "SELECT * FROM model_baselines ORDER BY 1, 2"
+        ).fetchall()
+        stepwise_anomalies = repo.conn.execute(
+            "SELECT fetched_at, model_id, metric FROM model_anomalies ORDER BY 1, 2, 3"
+        ).fetchall()
+        repo.conn.execute("DELETE FROM model_baselines")
+        repo.conn.execute("DELETE FROM model_anomalies")
+        repo.update_baselines(days[-1])  # seeds days[:-1] in one batch
+
+        batch = repo.conn.execute("SELECT * FROM model_baselines ORDER BY 1, 2")
+        for expected, actual in zip(stepwise, batch.fetchall(), strict=True):
+            assert actual[:4] == expected[:4]
+            assert actual[4:6] == pytest.approx(expected[4:6], abs=1e-12)
+            assert actual[6] == expected[6]
+        assert stepwise_anomalies
+        assert repo.conn.execute(
+            "SELECT fetched_at, model_id, metric FROM model_anomalies ORDER BY 1, 2, 3"
+        ).fetchall() == stepwise_anomalies
+
+    def test_model_updates_include_anomalies(self, models_db, monkeypatch):
+        monkeypatch.setattr(model_tracker.config, "MODEL_ANOMALY_MIN_HISTORY", 1)
+        days = self._save_prices({"a": [1.0, 1.0, 1.0, 3.0]})
+
+        updates = model_tracker.get_model_updates(days[-1])
+
+        assert [a["model_id"] for a in updates["anomalies"]] == ["a"]
+
+
+class TestRetention:
+    def test_daily_then_weekly_then_monthly(self):
+        first = datetime(2025, 1, 1)
+        dates = [(first + timedelta(days=i)).date().isoformat() for i in range(400)]
+
+        kept = sorted(model_tracker.retained_dates(dates, 30, 120))
+
+        newest = dates[-1]  # 2026-02-04
+        assert kept[-31:] == dates[-31:]
+        # Weekly tier: Sundays, plus month ends so the monthly tier keeps them.
+        weekly = [d for d in dates if "2025-10-07" <= d < "2026-01-05"]
+        assert [d for d in kept if d in weekly] == [
+            d
+            for d in weekly
+            if datetime.fromisoformat(d).weekday() == 6
+            or (datetime.fromisoformat(d) + timedelta(days=1)).day == 1
+        ]
+        monthly = [d for d in kept if d < "2025-10-07"]
+        assert monthly == [
+            f"2025-{m:02d}-{d}"
+            for m, d in zip(range(1, 11), (31, 28, 31, 30, 31, 30, 31, 31, 30, "06"))
+        ]
+        assert model_tracker.retained_dates(kept, 30, 120) == set(kept)
+        assert newest in kept
+
+    def test_invalid_policy_raises(self):
+        with pytest.raises(ValueError):
+            model_tracker.retained_dates(["2026-01-01"], 60, 30)
+
+    def test_kept_snapshots_and_every_version_survive(self, models_db):
+        rng = random.Random(5)
+        prices = {f"m{i}": 1.0 for i in range(6)}
+        first = datetime(2026, 1, 1)
+        days = []
+        for i in range(120):
+            for model_id in rng.sample(sorted(prices), 2):
+                prices[model_id] = rng.choice([1.0, 1.5, 2.0])
+            day = (first + timedelta(days=i)).date().isoformat()
+            models = [_model(m, 50, price=p) for m, p in prices.items()]
+            if i % 17 == 3:
+                models.pop()  # a model missing for a day
+            model_tracker.save_model_snapshots(models, day)
+            days.append(day)
+        repo = model_tracker.get_repository()
+        repo.update_baselines(days[-1])
+        kept = sorted(model_tracker.retained_dates(days, 14, 60))
+
+        def snapshots() -> dict[str, list[dict]]:
+            return {
+                day: sorted(repo.snapshot(day), key=lambda m: m["model_id"])
+                for day in kept
+            }
+
+        def histories() -> dict[str, list[dict]]:
+            return {model_id: repo.model_history(model_id) for model_id in prices}
+
+        expected = snapshots()
+        history = histories()
+        anomalies = repo.conn.execute("SELECT * FROM model_anomalies").fetchall()
+        versions = repo.conn.execute("SELECT COUNT(*) FROM model_versions").fetchone()
+
+        preview = repo.apply_retention(14, 60, dry_run=True)
+        assert repo.list_snapshots()[0]["fetched_at"] == days[0]
+        report = repo.apply_retention(14, 60)
+
+        assert (report.snapshots_kept, report.snapshots_dropped) == (
+            len(kept),
+            len(days) - len(kept),
+        )
+        assert report.frontier_rows_dropped == preview.frontier_rows_dropped > 0
+        assert report.versions_collapsed == preview.versions_collapsed > 0
+        assert [row["fetched_at"] for row in repo.list_snapshots()] == kept
+        assert snapshots() == expected
+        assert histories() == history
+        remaining = repo.conn.execute("SELECT COUNT(*) FROM model_versions").fetchone()
+        assert remaining[0] == versions[0] - report.versions_collapsed
+        assert (
+            repo.conn.execute("SELECT * FROM model_anomalies").fetchall() == anomalies
+        )
+        assert repo.apply_retention(14, 60).snapshots_dropped == 0
+        assert histories() == history
+
+    def test_folding_versions_shrinks_the_file(self, models_db):
+        # Measured speeds move daily for a third of the models; prices rarely.
+        rng = random.Random(11)
+        speeds = {f"m{i:02d}": 100.0 for i in range(60)}
+        first = datetime(2025, 1, 1)
+        for i in range(400):
+            for model_id in rng.sample(sorted(speeds), 20):
+                speeds[model_id] = round(rng.uniform(50, 200), 1)
+            models = [
+                _model(m, 50, price=1.0 + (i > 200), speed_tokens_per_sec=speed)
+                for m, speed in speeds.items()
+            ]
+            day = (first + timedelta(days=i)).date().isoformat()
+            model_tracker.save_model_snapshots(models, day)
+        repo = model_tracker.get_repository()
+        history = repo.model_history("m07")
+
+        report = repo.apply_retention()
+
+        assert report.versions_collapsed > 0
+        assert report.bytes_after < report.bytes_before
+        assert repo.model_history("m07") == history
+
+    def test_short_lived_change_is_still_queryable(self, models_db):
+        first = datetime(2025, 1, 1)
+        days = [(first + timedelta(days=i)).date().isoformat() for i in range(400)]
+        for i, day in enumerate(days):
+            price = 2.0 if 10 <= i <= 15 else 1.0
+            model_tracker.save_model_snapshots([_model("a", 50, price=price)], day)
+        repo = model_tracker.get_repository()
+        repo.conn.execute(
+            "INSERT INTO model_anomalies VALUES (?, 'a', 'price', 1.0, 2.0, 1.0, 9.0)",
+            (days[10],),
+        )
+
+        repo.apply_retention()
+
+        assert days[10] not in {row["fetched_at"] for row in repo.list_snapshots()}
+        history = [
+            (v["valid_from"], v["valid_to"], v["price_input"])
+            for v in repo.model_history("a")
+        ]
+        assert history == [
+            (days[0], days[10], 1.0),
+            (days[10], days[16], 2.0),
+            (days[16], None, 1.0),
+        ]
+        assert [(a["name"], a["new_value"]) for a in repo.anomalies(days[10])] == [
+            ("A", 2.0)
+        ]
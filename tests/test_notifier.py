@@ -36,6 +36,9 @@ def test_format_digest_with_all_model_updates(sample_article, sample_model_updat
     assert "GPT" in result
     assert "Claude" in result
     assert "Turbo" in result
+    assert "coding\\_index: 55 → 61\\.5 \\(\\+6\\.5\\)" in result
+    assert "DeepSeek V3 joined the price/intelligence frontier" in result
+    assert "o3 price: 25 → 5 \\(\\-80\\.0%, z \\-80\\.0\\)" in result
 
 def test_format_digest_with_none_creator(sample_article):
     """format_digest must handle model updates where 'creator' is None (from API)."""
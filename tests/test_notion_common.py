@@ -43,3 +43,24 @@ class TestNotionCommon:
 
         assert callable(get_client)
         assert callable(resolve_data_source_id)
+
+
+class TestNotionCache:
+    def test_concurrent_updates_are_all_kept(self, tmp_path, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src import notion_common
+
+        path = tmp_path / "notion_cache.json"
+        monkeypatch.setattr(notion_common, "NOTION_CACHE_PATH", path)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(
+                pool.map(
+                    lambda n: notion_common.remember_data_source_id(f"k{n}", f"ds{n}"),
+                    range(40),
+                )
+            )
+
+        assert len(notion_common.load_cache()["data_sources"]) == 40
+        assert [p.name for p in tmp_path.iterdir()] == [path.name]
@@ -0,0 +1,233 @@
+"""Tests for src.notion_handler batched duplicate detection."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import notion_common, notion_handler, notion_writer
+
+
+def _page(title: str) -> dict:
+    return {"properties": {"제목": {"title": [{"plain_text": title}]}}}
+
+
+@pytest.fixture
+def notion_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(notion_common, "NOTION_CACHE_PATH", tmp_path / "notion_cache.json")
+    return tmp_path / "notion_cache.json"
+
+
+class TestLoadExistingKeys:
+    def test_paginated_scan_builds_key_set(self, notion_cache):
+        client = MagicMock()
+        client.data_sources.retrieve.return_value = {"last_edited_time": "t1"}
+        client.data_sources.query.side_effect = [
+            {"results": [_page("hackernews:1 First")], "has_more": True, "next_cursor": "c1"},
+            {"results": [_page("geeknews:https://news.hada.io/topic?id=2 Second")], "has_more": False},
+        ]
+
+        keys = notion_handler.load_existing_keys(client, "ds-1")
+
+        assert keys == {"hackernews:1", "geeknews:https://news.hada.io/topic?id=2"}
+        assert client.data_sources.query.call_count == 2
+        assert client.data_sources.query.call_args.kwargs["start_cursor"] == "c1"
+
+    def test_unchanged_validator_skips_scan(self, notion_cache):
+        client = MagicMock()
+        client.data_sources.retrieve.return_value = {"last_edited_time": "t1"}
+        client.data_sources.query.return_value = {"results": [_page("hackernews:1 A")], "has_more": False}
+        notion_handler.load_existing_keys(client, "ds-1")
+        notion_handler.remember_keys(client, "ds-1", {"hackernews:2"})
+
+        keys = notion_handler.load_existing_keys(client, "ds-1")
+
+        assert keys == {"hackernews:1", "hackernews:2"}
+        assert client.data_sources.query.call_count == 1
+
+    def test_own_writes_keep_the_next_run_warm(self, notion_cache, monkeypatch):
+        client = MagicMock()
+        monkeypatch.setattr(notion_handler, "get_client", lambda: client)
+        monkeypatch.setattr(
+            notion_handler, "ensure_database", lambda c, week_id: "ds-1"
+        )
+        monkeypatch.setattr(
+            notion_writer,
+            "create_pages",
+            lambda payloads: [{"id": "p"}] * len(payloads),
+        )
+        # Our page write moves the data source's last_edited_time t1 -> t2
+        client.data_sources.retrieve.side_effect = [
+            {"last_edited_time": "t1"},
+            {"last_edited_time": "t2"},
+            {"last_edited_time": "t2"},
+        ]
+        client.data_sources.query.return_value = {
+            "results": [_page("hackernews:1 A")],
+            "has_more": False,
+        }
+        payload = {
+            "source": "hackernews",
+            "source_id": "2",
+            "title": "B",
+            "url": "https://example.com/b",
+            "discussion_url": "https://example.com/b",
+            "summary": "",
+            "score": 1,
+            "published_at": "2026-02-11T00:00:00+00:00",
+        }
+        notion_handler.deliver_notion_pages([payload])
+
+        keys = notion_handler.load_existing_keys(client, "ds-1")
+
+        assert keys == {"hackernews:1", "hackernews:2"}
+        assert client.data_sources.query.call_count == 1
+
+    def test_changed_validator_rescans(self, notion_cache):
+        client = MagicMock()
+        client.data_sources.retrieve.side_effect = [
+            {"last_edited_time": "t1"},
+            {"last_edited_time": "t2"},
+        ]
+        client.data_sources.query.return_value = {"results": [], "has_more": False}
+
+        notion_handler.load_existing_keys(client, "ds-1")
+        notion_handler.load_existing_keys(client, "ds-1")
+
+        assert client.data_sources.query.call_count == 2
+
+    def test_scan_does_not_overwrite_concurrent_cache_updates(self, notion_cache):
+        client = MagicMock()
+        client.data_sources.retrieve.return_value = {"last_edited_time": "t1"}
+
+        def query(**_):
+            # Another stage writes the cache while this scan is in flight
+            notion_common.remember_data_source_id("weekly:2026-W07", "ds-9")
+            return {"results": [_page("hackernews:1 A")], "has_more": False}
+
+        client.data_sources.query.side_effect = query
+
+        notion_handler.load_existing_keys(client, "ds-1")
+
+        cache = notion_common.load_cache()
+        assert cache["data_sources"] == {"weekly:2026-W07": "ds-9"}
+        assert cache["dedup"]["ds-1"]["keys"] == ["hackernews:1"]
+
+
+class TestSendToNotionDedup:
+    def test_existing_articles_are_not_recreated(
+        self, notion_cache, monkeypatch, sample_articles
+    ):
+        from src import config
+
+        monkeypatch.setattr(config, "NOTION_API_KEY", "key")
+        monkeypatch.setattr(config, "DRY_RUN", False)
+        for article in sample_articles:
+            article.relevance_score = 0.9
+
+        client = MagicMock()
+        create_pages = MagicMock(side_effect=lambda payloads: [{"id": "p"}] * len(payloads))
+        monkeypatch.setattr(notion_handler, "get_client", lambda: client)
+        monkeypatch.setattr(notion_writer, "create_pages", create_pages)
+        monkeypatch.setattr(notion_handler, "ensure_database", lambda c, week_id: "ds-1")
+        client.data_sources.retrieve.return_value = {"last_edited_time": "t1"}
+        client.data_sources.query.return_value = {
+            "results": [_page("hackernews:12345 Sample HN Article")],
+            "has_more": False,
+        }
+
+        created = notion_handler.send_to_notion(sample_articles)
+
+        assert created == 2
+        assert len(create_pages.call_args.args[0]) == 2
+        assert client.data_sources.query.call_count == 1
+
+
+class TestDeliverNotionPages:
+    def test_retries_go_to_the_week_they_were_enqueued_in(
+        self, notion_cache, monkeypatch, sample_article, sample_tldrai_article
+    ):
+        from src import config
+        from src.article_codec import article_to_dict
+
+        monkeypatch.setattr(config, "get_week_identifier", lambda: "2026-W07")
+        databases = {"2026-W06": "ds-6", "2026-W07": "ds-7"}
+        monkeypatch.setattr(
+            notion_handler,
+            "ensure_database",
+            lambda c, week_id=None: databases[week_id or "2026-W07"],
+        )
+        client = MagicMock()
+        monkeypatch.setattr(notion_handler, "get_client", lambda: client)
+        pages = {
+            "ds-6": [_page("hackernews:12345 Sample HN Article")],
+            "ds-7": [],
+        }
+        client.data_sources.retrieve.return_value = {"last_edited_time": "t1"}
+        client.data_sources.query.side_effect = lambda data_source_id, **_: {
+            "results": pages[data_source_id],
+            "has_more": False,
+        }
+        parents = []
+
+        def fake_create_pages(payloads):
+            parents.extend(p["parent"]["data_source_id"] for p in payloads)
+            return [{"id": "p"}] * len(payloads)
+
+        monkeypatch.setattr(notion_writer, "create_pages", fake_create_pages)
+
+        results = notion_handler.deliver_notion_pages(
+            [
+                # Created last week before an ambiguous failure, retried now
+                {**article_to_dict(sample_article), "week_id": "2026-W06"},
+                {**article_to_dict(sample_tldrai_article), "week_id": "2026-W06"},
+                # Enqueued before week_id was recorded: this week
+                article_to_dict(sample_tldrai_article),
+            ]
+        )
+
+        assert results == [
+            {"duplicate": "hackernews:12345"},
+            {"page_id": "p"},
+            {"page_id": "p"},
+        ]
+        assert parents == ["ds-6", "ds-7"]
+
+
+class TestDataSourceResolutionCache:
+    def test_weekly_database_is_resolved_once(self, notion_cache, monkeypatch):
+        from src import config
+
+        monkeypatch.setattr(config, "NOTION_DATABASE_ID", None)
+        monkeypatch.setattr(config, "get_week_identifier", lambda: "2026-W07")
+        client = MagicMock()
+        client.search.return_value = {
+            "results": [{"id": "ds-7", "title": [{"plain_text": "2026-W07 Articles"}]}]
+        }
+
+        assert notion_handler.ensure_database(client) == "ds-7"
+        assert notion_handler.ensure_database(client) == "ds-7"
+        assert client.search.call_count == 1
+
+    def test_not_found_write_invalidates_and_retries(self, notion_cache, monkeypatch):
+        import httpx
+        from notion_client.errors import APIErrorCode, APIResponseError
+
+        notion_common.remember_data_source_id("weekly:2026-W07", "ds-old")
+        not_found = APIResponseError(
+            httpx.Response(404), "gone", APIErrorCode.ObjectNotFound
+        )
+        calls = []
+
+        def fake_create_pages(payloads):
+            calls.append(payloads)
+            return [not_found] if len(calls) == 1 else [{"id": "page"}]
+
+        monkeypatch.setattr(notion_writer, "create_pages", fake_create_pages)
+
+        results = notion_writer.create_pages_in(
+            "ds-old", [{"parent": {}, "properties": {}}], resolve=lambda: "ds-new"
+        )
+
+        assert results == [{"id": "page"}]
+        assert calls[1][0]["parent"]["data_source_id"] == "ds-new"
+        assert notion_common.cached_data_source_id("weekly:2026-W07") is None
@@ -0,0 +1,150 @@
+"""Tests for the incremental Notion read-state sync."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import config, notion_read_sync
+
+
+def _data_source(ds_id: str, title: str, edited: str) -> dict:
+    return {"id": ds_id, "title": [{"plain_text": title}], "last_edited_time": edited}
+
+
+def _page(key: str, read: bool, edited: str) -> dict:
+    return {
+        "last_edited_time": edited,
+        "properties": {
+            "제목": {"title": [{"plain_text": f"{key} Some title"}]},
+            "읽음": {"checkbox": read},
+        },
+    }
+
+
+@pytest.fixture
+def read_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(notion_read_sync, "READ_STATE_PATH", tmp_path / "read.json")
+    monkeypatch.setattr(config, "NOTION_DATABASE_ID", None)
+    monkeypatch.setattr(config, "get_week_identifier", lambda: "2026-W08")
+
+
+def _pages_by_source(client: MagicMock, pages: dict[str, list[dict]]) -> None:
+    client.data_sources.query.side_effect = lambda data_source_id, **_: {
+        "results": pages[data_source_id]
+    }
+
+
+class TestSyncReadState:
+    def test_first_sync_lists_and_scans_all_weekly_sources(self, read_state):
+        client = MagicMock()
+        client.search.return_value = {
+            "results": [
+                _data_source("ds-8", "2026-W08 Articles", "2026-02-20T10:00:00.000Z"),
+                _data_source("tracker", "AI Model Tracker", "2026-02-19T10:00:00.000Z"),
+                _data_source("ds-7", "2026-W07 Articles", "2026-02-14T10:00:00.000Z"),
+            ],
+            "has_more": False,
+        }
+        _pages_by_source(
+            client,
+            {
+                "ds-7": [_page("hackernews:1", False, "2026-02-14T10:00:00.000Z")],
+                "ds-8": [_page("hackernews:2", True, "2026-02-20T10:00:00.000Z")],
+            },
+        )
+
+        assert notion_read_sync.sync_read_state(client) == 2
+
+        assert notion_read_sync.read_keys() == {"hackernews:2"}
+        state = notion_read_sync.load_read_state()
+        assert state["high_water_mark"] == "2026-02-20T10:00:00.000Z"
+        assert state["data_sources"] == {"2026-W07": "ds-7", "2026-W08": "ds-8"}
+        assert "filter" not in client.data_sources.query.call_args.kwargs
+
+    def test_page_edits_are_found_without_data_source_timestamps(self, read_state):
+        # Ticking a page in an old week need not move its data source's
+        # last_edited_time: every cached week is queried by page timestamp.
+        notion_read_sync.save_read_state(
+            {
+                "high_water_mark": "2026-02-20T10:00:00.000Z",
+                "articles": {"hackernews:1": {"read": False}},
+                "data_sources": {"2026-W07": "ds-7", "2026-W08": "ds-8"},
+            }
+        )
+        client = MagicMock()
+        _pages_by_source(
+            client,
+            {
+                "ds-7": [_page("hackernews:1", True, "2026-02-21T08:00:00.000Z")],
+                "ds-8": [],
+            },
+        )
+
+        assert notion_read_sync.sync_read_state(client) == 1
+
+        client.search.assert_not_called()
+        queries = [call.kwargs for call in client.data_sources.query.call_args_list]
+        assert [q["data_source_id"] for q in queries] == ["ds-7", "ds-8"]
+        assert all(
+            q["filter"]["last_edited_time"]
+            == {"on_or_after": "2026-02-20T10:00:00.000Z"}
+            for q in queries
+        )
+        assert notion_read_sync.read_keys() == {"hackernews:1"}
+
+    def test_new_week_refreshes_the_list(self, read_state):
+        notion_read_sync.save_read_state(
+            {
+                "high_water_mark": "2026-02-14T10:00:00.000Z",
+                "articles": {},
+                "data_sources": {"2026-W07": "ds-7"},
+            }
+        )
+        client = MagicMock()
+        client.search.return_value = {
+            "results": [
+                _data_source("ds-8", "2026-W08 Articles", "2026-02-20T10:00:00.000Z"),
+                _data_source("ds-7", "2026-W07 Articles", "2026-02-14T10:00:00.000Z"),
+            ],
+            "has_more": False,
+        }
+        _pages_by_source(client, {"ds-7": [], "ds-8": []})
+
+        notion_read_sync.sync_read_state(client)
+
+        assert client.search.call_count == 1
+        assert notion_read_sync.load_read_state()["data_sources"] == {
+            "2026-W07": "ds-7",
+            "2026-W08": "ds-8",
+        }
+
+    def test_deleted_data_source_is_dropped(self, read_state):
+        import httpx
+        from notion_client.errors import APIErrorCode, APIResponseError
+
+        notion_read_sync.save_read_state(
+            {
+                "high_water_mark": None,
+                "articles": {},
+                "data_sources": {"2026-W07": "ds-gone", "2026-W08": "ds-8"},
+            }
+        )
+        not_found = APIResponseError(
+            httpx.Response(404), "gone", APIErrorCode.ObjectNotFound
+        )
+        client = MagicMock()
+
+        def query(data_source_id, **_):
+            if data_source_id == "ds-gone":
+                raise not_found
+            return {"results": [_page("hackernews:2", True, "2026-02-20T10:00Z")]}
+
+        client.data_sources.query.side_effect = query
+
+        assert notion_read_sync.sync_read_state(client) == 1
+
+        assert notion_read_sync.load_read_state()["data_sources"] == {
+            "2026-W08": "ds-8"
+        }
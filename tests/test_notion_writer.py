@@ -0,0 +1,80 @@
+"""Tests for src.notion_writer async page creation."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from notion_client.errors import APIErrorCode, APIResponseError
+
+from src.notion_common import request_bucket
+from src.notion_writer import AsyncNotionWriter, TokenBucket
+
+
+def _rate_limited(retry_after: str) -> APIResponseError:
+    response = httpx.Response(429, headers={"Retry-After": retry_after})
+    return APIResponseError(response, "rate limited", APIErrorCode.RateLimited)
+
+
+async def _writer_with(create: AsyncMock, rate: float = 1000.0) -> AsyncNotionWriter:
+    writer = AsyncNotionWriter(rate=rate, concurrency=3)
+    writer._client = MagicMock()
+    writer._client.pages.create = create
+    return writer
+
+
+class TestTokenBucket:
+    async def test_limits_sustained_rate(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        # 1 token up front, then 4 more at 20/s
+        assert time.monotonic() - start >= 0.18
+
+    def test_one_rate_across_event_loops(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+
+        async def take(n: int) -> None:
+            for _ in range(n):
+                await bucket.acquire()
+
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=asyncio.run, args=(take(3),)) for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Two stages, 6 tokens in total: 1 up front, then 5 at 20/s
+        assert time.monotonic() - start >= 0.23
+
+    def test_writers_share_the_process_bucket(self):
+        assert AsyncNotionWriter()._bucket is request_bucket()
+        assert AsyncNotionWriter()._bucket is AsyncNotionWriter()._bucket
+
+
+class TestAsyncNotionWriter:
+    async def test_retries_after_rate_limit(self):
+        create = AsyncMock(side_effect=[_rate_limited("0.05"), {"id": "page-1"}])
+        writer = await _writer_with(create)
+
+        result = await writer.create_page({"parent": {}})
+
+        assert result == {"id": "page-1"}
+        assert create.await_count == 2
+
+    async def test_failures_are_returned_in_order(self):
+        error = APIResponseError(
+            httpx.Response(400), "bad", APIErrorCode.ValidationError
+        )
+        create = AsyncMock(side_effect=[{"id": "a"}, error, {"id": "c"}])
+        writer = await _writer_with(create)
+
+        results = await writer.create_pages([{"n": 1}, {"n": 2}, {"n": 3}])
+
+        assert results[0] == {"id": "a"}
+        assert results[1] is error
+        assert results[2] == {"id": "c"}
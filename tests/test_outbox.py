@@ -0,0 +1,61 @@
+"""Tests for the durable delivery outbox."""
+
+from __future__ import annotations
+
+from src import config
+from src.outbox import Outbox, drain
+
+
+class TestOutbox:
+    def test_enqueue_is_idempotent(self):
+        with Outbox() as box:
+            assert box.enqueue("telegram", "k1", {"text": "a"}) is True
+            assert box.enqueue("telegram", "k1", {"text": "b"}) is False
+            items = box.pending("telegram")
+
+        assert [item.payload for item in items] == [{"text": "a"}]
+
+    def test_sent_items_are_not_redelivered(self):
+        handler_calls: list[list[dict]] = []
+
+        def handler(payloads):
+            handler_calls.append(payloads)
+            return [True] * len(payloads)
+
+        with Outbox() as box:
+            box.enqueue("telegram", "k1", {"text": "a"})
+            drain(["telegram"], handlers={"telegram": handler}, outbox=box)
+            box.enqueue("telegram", "k1", {"text": "a"})
+            stats = drain(["telegram"], handlers={"telegram": handler}, outbox=box)
+
+        assert stats["telegram"].sent == 0
+        assert len(handler_calls) == 1
+
+    def test_failed_items_are_retried_on_next_drain(self):
+        def flaky(payloads):
+            return [RuntimeError("boom") if p["n"] == 2 else True for p in payloads]
+
+        with Outbox() as box:
+            for n in (1, 2):
+                box.enqueue("github", f"k{n}", {"n": n})
+            first = drain(["github"], handlers={"github": flaky}, outbox=box)
+            retried = drain(
+                ["github"], handlers={"github": lambda p: [True] * len(p)}, outbox=box
+            )
+
+        assert (first["github"].sent, first["github"].failed) == (1, 1)
+        assert retried["github"].sent == 1
+
+    def test_item_is_dead_after_max_attempts(self, monkeypatch):
+        monkeypatch.setattr(config, "OUTBOX_MAX_ATTEMPTS", 2)
+
+        def failing(payloads):
+            raise RuntimeError("down")
+
+        with Outbox() as box:
+            box.enqueue("notion", "k1", {})
+            for _ in range(3):
+                drain(["notion"], handlers={"notion": failing}, outbox=box)
+
+            assert box.pending("notion") == []
+            assert box.counts() == {("notion", "dead"): 1}
@@ -0,0 +1,115 @@
+"""Tests for src.pipeline stage scheduling, isolation and timeouts."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src.pipeline import Stage, run_stages
+
+
+def _sleep(seconds: float, value: object = None):
+    def run(_results):
+        time.sleep(seconds)
+        return value
+
+    return run
+
+
+class TestRunStages:
+    def test_independent_stages_overlap(self):
+        start = time.perf_counter()
+        run = run_stages(
+            [Stage(name, _sleep(0.2, name)) for name in ("a", "b", "c")]
+        )
+
+        assert time.perf_counter() - start < 0.4
+        assert run.results == {"a": "a", "b": "b", "c": "c"}
+        assert set(run.durations) == {"a", "b", "c"}
+
+    def test_dependents_wait_and_see_results(self):
+        order: list[str] = []
+        lock = threading.Lock()
+
+        def record(name, value):
+            def run(results):
+                with lock:
+                    order.append(name)
+                return value(results)
+
+            return run
+
+        run = run_stages(
+            [
+                Stage("sum", record("sum", lambda r: r["a"] + r["b"]), ("a", "b")),
+                Stage("a", record("a", lambda r: (time.sleep(0.05), 1)[1])),
+                Stage("b", record("b", lambda r: 2)),
+            ]
+        )
+
+        assert run.results["sum"] == 3
+        assert order[-1] == "sum"
+
+    def test_failure_skips_only_dependents(self):
+        def fail(_results):
+            raise RuntimeError("boom")
+
+        run = run_stages(
+            [
+                Stage("ok", _sleep(0.05, "fine")),
+                Stage("bad", fail),
+                Stage("after_bad", _sleep(0, "never"), ("bad",)),
+                Stage("after_after", _sleep(0, "never"), ("after_bad",)),
+            ]
+        )
+
+        assert run.results == {"ok": "fine"}
+        assert list(run.errors) == ["bad"]
+        assert run.skipped == ["after_bad", "after_after"]
+        with pytest.raises(RuntimeError, match="boom"):
+            run.raise_for_errors()
+
+    def test_non_fatal_failure_lets_dependents_run(self):
+        def fail(_results):
+            raise RuntimeError("tracker down")
+
+        run = run_stages(
+            [
+                Stage("tracker", fail, fatal=False),
+                Stage("digest", lambda r: ("sent", r["tracker"]), ("tracker",)),
+            ]
+        )
+
+        assert run.results == {"tracker": None, "digest": ("sent", None)}
+        assert list(run.tolerated) == ["tracker"]
+        run.raise_for_errors()  # nothing fatal
+
+    def test_timeout_fails_the_stage_without_waiting(self):
+        release = threading.Event()
+        start = time.perf_counter()
+
+        run = run_stages(
+            [
+                Stage("stuck", lambda r: release.wait(5), timeout=0.1),
+                Stage("fast", _sleep(0, "done")),
+            ]
+        )
+        release.set()
+
+        assert time.perf_counter() - start < 1
+        assert isinstance(run.errors["stuck"], TimeoutError)
+        assert run.results == {"fast": "done"}
+
+    @pytest.mark.parametrize(
+        "stages",
+        [
+            [Stage("a", _sleep(0)), Stage("a", _sleep(0))],
+            [Stage("a", _sleep(0), ("missing",))],
+            [Stage("a", _sleep(0), ("b",)), Stage("b", _sleep(0), ("a",))],
+        ],
+    )
+    def test_invalid_graphs_raise(self, stages):
+        with pytest.raises(ValueError):
+            run_stages(stages)
@@ -0,0 +1,131 @@
+"""Tests for src.profiling output files and hot-path markers."""
+
+from __future__ import annotations
+
+import pstats
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import metrics, profiling
+from src.profiling import collapse_stack, profiled
+
+
+def _busy_worker(seconds: float) -> list[bytes]:
+    with metrics.span("test.worker"):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            sum(range(1000))
+        return [bytes(1024) for _ in range(2000)]
+
+
+@pytest.fixture
+def tracking_spans():
+    metrics.track_open_spans(True)
+    yield
+    metrics.track_open_spans(False)
+
+
+@pytest.mark.usefixtures("tracking_spans")
+class TestCollapseStack:
+    def test_span_marker_follows_its_opener(self):
+        def inner():
+            return collapse_stack(
+                "MainThread",
+                sys._getframe(),
+                metrics.open_spans(threading.get_ident()),
+            )
+
+        def outer():
+            with metrics.span("test.outer"):
+                return inner()
+
+        stack = outer().split(";")
+
+        assert stack[0] == "MainThread"
+        i = next(i for i, part in enumerate(stack) if ".<locals>.outer (" in part)
+        assert stack[i + 1] == "[test.outer]"
+        assert ".<locals>.inner (tests/test_profiling.py:" in stack[i + 2]
+        assert stack[-1] == stack[i + 2]  # the sampled frame is the leaf
+
+    def test_closed_spans_are_not_reported(self):
+        with metrics.span("test.closed"):
+            pass
+
+        assert metrics.open_spans(threading.get_ident()) == []
+
+    def test_finished_threads_leave_no_entry(self):
+        worker = threading.Thread(target=_busy_worker, args=(0.01,))
+        worker.start()
+        worker.join()
+
+        assert worker.ident not in metrics._open
+
+
+class TestOpenSpanTracking:
+    def test_spans_are_not_recorded_outside_profiling(self):
+        with metrics.span("test.untracked"):
+            assert metrics.open_spans(threading.get_ident()) == []
+
+        assert metrics._open == {}
+
+    def test_span_opened_before_tracking_stops_is_cleaned_up(self, tracking_spans):
+        with metrics.span("test.straddling"):
+            metrics.track_open_spans(False)
+
+        assert metrics._open == {}
+
+
+class TestProfiled:
+    def test_writes_pstats_stacks_and_allocations(self, tmp_path):
+        held: list[list[bytes]] = []
+
+        with profiled(tmp_path, stem="run", top_n=5, interval=0.002) as output:
+            worker = threading.Thread(
+                target=lambda: held.append(_busy_worker(0.1)), name="worker"
+            )
+            worker.start()
+            worker.join()
+
+        assert output.pstats == tmp_path / "run.pstats"
+        stats = pstats.Stats(str(output.pstats))
+        assert any(func[2] == "_busy_worker" for func in stats.stats)
+
+        stacks = output.collapsed.read_text().splitlines()
+        worker_stacks = [line for line in stacks if line.startswith("worker;")]
+        assert worker_stacks
+        assert any("[test.worker]" in line for line in worker_stacks)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+
+        report = output.allocations.read_text()
+        assert report.startswith("Peak traced memory:")
+        assert "test_profiling.py" in report
+        assert "bytes(1024)" in report
+
+    @pytest.mark.parametrize("per_thread", [True, False])
+    def test_threads_started_inside_finish_their_work(
+        self, tmp_path, monkeypatch, per_thread
+    ):
+        # False is the 3.12+ path: one profiler, no per-thread hook.
+        monkeypatch.setattr(profiling, "PER_THREAD_PROFILES", per_thread)
+        results: list[list[bytes]] = []
+
+        with profiled(tmp_path, stem="threads", interval=0.002) as output:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [pool.submit(_busy_worker, 0.02) for _ in range(4)]
+                results = [future.result(timeout=10) for future in futures]
+
+        assert [len(held) for held in results] == [2000] * 4
+        assert output.pstats.exists()
+
+    def test_writes_files_when_the_run_raises(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            with profiled(tmp_path, stem="failed") as output:
+                raise RuntimeError("boom")
+
+        assert output.pstats.exists()
+        assert output.collapsed.exists()
+        assert output.allocations.exists()
@@ -0,0 +1,178 @@
+"""Tests for src.run_history storage, percentiles and regression flags."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from src import metrics, run_history
+from src.run_history import RunHistory, percentile
+
+START = datetime(2026, 3, 1, 6, 0, tzinfo=timezone.utc)
+
+
+def _report(
+    day: int,
+    notion_s: float = 10.0,
+    retries: int = 0,
+    status: str = "success",
+    dry_run: bool = False,
+) -> dict:
+    counters = {"items.new": 20}
+    if retries:
+        counters["retries.gemini"] = retries
+    return {
+        "run_id": f"run-{day}",
+        "status": status,
+        "started_at": (START + timedelta(days=day)).isoformat(timespec="seconds"),
+        "duration_s": 60.0 + notion_s,
+        "dry_run": dry_run,
+        "error": None,
+        "timers": {
+            "scrape": {"count": 1, "total_s": 20.0, "max_s": 20.0},
+            "stage.notion": {"count": 1, "total_s": notion_s, "max_s": notion_s},
+        },
+        "counters": counters,
+    }
+
+
+@pytest.fixture
+def history(tmp_path: Path):
+    with RunHistory(tmp_path / "run_history.db") as history:
+        yield history
+
+
+def _flags(history: RunHistory, key: str) -> dict[str, str]:
+    return {r.metric: r.window for r in history.regressions(key)}
+
+
+class TestPercentile:
+    def test_interpolates(self):
+        assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5
+        assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 95) == pytest.approx(4.8)
+        assert percentile([7.0], 95) == 7.0
+        assert percentile([], 50) is None
+
+
+class TestRegressions:
+    def test_stable_history_is_quiet(self, history):
+        for day in range(15):
+            history.record(f"r{day}", _report(day, notion_s=10 + day % 3))
+
+        assert history.regressions("r14") == []
+
+    def test_spike_is_flagged_against_median(self, history):
+        for day in range(14):
+            history.record(f"r{day}", _report(day))
+        history.record("r14", _report(14, notion_s=35.0))
+
+        (flag,) = [r for r in history.regressions("r14") if r.metric == "stage.notion"]
+        assert (flag.window, flag.value, flag.baseline) == ("run", 35.0, 10.0)
+        assert flag.ratio == 3.5
+        assert flag.describe() == (
+            "stage.notion: 35.0s vs baseline 10.0s (3.5x, this run)"
+        )
+
+    def test_small_absolute_changes_are_ignored(self, history):
+        for day in range(14):
+            history.record(f"r{day}", _report(day, notion_s=1.0))
+        history.record("r14", _report(14, notion_s=4.0))  # 4x, but only +3s
+
+        assert history.regressions("r14") == []
+
+    def test_creeping_retries_are_a_drift(self, history):
+        for day in range(14):
+            history.record(f"r{day}", _report(day))
+        for day in range(14, 21):
+            history.record(f"r{day}", _report(day, retries=4 + day % 2))
+        # This run alone is back to normal, the week still is not
+        history.record("r21", _report(21, retries=0))
+
+        assert _flags(history, "r20") == {"retries.gemini": "run"}
+        (flag,) = history.regressions("r21")
+        assert (flag.metric, flag.kind) == ("retries.gemini", "counter")
+        assert flag.baseline == 0
+        assert flag.describe().endswith("(new, median of last 7 runs)")
+
+    def test_baseline_skips_failed_and_dry_runs(self, history):
+        for day in range(14):
+            history.record(f"r{day}", _report(day))
+        for day in range(14, 20):
+            history.record(f"f{day}", _report(day, notion_s=50.0, status="failed"))
+            history.record(f"d{day}", _report(day, notion_s=50.0, dry_run=True))
+        history.record("r20", _report(20, notion_s=50.0))
+
+        assert _flags(history, "r20")["stage.notion"] == "run"
+
+    def test_needs_a_minimum_baseline(self, history):
+        for day in range(4):
+            history.record(f"r{day}", _report(day))
+        history.record("r4", _report(4, notion_s=100.0, retries=9))
+
+        assert history.regressions("r4") == []
+
+    def test_unknown_run_raises(self, history):
+        with pytest.raises(KeyError):
+            history.regressions("nope")
+
+
+class TestStatsAndTrend:
+    def test_stats_and_weekly_trend(self, history, monkeypatch):
+        monkeypatch.setattr(run_history, "datetime", _FrozenDatetime)
+        for day in range(14):
+            history.record(f"r{day}", _report(day, notion_s=float(day)))
+        history.record("dry", _report(14, notion_s=99.0, dry_run=True))
+
+        stats = {row["name"]: row for row in history.stats(30, prefix="stage.")}
+        assert list(stats) == ["stage.notion"]
+        assert stats["stage.notion"]["runs"] == 14
+        assert stats["stage.notion"]["p50"] == 6.5
+        assert stats["stage.notion"]["last"] == 13.0
+
+        weeks = history.trend("stage.notion", 30)
+        # 2026-03-01 is a Sunday: one run in W09, then full weeks
+        assert [(w["week"], w["runs"]) for w in weeks] == [
+            ("2026-W09", 1),
+            ("2026-W10", 7),
+            ("2026-W11", 6),
+        ]
+        assert weeks[1]["p50"] == 4.0
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return START.replace(day=20).astimezone(tz)
+
+
+class TestRecordRun:
+    def test_sync_and_record_run(self, tmp_path, monkeypatch):
+        runs_dir = tmp_path / "runs"
+        runs_dir.mkdir()
+        monkeypatch.setattr(metrics, "RUNS_DIR", runs_dir)
+        monkeypatch.setattr(
+            run_history, "RUN_HISTORY_DB_PATH", tmp_path / "run_history.db"
+        )
+        for day in range(14):
+            (runs_dir / f"run-{day}-060000.json").write_text(json.dumps(_report(day)))
+        (runs_dir / "broken-060000.json").write_text("{")
+
+        with RunHistory() as history:
+            assert history.sync() == 14
+            assert history.sync() == 0
+
+        path = runs_dir / "run-14-060000.json"
+        path.write_text(json.dumps(_report(14, notion_s=40.0)))
+        flags = run_history.record_run(path)
+
+        assert "stage.notion" in {r.metric for r in flags}
+
+    def test_record_run_never_raises(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            run_history, "RUN_HISTORY_DB_PATH", tmp_path / "run_history.db"
+        )
+
+        assert run_history.record_run(tmp_path / "missing.json") == []
@@ -54,3 +54,56 @@ class TestModernAsyncio:
         assert "to_thread" in source, (
             "scraper.py should use asyncio.to_thread() for running sync functions."
         )
+
+
+class TestArticleCodec:
+    """Slotted Article and its dedicated JSON codec."""
+
+    def _article(self):
+        from src.scraper import Article
+
+        return Article(
+            source="hackernews",
+            source_id="42",
+            title="한글 제목 " * 20,
+            url="https://example.com/a",
+            discussion_url="https://news.ycombinator.com/item?id=42",
+            summary="",
+            score=1234,
+            published_at="2026-02-12T00:00:00+00:00",
+            ai_summary="요약",
+            relevance_score=0.85,
+            notable=True,
+            tags=["AI/ML", "Tool"],
+        )
+
+    def test_article_uses_slots(self):
+        article = self._article()
+        assert not hasattr(article, "__dict__")
+
+    def test_json_round_trip_matches_asdict(self):
+        from dataclasses import asdict
+
+        from src.article_codec import article_to_dict, decode_json, encode_json
+
+        article = self._article()
+        assert article_to_dict(article) == asdict(article)
+        assert decode_json(encode_json([article])) == [article]
+
+    def test_decode_fills_missing_optional_fields(self):
+        from src.article_codec import article_from_dict
+
+        record = {
+            "source": "geeknews",
+            "source_id": "1",
+            "title": "t",
+            "url": "u",
+            "discussion_url": "d",
+            "summary": "s",
+            "score": 0,
+            "published_at": "2026-02-11",
+            "ai_summary": "",
+            "relevance_score": 0.7,
+            "notable": False,
+        }
+        assert article_from_dict(record).tags == []
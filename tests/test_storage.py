@@ -0,0 +1,114 @@
+"""Tests for src.storage GitHub issue creation and the local issue index."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src import storage
+from src.github_client import GitHubClient
+
+
+@pytest.fixture
+def issue_env(tmp_path, monkeypatch):
+    from src import config
+
+    monkeypatch.setattr(storage, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(storage, "ISSUE_INDEX_PATH", tmp_path / "github_issues.json")
+    monkeypatch.setattr(config, "DRY_RUN", False)
+    monkeypatch.setenv("GITHUB_TOKEN", "token")
+    monkeypatch.setenv("GITHUB_REPOSITORY", "owner/repo")
+    return tmp_path
+
+
+class TestIssueIndex:
+    def test_rerun_skips_already_filed_articles(self, issue_env, sample_articles):
+        for article in sample_articles:
+            article.relevance_score = 0.9
+
+        with patch.object(GitHubClient, "create_issue", side_effect=[11, 12, 13]) as create:
+            assert storage.create_github_issues(sample_articles) == 3
+            assert create.call_count == 3
+
+            # Second run: every article is already in the index, no API calls
+            assert storage.create_github_issues(sample_articles) == 0
+            assert create.call_count == 3
+
+        index = storage.load_issue_index()
+        assert sorted(index.values()) == [11, 12, 13]
+
+
+class TestGitHubClientRetry:
+    def _response(self, status, headers=None, payload=None):
+        resp = MagicMock()
+        resp.status_code = status
+        resp.headers = headers or {}
+        resp.text = ""
+        resp.json.return_value = payload or {}
+        return resp
+
+    @patch("src.github_client.time.sleep")
+    def test_retry_after_is_respected(self, mock_sleep):
+        client = GitHubClient("token", "owner/repo", min_interval=0)
+        limited = self._response(403, {"Retry-After": "7"})
+        ok = self._response(201, payload={"number": 99})
+
+        with patch.object(client.session, "request", side_effect=[limited, ok]):
+            assert client.create_issue("t", "b", []) == 99
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch("src.github_client.time.sleep")
+    def test_ambiguous_post_failure_finds_the_created_issue(self, mock_sleep):
+        client = GitHubClient("token", "owner/repo", min_interval=0)
+        bad_gateway = self._response(502)
+        bad_gateway.raise_for_status.side_effect = requests.HTTPError(
+            response=bad_gateway
+        )
+        listing = self._response(200)
+        listing.json.return_value = [
+            {"number": 5, "title": "t", "pull_request": {}},
+            {"number": 7, "title": "t"},
+        ]
+
+        with patch.object(
+            client.session, "request", side_effect=[bad_gateway, listing]
+        ) as request:
+            assert client.create_issue("t", "b", []) == 7
+
+        assert [c.args[0] for c in request.call_args_list] == ["POST", "GET"]
+
+    @patch("src.github_client.time.sleep")
+    def test_timeout_reposts_only_when_no_issue_exists(self, mock_sleep):
+        client = GitHubClient("token", "owner/repo", min_interval=0)
+        listing = self._response(200)
+        listing.json.return_value = [{"number": 3, "title": "other"}]
+        ok = self._response(201, payload={"number": 8})
+
+        with patch.object(
+            client.session,
+            "request",
+            side_effect=[requests.Timeout("read timed out"), listing, ok],
+        ) as request:
+            assert client.create_issue("t", "b", []) == 8
+
+        assert [c.args[0] for c in request.call_args_list] == ["POST", "GET", "POST"]
+
+
+class TestIssueIndexPersistence:
+    def test_index_is_saved_per_created_issue(self, issue_env, monkeypatch):
+        from src import config
+
+        monkeypatch.setattr(config, "GITHUB_MAX_CONCURRENCY", 1)
+        payloads = [
+            {"key": f"hackernews:{n}", "title": f"t{n}", "body": "", "labels": []}
+            for n in range(2)
+        ]
+
+        with patch.object(
+            GitHubClient, "create_issue", side_effect=[11, RuntimeError("crash")]
+        ):
+            with pytest.raises(RuntimeError):
+                storage.deliver_github_issues(payloads)
+
+        assert storage.load_issue_index() == {"hackernews:0": 11}